@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+
+
+"""
+Compare per-token stemming with the memoized tokenizers, on a synthetic
+Gutenberg-sized text or a local file:
+
+    python benchmarks/bench_tokenize.py [--path war-and-peace.txt]
+"""
+
+
+import re
+import time
+import click
+
+from nltk.stem import PorterStemmer
+from textplot import utils
+from texts import synthetic_text
+
+
+def per_token(text):
+
+    """
+    The original tokenizer - stem every token.
+    """
+
+    stem = PorterStemmer().stem
+
+    return [
+        (stem(m.group(0)), m.group(0), offset)
+        for offset, m in enumerate(re.finditer('[a-z]+', text.lower()))
+    ]
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - started
+
+
+@click.command()
+@click.option('--path', type=click.Path(exists=True))
+def main(path):
+
+    if path:
+        with open(path, 'r', errors='replace') as f:
+            text = f.read()
+
+    else:
+        text = synthetic_text()
+
+    print('%d tokens' % len(re.findall('[a-z]+', text.lower())))
+
+    baseline = timed(per_token, text)
+    print('%-24s %.2fs' % ('per-token stemming:', baseline))
+
+    for name, func in [
+        ('utils.tokenize', lambda t: list(utils.tokenize(t))),
+        ('utils.tokenize_arrays', utils.tokenize_arrays),
+    ]:
+        duration = timed(func, text)
+        print('%-24s %.2fs (%.1fx)' % (name+':', duration, baseline/duration))
+
+
+if __name__ == '__main__':
+    main()
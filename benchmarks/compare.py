@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+
+
+"""
+Compare two benchmark results files, written by run.py, and exit with an
+error if any stage got slower or used more memory than the threshold:
+
+    python benchmarks/compare.py before.json after.json [--threshold 0.1]
+"""
+
+
+import sys
+import json
+import click
+
+
+def load_stages(path):
+
+    """
+    Flatten a results file.
+
+    Args:
+        path (str): The results file.
+
+    Returns:
+        dict: (text, term_depth, stage) -> {'seconds', 'peak_bytes'}
+    """
+
+    with open(path) as f:
+        report = json.load(f)
+
+    return {
+        (r['text'], r['term_depth'], stage): values
+        for r in report['results']
+        for stage, values in r['stages'].items()
+    }
+
+
+def compare(old, new, threshold=0.1, min_seconds=0.05,
+            min_bytes=2**20):
+
+    """
+    Find the regressions between two sets of results.
+
+    Args:
+        old (dict): The baseline, from load_stages().
+        new (dict): The new results, from load_stages().
+        threshold (float): The allowed relative increase.
+        min_seconds (float): Ignore time differences smaller than this.
+        min_bytes (int): Ignore memory differences smaller than this.
+
+    Returns:
+        list: (key, metric, old, new, ratio, regressed) for each measurement
+        in both files.
+    """
+
+    rows = []
+
+    for key in [k for k in old if k in new]:
+        for metric, floor in (('seconds', min_seconds),
+                              ('peak_bytes', min_bytes)):
+
+            a, b = old[key].get(metric), new[key].get(metric)
+
+            if a is None or b is None:
+                continue
+
+            ratio = b / a if a else float('inf') if b else 1.0
+            regressed = b - a > floor and ratio > 1 + threshold
+
+            rows.append((key, metric, a, b, ratio, regressed))
+
+    return rows
+
+
+def format_value(metric, value):
+
+    if metric == 'seconds':
+        return '%.3fs' % value
+
+    return '%.1fMB' % (value / 2**20)
+
+
+@click.command()
+@click.argument('old_path', type=click.Path(exists=True))
+@click.argument('new_path', type=click.Path(exists=True))
+@click.option('--threshold', default=0.1, help='The allowed increase.')
+@click.option('--min_seconds', default=0.05)
+def main(old_path, new_path, threshold, min_seconds):
+
+    rows = compare(
+        load_stages(old_path),
+        load_stages(new_path),
+        threshold,
+        min_seconds,
+    )
+
+    for (text, term_depth, stage), metric, a, b, ratio, regressed in rows:
+        click.echo('%-16s %5d %-9s %-10s %10s -> %10s  %5.2fx %s' % (
+            text, term_depth, stage, metric,
+            format_value(metric, a),
+            format_value(metric, b),
+            ratio,
+            'REGRESSION' if regressed else '',
+        ))
+
+    regressions = sum(row[-1] for row in rows)
+
+    if regressions:
+        click.echo('\n%d regressions over %d%%' % (
+            regressions, threshold * 100
+        ))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
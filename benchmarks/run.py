@@ -0,0 +1,280 @@
+#!/usr/bin/env python
+
+
+"""
+Time each stage of the build_graph() pipeline - tokenize, kde, index, and
+skim - across a range of term depths, and record the peak memory of each
+stage. The results are written as JSON, for compare.py:
+
+    python benchmarks/run.py --out before.json
+    git checkout feature
+    python benchmarks/run.py --out after.json
+    python benchmarks/compare.py before.json after.json
+
+Pass --path to add local texts, and --text to pick the synthetic texts.
+"""
+
+
+import sys
+import json
+import time
+import click
+import platform
+import subprocess
+import tracemalloc
+import numpy as np
+
+from textplot.text import Text
+from textplot.matrix import Matrix
+from textplot.graphs import Skimmer
+from texts import SYNTHETIC, load_texts
+
+
+STAGES = ['tokenize', 'kde', 'index', 'skim']
+
+
+# A small text for the untimed warm-up run.
+WARM_UP_TEXT = 'a quick brown fox jumps over the lazy dog and runs away ' * 100
+
+
+def pipeline(text, term_depth, skim_depth, **kwargs):
+
+    """
+    Run the stages of build_graph() on a text.
+
+    Args:
+        text (str): The raw text.
+        term_depth (int): Consider the N most frequent terms.
+        skim_depth (int): Connect each word to the N closest siblings.
+
+    Yields:
+        tuple: (stage, result), after each stage finishes.
+    """
+
+    t = Text(text)
+    yield 'tokenize', t
+
+    terms = sorted(t.most_frequent_terms(term_depth))
+
+    kde_kwargs = {k: v for k, v in kwargs.items() if k != 'workers'}
+
+    kdes, _ = t.kde_matrix(terms, **kde_kwargs)
+    yield 'kde', kdes
+
+    m = Matrix(dtype=kwargs.get('dtype', 'float64'))
+    m.index(t, terms, **kwargs)
+    yield 'index', m
+
+    g = Skimmer()
+    g.build(t, m, skim_depth)
+    yield 'skim', g
+
+
+def warm_up(skim_depth, **kwargs):
+
+    """
+    Run the pipeline once on a small text, without timing it. nltk and parts
+    of scipy are imported the first time a stage needs them, which would
+    otherwise be timed as part of the first run.
+    """
+
+    for _ in pipeline(WARM_UP_TEXT, 10, skim_depth, **kwargs):
+        pass
+
+
+def measure_time(text, term_depth, skim_depth, **kwargs):
+
+    """
+    Time each stage.
+
+    Returns:
+        tuple: ({stage: seconds}, {'tokens': int, 'terms': int})
+    """
+
+    seconds = {}
+    sizes = {}
+
+    started = time.perf_counter()
+
+    for stage, result in pipeline(text, term_depth, skim_depth, **kwargs):
+
+        now = time.perf_counter()
+        seconds[stage] = now - started
+
+        if stage == 'tokenize':
+            sizes['tokens'] = len(result.tokens)
+
+        if stage == 'index':
+            sizes['terms'] = len(result.terms)
+
+        started = time.perf_counter()
+
+    return seconds, sizes
+
+
+def measure_memory(text, term_depth, skim_depth, **kwargs):
+
+    """
+    Get the peak traced memory of each stage, above what was allocated when
+    the stage started. This is a separate run, since tracing slows down the
+    allocation-heavy stages.
+
+    Returns:
+        dict: {stage: bytes}
+    """
+
+    peaks = {}
+
+    tracemalloc.start()
+
+    try:
+
+        base = tracemalloc.get_traced_memory()[0]
+
+        for stage, _ in pipeline(text, term_depth, skim_depth, **kwargs):
+
+            current, peak = tracemalloc.get_traced_memory()
+            peaks[stage] = peak - base
+
+            tracemalloc.reset_peak()
+            base = current
+
+    finally:
+        tracemalloc.stop()
+
+    return peaks
+
+
+def metadata():
+
+    """
+    Returns:
+        dict: The commit and the environment.
+    """
+
+    try:
+        commit = subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            stderr=subprocess.DEVNULL,
+        ).decode().strip()
+
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'commit':       commit,
+        'python':       platform.python_version(),
+        'numpy':        np.__version__,
+        'platform':     platform.platform(),
+        'timestamp':    time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+@click.command()
+
+@click.option(
+    '--out',
+    type=click.Path(),
+    help='The JSON results file. Defaults to stdout.'
+)
+
+@click.option(
+    '--text',
+    'names',
+    multiple=True,
+    type=click.Choice(list(SYNTHETIC)),
+    help='A synthetic text. Can be repeated. Defaults to all.'
+)
+
+@click.option(
+    '--path',
+    'paths',
+    multiple=True,
+    type=click.Path(exists=True),
+    help='A local text file. Can be repeated.'
+)
+
+@click.option(
+    '--term_depth',
+    'term_depths',
+    multiple=True,
+    type=int,
+    default=[250, 500, 1000, 2000],
+    help='A term depth. Can be repeated.'
+)
+
+@click.option('--skim_depth', default=10)
+@click.option('--repeat', default=1, help='Keep the fastest of N runs.')
+@click.option('--memory/--no-memory', default=True)
+@click.option('--samples', default=1000)
+@click.option('--dtype', default='float64')
+@click.option('--workers', default=1)
+
+def main(out, names, paths, term_depths, skim_depth, repeat, memory,
+         **kwargs):
+
+    results = []
+
+    warm_up(skim_depth, **kwargs)
+
+    for name, text in load_texts(names, paths):
+        for term_depth in term_depths:
+
+            runs = [
+                measure_time(text, term_depth, skim_depth, **kwargs)
+                for _ in range(repeat)
+            ]
+
+            sizes = runs[0][1]
+
+            seconds = {
+                stage: min(run[0][stage] for run in runs)
+                for stage in STAGES
+            }
+
+            peaks = (
+                measure_memory(text, term_depth, skim_depth, **kwargs)
+                if memory else {}
+            )
+
+            result = dict(
+                text=name,
+                term_depth=term_depth,
+                tokens=sizes['tokens'],
+                terms=sizes['terms'],
+                stages={
+                    stage: dict(
+                        seconds=seconds[stage],
+                        peak_bytes=peaks.get(stage),
+                    )
+                    for stage in STAGES
+                },
+            )
+
+            results.append(result)
+
+            click.echo('%-16s %5d terms  %s' % (
+                name,
+                result['terms'],
+                '  '.join(
+                    '%s=%.2fs' % (stage, seconds[stage])
+                    for stage in STAGES
+                ),
+            ), err=True)
+
+    report = dict(
+        meta=metadata(),
+        params=dict(skim_depth=skim_depth, repeat=repeat, **kwargs),
+        results=results,
+    )
+
+    if out:
+        with open(out, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+
+if __name__ == '__main__':
+    main()
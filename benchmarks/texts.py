@@ -0,0 +1,71 @@
+
+
+"""
+Texts for the benchmarks.
+"""
+
+
+import os
+import numpy as np
+
+
+SUFFIXES = ['', '', '', 's', 'ed', 'ing', 'ly', 'er', 'ness', 'ation']
+
+
+def synthetic_text(tokens=570000, roots=8000, seed=0):
+
+    """
+    Generate a text with a Zipfian distribution over inflected words.
+
+    Args:
+        tokens (int): The number of tokens.
+        roots (int): The number of distinct word roots.
+        seed (int): The random seed.
+
+    Returns:
+        str: The text.
+    """
+
+    rs = np.random.RandomState(seed)
+
+    letters = np.array(list('abcdefghijklmnopqrstuvwxyz'))
+
+    words = [
+        ''.join(rs.choice(letters, rs.randint(3, 9))) +
+        SUFFIXES[rs.randint(len(SUFFIXES))]
+        for _ in range(roots * 3)
+    ]
+
+    p = 1 / np.arange(1, len(words)+1)
+    p /= p.sum()
+
+    return ' '.join(np.array(words)[rs.choice(len(words), tokens, p=p)])
+
+
+# Name -> number of tokens. The large text is about the size of War and
+# Peace.
+SYNTHETIC = {
+    'synthetic-100k':   100000,
+    'synthetic-570k':   570000,
+}
+
+
+def load_texts(names=None, paths=()):
+
+    """
+    Get the synthetic texts, and any local files.
+
+    Args:
+        names (list): Synthetic text names, or None for all of them.
+        paths (list): Local text files.
+
+    Yields:
+        tuple: (name, text)
+    """
+
+    for name in names or SYNTHETIC:
+        yield name, synthetic_text(SYNTHETIC[name])
+
+    for path in paths:
+        with open(path, 'r', errors='replace') as f:
+            yield os.path.basename(path), f.read()
@@ -0,0 +1,150 @@
+
+
+import os
+import pytest
+import textplot.batch as batch
+
+from textplot.batch import find_inputs, output_paths, process, run_batch
+
+
+def write(path, text):
+    with open(str(path), 'w') as f:
+        f.write(text)
+
+
+def test_find_inputs_dir(tmpdir):
+
+    """
+    For a directory, find_inputs() should return the .txt files, sorted.
+    """
+
+    write(tmpdir.join('b.txt'), 'bb')
+    write(tmpdir.join('a.txt'), 'aa')
+    write(tmpdir.join('notes.md'), 'cc')
+
+    assert find_inputs(str(tmpdir)) == [
+        str(tmpdir.join('a.txt')),
+        str(tmpdir.join('b.txt')),
+    ]
+
+
+def test_find_inputs_manifest(tmpdir):
+
+    """
+    For a manifest, find_inputs() should return the listed paths, resolved
+    against the manifest directory, skipping blank lines and comments.
+    """
+
+    write(tmpdir.join('manifest'), 'a.txt\n\n# b.txt\n/books/c.txt\n')
+
+    assert find_inputs(str(tmpdir.join('manifest'))) == [
+        str(tmpdir.join('a.txt')),
+        '/books/c.txt',
+    ]
+
+
+def test_output_paths():
+
+    """
+    output_paths() should map each input to a graph file with the same base
+    name, and reject inputs that would overwrite each other.
+    """
+
+    assert output_paths(['a/x.txt', 'b/y'], 'out', 'graphml') == [
+        os.path.join('out', 'x.graphml'),
+        os.path.join('out', 'y.graphml'),
+    ]
+
+    with pytest.raises(ValueError):
+        output_paths(['a/x.txt', 'b/x.txt'], 'out')
+
+    with pytest.raises(ValueError):
+        output_paths(['a/x.txt'], 'out', 'dot')
+
+
+def test_process_error(tmpdir):
+
+    """
+    When a text fails, process() should return the error instead of raising.
+    """
+
+    status = process((
+        str(tmpdir.join('missing.txt')),
+        str(tmpdir.join('missing.gml')),
+        'gml',
+        {},
+    ))
+
+    assert status['status'] == 'error'
+    assert status['error'].startswith('FileNotFoundError')
+
+
+def test_run_batch(tmpdir):
+
+    """
+    run_batch() should write a graph for each text, and continue past
+    failures.
+    """
+
+    write(tmpdir.join('a.txt'), 'aa bb cc aa bb cc dd ' * 20)
+    write(tmpdir.join('b.txt'), 'ee ff gg ee ff gg hh ' * 20)
+
+    inputs = [
+        str(tmpdir.join('a.txt')),
+        str(tmpdir.join('missing.txt')),
+        str(tmpdir.join('b.txt')),
+    ]
+
+    out_dir = str(tmpdir.join('out'))
+
+    statuses = list(run_batch(inputs, out_dir, skim_depth=2, jobs=2))
+
+    results = {s['in_path']: s['status'] for s in statuses}
+
+    assert results == {
+        inputs[0]: 'ok',
+        inputs[1]: 'error',
+        inputs[2]: 'ok',
+    }
+
+    assert sorted(os.listdir(out_dir)) == ['a.gml', 'b.gml']
+
+
+def test_run_batch_worker_dies(tmpdir, monkeypatch):
+
+    """
+    If a worker dies without raising, run_batch() should report its text as
+    failed, and finish the others.
+    """
+
+    for name in 'abcde':
+        write(tmpdir.join(name+'.txt'), 'aa bb cc aa bb cc dd ' * 20)
+
+    inputs = [str(tmpdir.join(name+'.txt')) for name in 'abcde']
+
+    build_graph = batch.build_graph
+
+    # Kill the worker that gets c.txt, the way the OOM killer would. The
+    # workers are forked, so they see the patch.
+    def crash(path, **kwargs):
+        if path.endswith('c.txt'): os._exit(137)
+        return build_graph(path, **kwargs)
+
+    monkeypatch.setattr(batch, 'build_graph', crash)
+
+    out_dir = str(tmpdir.join('out'))
+
+    statuses = list(run_batch(inputs, out_dir, skim_depth=2, jobs=2))
+
+    assert sorted(s['in_path'] for s in statuses) == inputs
+
+    results = {s['in_path']: s for s in statuses}
+
+    for path in inputs:
+        if path.endswith('c.txt'):
+            assert results[path]['status'] == 'error'
+            assert results[path]['error'].startswith('BrokenProcessPool')
+        else:
+            assert results[path]['status'] == 'ok'
+
+    assert sorted(os.listdir(out_dir)) == ['a.gml', 'b.gml', 'd.gml', 'e.gml']
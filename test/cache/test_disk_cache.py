@@ -0,0 +1,115 @@
+
+
+import numpy as np
+import pytest
+import os
+
+from textplot.text import Text
+from textplot.cache import DiskCache
+
+
+def test_cache_tokens(tmpdir):
+
+    """
+    When a cache is passed, the tokens should be written on the first run and
+    loaded from disk on the second.
+    """
+
+    cache = DiskCache(str(tmpdir))
+
+    t1 = Text('aa bb the cc aa', cache=cache)
+    t2 = Text('aa bb the cc aa', cache=cache)
+
+    assert t1.cache_key == t2.cache_key
+    assert os.path.isdir(cache.text_dir(t1.cache_key))
+
+    assert list(t2.tokens) == list(t1.tokens)
+    assert t2.terms == t1.terms
+
+
+def test_cache_chunks(tmpdir):
+
+    """
+    Re-iterable chunks should be cached like a string, and a one-shot
+    iterator - which would be used up by the key - should be rejected.
+    """
+
+    cache = DiskCache(str(tmpdir))
+
+    t1 = Text(['aa bb ', 'cc aa'], cache=cache)
+    t2 = Text('aa bb cc aa', cache=cache)
+
+    assert t1.cache_key == t2.cache_key
+    assert len(t1.tokens) == len(t2.tokens) == 4
+
+    with pytest.raises(TypeError):
+        Text(iter(['aa bb ', 'cc aa']), cache=cache)
+
+
+def test_content_key(tmpdir):
+
+    """
+    Different texts and stopword lists should get different keys.
+    """
+
+    cache = DiskCache(str(tmpdir))
+
+    k1 = cache.key('aa bb', set(['the']), 'porter')
+    k2 = cache.key('aa cc', set(['the']), 'porter')
+    k3 = cache.key('aa bb', set(['an']), 'porter')
+    k4 = cache.key('aa bb', set(['the']), 'snowball')
+
+    assert len(set([k1, k2, k3, k4])) == 4
+    assert k1 == cache.key('aa bb', set(['the']), 'porter')
+
+
+def test_cache_kdes(tmpdir):
+
+    """
+    KDE matrices should be cached by term list and parameters, and loaded as
+    memory-mapped arrays.
+    """
+
+    cache = DiskCache(str(tmpdir))
+
+    t1 = Text('aa bb cc aa', cache=cache)
+    kdes1, _ = t1.kde_matrix(['aa', 'bb'], bandwidth=10)
+
+    t2 = Text('aa bb cc aa', cache=cache)
+    kdes2, _ = t2.kde_matrix(['aa', 'bb'], bandwidth=10)
+    kdes3, _ = t2.kde_matrix(['aa', 'bb'], bandwidth=20)
+
+    assert isinstance(kdes2, np.memmap)
+    assert (kdes1 == kdes2).all()
+
+    assert not isinstance(kdes3, np.memmap)
+
+
+def test_purge(tmpdir):
+
+    """
+    purge() should delete the cache directory.
+    """
+
+    path = str(tmpdir.join('cache'))
+    cache = DiskCache(path)
+
+    Text('aa bb cc', cache=cache)
+    assert os.path.isdir(path)
+
+    cache.purge()
+    assert not os.path.exists(path)
+
+
+def test_stats(tmpdir):
+
+    """
+    stats() should count the loads that hit and missed.
+    """
+
+    cache = DiskCache(str(tmpdir))
+
+    Text('aa bb cc', cache=cache)
+    Text('aa bb cc', cache=cache)
+
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'hit_rate': 0.5}
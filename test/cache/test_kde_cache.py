@@ -0,0 +1,76 @@
+
+
+import numpy as np
+
+from textplot.cache import KDECache
+
+
+def test_get_set():
+
+    """
+    set() should store an entry, and get() should count hits and misses.
+    """
+
+    c = KDECache()
+
+    assert c.get('a') is None
+    c.set('a', np.zeros(10))
+    assert c.get('a') is not None
+
+    assert c.hits == 1
+    assert c.misses == 1
+
+
+def test_maxsize():
+
+    """
+    When the cache is over its entry limit, evict the least recently used
+    entry.
+    """
+
+    c = KDECache(maxsize=2)
+
+    c.set('a', np.zeros(10))
+    c.set('b', np.zeros(10))
+
+    # Touch 'a', so that 'b' is the oldest.
+    c.get('a')
+
+    c.set('c', np.zeros(10))
+
+    assert 'a' in c
+    assert 'b' not in c
+    assert 'c' in c
+
+
+def test_maxbytes():
+
+    """
+    When the cache is over its byte limit, evict entries until it fits.
+    """
+
+    c = KDECache(maxbytes=200)
+
+    c.set('a', np.zeros(10))
+    c.set('b', np.zeros(10))
+    c.set('c', np.zeros(10))
+
+    assert 'a' not in c
+    assert c.nbytes == 160
+
+
+def test_clear():
+
+    """
+    clear() should drop all entries and reset the counters.
+    """
+
+    c = KDECache()
+
+    c.set('a', np.zeros(10))
+    c.get('a')
+    c.clear()
+
+    assert len(c) == 0
+    assert c.nbytes == 0
+    assert c.hits == 0
@@ -0,0 +1,77 @@
+
+
+import numpy as np
+
+from textplot.candidates import pool, ball_tree
+
+
+def test_pool():
+
+    """
+    pool() should normalize each density, and sum runs of samples.
+    """
+
+    kdes = np.array([
+        [1, 1, 2, 4],
+        [0, 0, 0, 0],
+    ], dtype=float)
+
+    assert pool(kdes, 2).tolist() == [[0.25, 0.75], [0, 0]]
+
+
+def test_ball_tree():
+
+    """
+    ball_tree() should shortlist the nearest terms under L1, excluding the
+    term itself.
+    """
+
+    kdes = np.array([
+        [1, 0, 0, 0],
+        [0.9, 0.1, 0, 0],
+        [0, 0, 1, 0],
+        [0, 0, 0.8, 0.2],
+        [0.7, 0.3, 0, 0],
+    ])
+
+    ids = ball_tree(kdes, 2, dims=4)
+
+    assert ids.shape == (5, 2)
+
+    assert ids[0].tolist() == [1, 4]
+    assert ids[2][0] == 3
+
+    for i, row in enumerate(ids):
+        assert i not in row
+
+
+def test_duplicates():
+
+    """
+    When a term is tied with a duplicate, it should still be dropped from
+    its own shortlist.
+    """
+
+    kdes = np.array([
+        [1, 0],
+        [1, 0],
+        [1, 0],
+        [0, 1],
+    ])
+
+    ids = ball_tree(kdes, 2, dims=2)
+
+    for i, row in enumerate(ids):
+        assert i not in row
+        assert len(set(row)) == 2
+
+
+def test_too_many_candidates():
+
+    """
+    The shortlist should be capped at the number of other terms.
+    """
+
+    kdes = np.eye(3)
+
+    assert ball_tree(kdes, 10).shape == (3, 2)
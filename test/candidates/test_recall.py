@@ -0,0 +1,33 @@
+
+
+from textplot.text import Text
+from textplot.matrix import Matrix
+from textplot.sparse import SparseMatrix
+from textplot.candidates import recall
+
+
+TEXT = 'aa bb cc dd ee ff aa cc ee bb dd aa ff cc gg hh gg aa'
+
+
+def test_recall():
+
+    """
+    recall() should measure the share of the exact neighbors that are found.
+    """
+
+    t = Text(TEXT)
+
+    exact = Matrix()
+    exact.index(t)
+
+    # With every term on the shortlist, the neighbors are exact.
+    full = SparseMatrix()
+    full.index(t, k=3, shortlist=len(exact.terms))
+
+    assert recall(full, exact, 3) == 1
+
+    # With one candidate, at most one of the three neighbors is found.
+    short = SparseMatrix()
+    short.index(t, k=3, shortlist=1)
+
+    assert recall(short, exact, 3) <= 1/3
@@ -0,0 +1,54 @@
+
+
+import numpy as np
+import pytest
+
+from textplot.density import KERNELS, binned, sklearn
+
+
+OFFSETS = np.concatenate([
+    np.random.RandomState(0).normal(20000, 3000, 200),
+    np.random.RandomState(1).randint(0, 100000, 100),
+]).clip(0, 99999).astype(int)
+
+
+@pytest.mark.parametrize('kernel', [
+    k for k in KERNELS if k != 'tophat'
+])
+def test_match_sklearn(kernel):
+
+    """
+    For the continuous kernels, binned() should match scikit-learn to within
+    0.1% (relative L1 error).
+    """
+
+    ref = sklearn(OFFSETS, 100000, 2000, 1000, kernel)
+    kde = binned(OFFSETS, 100000, 2000, 1000, kernel)
+
+    assert np.abs(kde - ref).sum() / ref.sum() < 1e-3
+
+
+def test_tophat():
+
+    """
+    For tophat, binned() should match scikit-learn to within 3%.
+    """
+
+    ref = sklearn(OFFSETS, 100000, 2000, 1000, 'tophat')
+    kde = binned(OFFSETS, 100000, 2000, 1000, 'tophat')
+
+    assert np.abs(kde - ref).sum() / ref.sum() < 3e-2
+
+
+def test_resolution():
+
+    """
+    Raising the resolution should reduce the error.
+    """
+
+    ref = sklearn(OFFSETS, 100000, 2000, 1000, 'tophat')
+
+    lo = binned(OFFSETS, 100000, 2000, 1000, 'tophat', resolution=8)
+    hi = binned(OFFSETS, 100000, 2000, 1000, 'tophat', resolution=128)
+
+    assert np.abs(hi - ref).sum() < np.abs(lo - ref).sum()
@@ -0,0 +1,35 @@
+
+
+import numpy as np
+
+from textplot.density import binned, binned_rows
+
+
+OFFSETS = [
+    np.random.RandomState(i).randint(0, 50000, 10*(i+1))
+    for i in range(5)
+]
+
+
+def test_binned_rows():
+
+    """
+    binned_rows() should match row-by-row calls to binned().
+    """
+
+    kdes = binned_rows(OFFSETS, 50000, 1000, 200)
+
+    for offsets, kde in zip(OFFSETS, kdes):
+        assert np.allclose(kde, binned(offsets, 50000, 1000, 200))
+
+
+def test_blocks():
+
+    """
+    The densities should be the same, regardless of the batch size.
+    """
+
+    kdes = binned_rows(OFFSETS, 50000, 1000, 200)
+    rows = binned_rows(OFFSETS, 50000, 1000, 200, block_bytes=1)
+
+    assert np.allclose(kdes, rows)
@@ -0,0 +1,45 @@
+
+
+import numpy as np
+
+from textplot.density import binned_rows, binned_sweep
+
+
+OFFSETS = [
+    np.random.RandomState(i).randint(0, 50000, 10*(i+1))
+    for i in range(5)
+]
+
+
+SETTINGS = [
+    (500, 200, 'gaussian'),
+    (1000, 200, 'gaussian'),
+    (1000, 200, 'epanechnikov'),
+    (2000, 51, 'tophat'),
+    (2000, 1, 'gaussian'),
+]
+
+
+def test_binned_sweep():
+
+    """
+    Each setting should match a separate call to binned_rows().
+    """
+
+    kdes = binned_sweep(OFFSETS, 50000, SETTINGS)
+
+    for setting, kde in zip(SETTINGS, kdes):
+        assert (kde == binned_rows(OFFSETS, 50000, *setting)).all()
+
+
+def test_blocks():
+
+    """
+    The densities should be the same, regardless of the batch size.
+    """
+
+    kdes = binned_sweep(OFFSETS, 50000, SETTINGS)
+    rows = binned_sweep(OFFSETS, 50000, SETTINGS, block_bytes=1)
+
+    for k1, k2 in zip(kdes, rows):
+        assert np.allclose(k1, k2)
@@ -0,0 +1,31 @@
+
+
+import numpy as np
+import pytest
+
+from textplot.density import KERNELS, exact, sklearn
+
+
+@pytest.mark.parametrize('kernel', KERNELS.keys())
+def test_match_sklearn(kernel):
+
+    """
+    exact() should match scikit-learn, for all kernels.
+    """
+
+    offsets = np.random.RandomState(0).randint(0, 10000, 50)
+
+    ref = sklearn(offsets, 10000, 500, 100, kernel)
+    kde = exact(offsets, 10000, 500, 100, kernel)
+
+    assert np.allclose(kde, ref, rtol=1e-9, atol=0)
+
+
+def test_unknown_kernel():
+
+    """
+    An unknown kernel should raise a ValueError.
+    """
+
+    with pytest.raises(ValueError):
+        exact([1, 2, 3], 10, kernel='triangle')
@@ -0,0 +1,76 @@
+
+
+import pytest
+
+from textplot.text import Text
+from textplot.matrix import Matrix
+from textplot.graphs import Skimmer
+from textplot.fidelity import edge_overlap, score_error
+
+
+TEXT = 'aa bb cc dd ee ff aa cc ee bb dd aa ff cc gg hh gg aa'
+
+
+def test_edge_overlap():
+
+    """
+    edge_overlap() should give the Jaccard similarity of the edge sets.
+    """
+
+    t = Text(TEXT)
+
+    m = Matrix()
+    m.index(t)
+
+    g1 = Skimmer()
+    g1.build(t, m, 1)
+
+    g2 = Skimmer()
+    g2.build(t, m, 1)
+
+    assert edge_overlap(g1, g2) == 1
+
+    g2.graph.add_edge('aa', 'zz')
+
+    edges = g1.graph.number_of_edges()
+    assert edge_overlap(g1, g2) == edges / (edges+1)
+
+
+def test_score_error():
+
+    """
+    score_error() should give the largest difference between the scores.
+    """
+
+    t = Text(TEXT)
+
+    m1 = Matrix()
+    m1.index(t)
+
+    m2 = Matrix()
+    m2.index(t, samples='auto')
+
+    error = score_error(m1, m2)
+
+    assert error == max(
+        abs(m1.get_pair(a, b) - m2.get_pair(a, b))
+        for a in m1.terms for b in m1.terms if a != b
+    )
+
+
+def test_different_terms():
+
+    """
+    Matrices over different terms can't be compared.
+    """
+
+    t = Text(TEXT)
+
+    m1 = Matrix()
+    m1.index(t, ['aa', 'bb'])
+
+    m2 = Matrix()
+    m2.index(t, ['aa', 'cc'])
+
+    with pytest.raises(ValueError):
+        score_error(m1, m2)
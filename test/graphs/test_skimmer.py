@@ -0,0 +1,115 @@
+
+
+import numpy as np
+import networkx as nx
+
+from textplot.text import Text
+from textplot.matrix import Matrix
+from textplot.graphs import Skimmer
+
+
+TEXT = 'aa bb cc dd ee ff aa cc ee bb dd aa ff cc gg hh gg aa'
+
+
+def reference_graph(text, matrix, skim_depth, d_weights=False):
+
+    """
+    Build the graph one edge at a time, with networkx.
+    """
+
+    g = nx.Graph()
+
+    for anchor, pairs in matrix.all_neighbors(skim_depth):
+        for term, weight in pairs.items():
+            if d_weights: weight = 1-weight
+            g.add_edge(
+                text.unstem(anchor),
+                text.unstem(term),
+                weight=float(weight),
+            )
+
+    return g
+
+
+def test_build():
+
+    """
+    The edge arrays should hold the same graph that networkx would build, in
+    the same order.
+    """
+
+    t = Text(TEXT)
+
+    m = Matrix()
+    m.index(t)
+
+    for d_weights in (False, True):
+
+        g = Skimmer()
+        g.build(t, m, 3, d_weights)
+
+        ref = reference_graph(t, m, 3, d_weights)
+
+        assert g.nodes == list(ref.nodes)
+        assert g.number_of_edges() == ref.number_of_edges()
+
+        assert list(zip(
+            g.labels(g.sources),
+            g.labels(g.targets),
+            g.weights.tolist(),
+        )) == list(ref.edges(data='weight'))
+
+
+def test_graph():
+
+    """
+    The networkx graph should be built on request.
+    """
+
+    t = Text(TEXT)
+
+    m = Matrix()
+    m.index(t)
+
+    g = Skimmer()
+    g.build(t, m, 3)
+
+    assert g._graph is None
+
+    ref = reference_graph(t, m, 3)
+
+    assert list(g.graph.edges(data='weight')) == \
+        list(ref.edges(data='weight'))
+
+    assert g.graph is g.graph
+
+
+def test_set_edges():
+
+    """
+    set_edges() should merge repeated edges in either direction, keeping the
+    last weight, and order the edges like networkx.
+    """
+
+    g = Skimmer()
+
+    g.set_edges(
+        ['a', 'b', 'c'],
+        np.array([2, 0, 1, 2, 0]),
+        np.array([1, 1, 0, 0, 2]),
+        np.array([0.1, 0.2, 0.3, 0.4, 0.5]),
+    )
+
+    ref = nx.Graph()
+    ref.add_nodes_from(['a', 'b', 'c'])
+    ref.add_edge('c', 'b', weight=0.1)
+    ref.add_edge('a', 'b', weight=0.2)
+    ref.add_edge('b', 'a', weight=0.3)
+    ref.add_edge('c', 'a', weight=0.4)
+    ref.add_edge('a', 'c', weight=0.5)
+
+    assert list(zip(
+        g.labels(g.sources),
+        g.labels(g.targets),
+        g.weights.tolist(),
+    )) == list(ref.edges(data='weight'))
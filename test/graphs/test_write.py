@@ -0,0 +1,134 @@
+
+
+import csv
+import pytest
+import numpy as np
+import networkx as nx
+
+from textplot.text import Text
+from textplot.matrix import Matrix
+from textplot.graphs import Skimmer
+
+
+TEXT = 'aa bb cc dd ee ff aa cc ee bb dd aa ff cc gg hh gg aa'
+
+
+@pytest.fixture
+def graph():
+
+    t = Text(TEXT)
+
+    m = Matrix()
+    m.index(t)
+
+    g = Skimmer()
+    g.build(t, m, 3)
+
+    return g
+
+
+def read(path):
+    with open(str(path)) as f:
+        return f.read()
+
+
+def test_gml(graph, tmpdir):
+
+    """
+    write_gml() should match the networkx writer, byte for byte.
+    """
+
+    path = tmpdir.join('g.gml')
+    ref = tmpdir.join('ref.gml')
+
+    graph.write_gml(str(path))
+    nx.write_gml(graph.graph, str(ref))
+
+    assert read(path) == read(ref)
+
+
+def test_graphml(graph, tmpdir):
+
+    """
+    write_graphml() should match the networkx writer, byte for byte.
+    """
+
+    path = tmpdir.join('g.graphml')
+    ref = tmpdir.join('ref.graphml')
+
+    graph.write_graphml(str(path))
+    nx.write_graphml(graph.graph, str(ref))
+
+    assert read(path) == read(ref)
+
+
+def test_csv(graph, tmpdir):
+
+    """
+    write_csv() should write a row for each edge.
+    """
+
+    path = tmpdir.join('g.csv')
+    graph.write_csv(str(path))
+
+    with open(str(path)) as f:
+        rows = list(csv.reader(f))
+
+    assert rows[0] == ['source', 'target', 'weight']
+
+    assert [(s, t, float(w)) for s, t, w in rows[1:]] == \
+        list(graph.graph.edges(data='weight'))
+
+
+def test_npz(graph, tmpdir):
+
+    """
+    write_npz() should write the labels and edge arrays.
+    """
+
+    path = tmpdir.join('g.npz')
+    graph.write_npz(str(path))
+
+    arrays = np.load(str(path))
+
+    assert arrays['nodes'].tolist() == graph.nodes
+    assert (arrays['sources'] == graph.sources).all()
+    assert (arrays['targets'] == graph.targets).all()
+    assert (arrays['weights'] == graph.weights).all()
+
+
+def test_write(graph, tmpdir):
+
+    """
+    write() should pick the format from the extension, and reject unknown
+    formats.
+    """
+
+    path = tmpdir.join('g.graphml')
+    ref = tmpdir.join('ref.graphml')
+
+    graph.write(str(path))
+    graph.write_graphml(str(ref))
+
+    assert read(path) == read(ref)
+
+    with pytest.raises(ValueError):
+        graph.write(str(tmpdir.join('g.txt')))
+
+
+def test_csv_quoting(tmpdir):
+
+    """
+    Labels with commas or quotes should be quoted.
+    """
+
+    g = Skimmer()
+    g.set_edges(['a,b', 'c"d'], [0], [1], [0.5])
+
+    path = tmpdir.join('g.csv')
+    g.write_csv(str(path))
+
+    with open(str(path)) as f:
+        rows = list(csv.reader(f))
+
+    assert rows[1] == ['a,b', 'c"d', '0.5']
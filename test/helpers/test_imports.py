@@ -0,0 +1,76 @@
+
+
+import os
+import sys
+import json
+import pytest
+import subprocess
+
+
+# The most time that `import textplot.helpers` can take, in seconds. It's
+# usually about a quarter of a second on a quiet machine - the budget is tight
+# enough to catch another heavy eager import, so the check is opt-in, with
+# TEXTPLOT_TIME_IMPORTS=1. test_lazy_modules() runs everywhere.
+IMPORT_BUDGET = 0.4
+
+
+# Dependencies that should only be loaded by the code paths that use them.
+LAZY_MODULES = [
+    'matplotlib',
+    'networkx',
+    'nltk',
+    'sklearn',
+    'scipy.signal',
+    'scipy.sparse',
+    'scipy.spatial',
+]
+
+
+def import_helpers():
+
+    """
+    Import textplot.helpers in a fresh interpreter.
+
+    Returns:
+        dict: The import time, and the loaded modules.
+    """
+
+    code = '''
+import sys, json, time
+started = time.perf_counter()
+import textplot.helpers
+print(json.dumps(dict(
+    seconds=time.perf_counter() - started,
+    modules=list(sys.modules),
+)))
+'''
+
+    out = subprocess.check_output([sys.executable, '-c', code])
+
+    return json.loads(out.decode())
+
+
+@pytest.mark.skipif(
+    not os.environ.get('TEXTPLOT_TIME_IMPORTS'),
+    reason='Timing is opt-in, with TEXTPLOT_TIME_IMPORTS=1.',
+)
+def test_import_time():
+
+    """
+    Importing the helpers - and so, starting the CLI - should be fast.
+    """
+
+    assert import_helpers()['seconds'] < IMPORT_BUDGET
+
+
+def test_lazy_modules():
+
+    """
+    Plotting, nltk, scikit-learn, and scipy shouldn't be loaded at import
+    time.
+    """
+
+    modules = set(import_helpers()['modules'])
+
+    for name in LAZY_MODULES:
+        assert name not in modules
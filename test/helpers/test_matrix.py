@@ -0,0 +1,36 @@
+
+
+import pytest
+
+from textplot.helpers import build_graph, build_matrix
+
+
+TEXT = 'aa bb cc dd ee ff aa cc ee bb dd aa ff cc gg hh gg aa ' * 10
+
+
+def test_precomputed_matrix(tmpdir):
+
+    """
+    A matrix indexed from the same text should give the same graph, and a
+    matrix indexed from a different text should be rejected.
+    """
+
+    a = tmpdir.join('a.txt')
+    a.write(TEXT)
+
+    # The same length and vocabulary, in a different order.
+    b = tmpdir.join('b.txt')
+    b.write(' '.join(reversed(TEXT.split())))
+
+    matrix = str(tmpdir.join('matrix'))
+    build_matrix(str(a), matrix, samples=100)
+
+    g = build_graph(str(a), matrix=matrix, skim_depth=3)
+    ref = build_graph(str(a), skim_depth=3, samples=100)
+
+    # The saved scores are single precision.
+    assert list(g.graph.edges) == list(ref.graph.edges)
+    assert g.weights == pytest.approx(ref.weights, rel=1e-6)
+
+    with pytest.raises(ValueError):
+        build_graph(str(b), matrix=matrix, skim_depth=3)
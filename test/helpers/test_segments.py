@@ -0,0 +1,65 @@
+
+
+from textplot.text import Text
+from textplot.matrix import Matrix
+from textplot.graphs import Skimmer
+from textplot.helpers import build_segment_graphs
+
+
+WORDS = ('aa bb aa cc dd aa bb ee ' * 10 + 'ff gg ff hh gg ' * 10).split()
+
+
+def edges(g):
+    return list(g.graph.edges(data='weight'))
+
+
+def test_build_segment_graphs(tmpdir):
+
+    """
+    Each graph should match the graph of a text cut down to the window.
+    """
+
+    path = tmpdir.join('text.txt')
+    path.write(' '.join(WORDS))
+
+    graphs = list(build_segment_graphs(
+        str(path), parts=2, skim_depth=2, bandwidth=5, samples=50,
+    ))
+
+    assert [(s.start, s.stop) for s, _ in graphs] == [(0, 65), (65, 130)]
+
+    for seg, g in graphs:
+
+        t = Text(' '.join(WORDS[seg.start:seg.stop]))
+
+        m = Matrix()
+        m.index(
+            t, sorted(t.most_frequent_terms(1000)), bandwidth=5, samples=50
+        )
+
+        ref = Skimmer()
+        ref.build(t, m, 2)
+
+        assert edges(g) == edges(ref)
+
+
+def test_shared_terms(tmpdir):
+
+    """
+    With shared_terms, each segment should use the frequent terms of the
+    whole text that appear in it.
+    """
+
+    path = tmpdir.join('text.txt')
+    path.write(' '.join(WORDS))
+
+    graphs = list(build_segment_graphs(
+        str(path), size=80, step=50, term_depth=3, skim_depth=1,
+        shared_terms=True, bandwidth=5, samples=50,
+    ))
+
+    assert [(s.start, s.stop) for s, _ in graphs] == [(0, 80), (50, 130)]
+
+    # The top terms in the text are aa, and bb, ff and gg, which tie.
+    assert set(graphs[0][1].nodes) == {'aa', 'bb'}
+    assert set(graphs[1][1].nodes) == {'aa', 'bb', 'ff', 'gg'}
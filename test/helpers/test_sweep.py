@@ -0,0 +1,41 @@
+
+
+from textplot.helpers import build_graph, sweep
+
+
+TEXT = 'aa bb cc dd ee ff aa cc ee bb dd aa ff cc gg hh gg aa ' * 10
+
+
+def edges(g):
+    return list(g.graph.edges(data='weight'))
+
+
+def test_sweep(tmpdir):
+
+    """
+    sweep() should build the same graph as build_graph() for each setting.
+    """
+
+    path = tmpdir.join('text.txt')
+    path.write(TEXT)
+
+    graphs = list(sweep(
+        str(path),
+        bandwidths=(5, 20),
+        kernels=('gaussian', 'linear'),
+        skim_depth=3,
+        samples=100,
+    ))
+
+    assert [s for s, _ in graphs] == [
+        dict(bandwidth=5, kernel='gaussian'),
+        dict(bandwidth=5, kernel='linear'),
+        dict(bandwidth=20, kernel='gaussian'),
+        dict(bandwidth=20, kernel='linear'),
+    ]
+
+    for setting, g in graphs:
+
+        ref = build_graph(str(path), skim_depth=3, samples=100, **setting)
+
+        assert edges(g) == edges(ref)
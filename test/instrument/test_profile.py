@@ -0,0 +1,101 @@
+
+
+import io
+import json
+import pytest
+import numpy as np
+
+from textplot.instrument import Profile
+
+
+def test_stage():
+
+    """
+    stage() should record the time of a stage, along with any fields set by
+    the caller.
+    """
+
+    profile = Profile(path='war-and-peace.txt')
+
+    with profile.stage('tokenize', chunks=3) as record:
+        record['tokens'] = 10
+
+    record, = profile.records
+
+    assert record['stage'] == 'tokenize'
+    assert record['path'] == 'war-and-peace.txt'
+    assert record['chunks'] == 3
+    assert record['tokens'] == 10
+
+    assert record['seconds'] >= 0
+    assert record['cpu_seconds'] >= 0
+    assert 'peak_bytes' not in record
+
+
+def test_trace_memory():
+
+    """
+    When trace_memory is set, record the peak memory allocated in the stage.
+    """
+
+    profile = Profile(trace_memory=True)
+
+    with profile.stage('alloc'):
+        a = np.ones(2**20)
+        del a
+
+    assert profile.records[0]['peak_bytes'] >= 8 * 2**20
+
+
+def test_failed_stage():
+
+    """
+    When a stage raises, it should still be recorded.
+    """
+
+    profile = Profile()
+
+    with pytest.raises(ValueError):
+        with profile.stage('index'):
+            raise ValueError
+
+    assert profile.records[0]['stage'] == 'index'
+
+
+def test_rate():
+
+    """
+    rate() should set a throughput field.
+    """
+
+    profile = Profile()
+
+    with profile.stage('index') as record:
+        pass
+
+    record['seconds'] = 2
+    profile.rate(record, 'pairs_per_second', 10)
+
+    assert record['pairs_per_second'] == 5
+
+
+def test_write_jsonl():
+
+    """
+    write_jsonl() should write one JSON object per record.
+    """
+
+    profile = Profile()
+
+    with profile.stage('tokenize'):
+        pass
+
+    profile.add('caches', hits=1)
+
+    f = io.StringIO()
+    profile.write_jsonl(f)
+
+    lines = [json.loads(line) for line in f.getvalue().splitlines()]
+
+    assert [line['stage'] for line in lines] == ['tokenize', 'caches']
+    assert lines[1]['hits'] == 1
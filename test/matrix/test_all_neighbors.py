@@ -0,0 +1,40 @@
+
+
+from textplot.text import Text
+from textplot.matrix import Matrix
+
+
+def test_all_neighbors():
+
+    """
+    all_neighbors() should yield the neighbors for every indexed term.
+    """
+
+    t = Text('aa bb cc dd ee ff aa cc ee')
+    m = Matrix()
+
+    m.index(t)
+
+    neighbors = dict(m.all_neighbors(2))
+
+    assert set(neighbors.keys()) == m.keys
+
+    for term in m.terms:
+        assert neighbors[term] == m.neighbors(term, 2)
+
+
+def test_blocks():
+
+    """
+    The neighbors should be the same, regardless of the block size.
+    """
+
+    t = Text('aa bb cc dd ee ff aa cc ee')
+    m = Matrix()
+
+    m.index(t)
+
+    assert (
+        list(m.all_neighbors(2, block_size=1)) ==
+        list(m.all_neighbors(2))
+    )
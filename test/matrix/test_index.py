@@ -1,5 +1,7 @@
 
 
+import numpy as np
+
 from textplot.text import Text
 from textplot.matrix import Matrix
 
@@ -37,3 +39,53 @@ def test_term_subset():
     # Should ignore 'cc'.
     assert not m.get_pair('aa', 'cc')
     assert not m.get_pair('bb', 'cc')
+
+
+def test_metric():
+
+    """
+    When a metric is passed, index pairs with the corresponding score.
+    """
+
+    t = Text('aa bb cc aa bb aa')
+    m = Matrix()
+
+    m.index(t, metric='cosine')
+    assert abs(m.get_pair('aa', 'bb') - t.score_cosine('aa', 'bb')) < 1e-12
+
+    m.index(t, metric='intersect')
+    assert abs(m.get_pair('aa', 'cc') - t.score_intersect('aa', 'cc')) < 1e-12
+
+
+def test_dtype():
+
+    """
+    When a dtype is passed, store the scores with that precision.
+    """
+
+    t = Text('aa bb cc dd')
+    m = Matrix(dtype=np.float32)
+
+    m.index(t)
+
+    # 4 bytes for each of the 6 pairs.
+    assert m.scores.nbytes == 24
+    assert abs(m.get_pair('aa', 'bb') - t.score_braycurtis('aa', 'bb')) < 1e-6
+
+
+def test_workers():
+
+    """
+    When workers > 1, the scores should be identical to the serial path.
+    """
+
+    t = Text('aa bb cc dd ee aa cc ee bb dd aa')
+
+    m1 = Matrix()
+    m1.index(t)
+
+    m2 = Matrix()
+    m2.index(t, workers=2)
+
+    assert m2.terms == m1.terms
+    assert (m2.scores == m1.scores).all()
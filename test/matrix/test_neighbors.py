@@ -0,0 +1,64 @@
+
+
+from textplot.text import Text
+from textplot.matrix import Matrix
+
+
+def test_neighbors():
+
+    """
+    neighbors() should return the k highest-scoring terms, in descending
+    order.
+    """
+
+    t = Text('aa bb cc dd ee')
+    m = Matrix()
+
+    m.index(t)
+
+    pairs = m.neighbors('aa', 2)
+
+    assert list(pairs.keys()) == ['bb', 'cc']
+    assert pairs['bb'] == m.get_pair('aa', 'bb')
+    assert pairs['cc'] == m.get_pair('aa', 'cc')
+
+
+def test_match_anchored_pairs():
+
+    """
+    The neighbors should be the head of the anchored_pairs() ordering.
+    """
+
+    t = Text('aa bb cc dd ee ff aa cc ee')
+    m = Matrix()
+
+    m.index(t)
+
+    for term in m.terms:
+        head = list(m.anchored_pairs(term).items())[:3]
+        assert list(m.neighbors(term, 3).items()) == head
+
+
+def test_skip_unset_pairs():
+
+    """
+    Unset pairs should be skipped, even if k is larger than the number of set
+    pairs.
+    """
+
+    m = Matrix()
+    m.set_pair('a', 'b', 0.5)
+    m.set_pair('c', 'd', 0.1)
+
+    assert list(m.neighbors('a', 3).items()) == [('b', 0.5)]
+
+
+def test_missing_anchor():
+
+    """
+    An unindexed anchor should have no neighbors.
+    """
+
+    m = Matrix()
+
+    assert m.neighbors('a', 3) == {}
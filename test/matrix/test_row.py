@@ -0,0 +1,42 @@
+
+
+import numpy as np
+
+from textplot.matrix import Matrix
+
+
+def test_row():
+
+    """
+    row() should return the scores between a term and all indexed terms, in
+    vocabulary order, with NaN for the term itself.
+    """
+
+    m = Matrix()
+    m.set_pair('a', 'b', 1)
+    m.set_pair('a', 'c', 2)
+    m.set_pair('b', 'c', 3)
+
+    a = m.row('a')
+    assert np.isnan(a[0])
+    assert list(a[1:]) == [1, 2]
+
+    b = m.row('b')
+    assert np.isnan(b[1])
+    assert b[0] == 1 and b[2] == 3
+
+
+def test_unset_pairs():
+
+    """
+    Pairs that haven't been set should be NaN.
+    """
+
+    m = Matrix()
+    m.set_pair('a', 'b', 1)
+    m.set_pair('c', 'd', 2)
+
+    c = m.row('c')
+    assert np.isnan(c[0])
+    assert np.isnan(c[1])
+    assert c[3] == 2
@@ -0,0 +1,91 @@
+
+
+import numpy as np
+import pytest
+import os
+
+from textplot.text import Text
+from textplot.matrix import Matrix
+
+
+def test_save_load(tmpdir):
+
+    """
+    load() should restore the vocabulary and scores written by save(), as a
+    read-only memory-mapped float32 array.
+    """
+
+    t = Text('aa bb cc dd aa cc')
+    m1 = Matrix()
+    m1.index(t)
+
+    path = str(tmpdir.join('matrix'))
+    m1.save(path)
+
+    m2 = Matrix.load(path)
+
+    assert isinstance(m2.scores, np.memmap)
+    assert m2.terms == m1.terms
+
+    for t1 in m1.terms:
+        for t2 in m1.terms:
+            if t1 != t2:
+                expected = np.float32(m1.get_pair(t1, t2))
+                assert m2.get_pair(t1, t2) == expected
+
+    assert list(m2.neighbors('aa', 2)) == list(m1.neighbors('aa', 2))
+
+
+def test_file_format(tmpdir):
+
+    """
+    The scores should be written as a raw float32 array.
+    """
+
+    m = Matrix()
+    m.set_pair('a', 'b', 1)
+    m.set_pair('a', 'c', 2)
+    m.set_pair('b', 'c', 3)
+
+    path = str(tmpdir.join('matrix'))
+    m.save(path)
+
+    with open(os.path.join(path, 'vocab.txt')) as f:
+        assert f.read() == 'a\nb\nc\n'
+
+    scores = np.fromfile(os.path.join(path, 'scores.f32'), np.float32)
+    assert list(scores) == [1, 2, 3]
+
+
+def test_no_mmap(tmpdir):
+
+    """
+    When mmap=False, read the scores into memory.
+    """
+
+    m = Matrix()
+    m.set_pair('a', 'b', 1)
+
+    path = str(tmpdir.join('matrix'))
+    m.save(path)
+
+    assert not isinstance(Matrix.load(path, mmap=False).scores, np.memmap)
+
+
+def test_size_mismatch(tmpdir):
+
+    """
+    If the score file doesn't match the vocabulary, raise a ValueError.
+    """
+
+    m = Matrix()
+    m.set_pair('a', 'b', 1)
+
+    path = str(tmpdir.join('matrix'))
+    m.save(path)
+
+    with open(os.path.join(path, 'vocab.txt'), 'a') as f:
+        f.write('c\n')
+
+    with pytest.raises(ValueError):
+        Matrix.load(path)
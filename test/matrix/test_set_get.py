@@ -39,3 +39,21 @@ def test_missing_key():
     m.set_pair('a', 'b', 1)
 
     assert m.get_pair('a', 'c') == None
+
+
+def test_self_pair():
+
+    """
+    Setting a term against itself shouldn't touch the stored pairs.
+    """
+
+    m = Matrix()
+    m.set_pair('a', 'b', 0.1)
+    m.set_pair('a', 'c', 0.2)
+    m.set_pair('b', 'c', 0.3)
+    m.set_pair('a', 'a', 0.9)
+
+    assert m.get_pair('a', 'b') == 0.1
+    assert m.get_pair('a', 'c') == 0.2
+    assert m.get_pair('b', 'c') == 0.3
+    assert m.get_pair('a', 'a') == None
@@ -0,0 +1,153 @@
+
+
+import numpy as np
+
+from textplot.text import Text
+from textplot.matrix import Matrix
+
+
+TEXT = 'aa bb cc dd ee aa cc ee bb dd aa ff bb ff cc'
+
+
+def assert_matches_index(m, t, terms, **kwargs):
+
+    """
+    The scores in an updated matrix should match a fresh index.
+    """
+
+    fresh = Matrix()
+    fresh.index(t, terms, **kwargs)
+
+    assert sorted(m.terms) == sorted(fresh.terms)
+
+    for t1 in fresh.terms:
+        for t2 in fresh.terms:
+            assert m.get_pair(t1, t2) == fresh.get_pair(t1, t2)
+
+
+def test_add_terms():
+
+    """
+    When terms are added, score just the pairs that involve a new term.
+    """
+
+    t = Text(TEXT)
+    m = Matrix()
+
+    m.index(t, ['aa', 'bb', 'cc'])
+
+    # 3 new x 3 old, plus 3 new x new.
+    assert m.update(t, ['aa', 'bb', 'cc', 'dd', 'ee', 'ff']) == 12
+
+    assert m.terms == ['aa', 'bb', 'cc', 'dd', 'ee', 'ff']
+    assert_matches_index(m, t, ['aa', 'bb', 'cc', 'dd', 'ee', 'ff'])
+
+
+def test_drop_terms():
+
+    """
+    Terms that are no longer in the list should be dropped, and the pairs
+    between the surviving terms should be kept.
+    """
+
+    t = Text(TEXT)
+    m = Matrix()
+
+    m.index(t, ['aa', 'bb', 'cc', 'dd', 'ee'])
+
+    assert m.update(t, ['ee', 'bb', 'dd']) == 0
+
+    assert m.terms == ['bb', 'dd', 'ee']
+    assert m.size == len(m.scores) == 3
+    assert_matches_index(m, t, ['bb', 'dd', 'ee'])
+
+
+def test_add_and_drop_terms():
+
+    """
+    Terms can be added and dropped in the same update.
+    """
+
+    t = Text(TEXT)
+    m = Matrix()
+
+    m.index(t, ['aa', 'bb', 'cc', 'dd'])
+
+    # 2 new x 2 old, plus 1 new x new.
+    assert m.update(t, ['bb', 'dd', 'ee', 'ff']) == 5
+
+    assert m.terms == ['bb', 'dd', 'ee', 'ff']
+    assert_matches_index(m, t, ['bb', 'dd', 'ee', 'ff'])
+
+
+def test_workers():
+
+    """
+    When workers > 1, the new pairs should be scored across a pool.
+    """
+
+    t = Text(TEXT)
+    m = Matrix()
+
+    m.index(t, ['aa', 'bb', 'cc'])
+    m.update(t, ['aa', 'cc', 'dd', 'ee', 'ff'], workers=2)
+
+    assert_matches_index(m, t, ['aa', 'cc', 'dd', 'ee', 'ff'])
+
+
+def test_changed_params():
+
+    """
+    If the metric or KDE parameters change, rescore all pairs.
+    """
+
+    t = Text(TEXT)
+    m = Matrix()
+
+    m.index(t, ['aa', 'bb', 'cc'])
+
+    assert m.update(t, ['aa', 'bb', 'cc'], bandwidth=2000) == 0
+    assert m.update(t, ['aa', 'bb', 'cc'], bandwidth=1000) == 3
+    assert m.update(t, ['aa', 'bb', 'cc'], metric='cosine') == 3
+
+    assert_matches_index(m, t, ['aa', 'bb', 'cc'], metric='cosine')
+
+
+def test_changed_text():
+
+    """
+    If the text changes, rescore all pairs - even if it has the same length.
+    """
+
+    t1 = Text('aa bb cc aa bb cc aa dd')
+    t2 = Text('aa dd dd bb cc bb cc aa')
+
+    m = Matrix()
+
+    m.index(t1, ['aa', 'bb'])
+
+    # 3 pairs among the new terms, since none of the old scores are kept.
+    assert m.update(t2, ['aa', 'bb', 'cc']) == 3
+
+    assert_matches_index(m, t2, ['aa', 'bb', 'cc'])
+
+
+def test_update_loaded(tmpdir):
+
+    """
+    A saved matrix should keep its parameters, so that it can be updated
+    after it is loaded.
+    """
+
+    t = Text(TEXT)
+    m1 = Matrix()
+
+    m1.index(t, ['aa', 'bb', 'cc'])
+
+    path = str(tmpdir.join('matrix'))
+    m1.save(path)
+
+    m2 = Matrix.load(path)
+
+    assert m2.update(t, ['aa', 'bb', 'cc', 'dd']) == 3
+    assert np.float32(m1.get_pair('aa', 'bb')) == m2.get_pair('aa', 'bb')
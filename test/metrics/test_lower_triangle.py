@@ -0,0 +1,53 @@
+
+
+import numpy as np
+
+from textplot.metrics import pairwise, lower_triangle
+
+
+def test_lower_triangle():
+
+    """
+    lower_triangle() should return the scores to the left of the diagonal, in
+    row-major order.
+    """
+
+    kdes = np.random.RandomState(0).rand(4, 10)
+    scores = pairwise(kdes)
+
+    assert list(lower_triangle(kdes, 0, 4)) == [
+        scores[1, 0],
+        scores[2, 0], scores[2, 1],
+        scores[3, 0], scores[3, 1], scores[3, 2],
+    ]
+
+
+def test_row_range():
+
+    """
+    A range of rows should map onto a contiguous slice of the full triangle.
+    """
+
+    kdes = np.random.RandomState(0).rand(6, 10)
+
+    full = lower_triangle(kdes, 0, 6)
+
+    # Rows 3-4 start after 0+1+2 pairs.
+    assert (lower_triangle(kdes, 3, 5) == full[3:10]).all()
+
+
+def test_blocks():
+
+    """
+    Ranges that span several row blocks should match the full score matrix.
+    """
+
+    kdes = np.random.RandomState(0).rand(300, 10)
+
+    scores = pairwise(kdes)
+    rows = np.arange(300)[:, np.newaxis]
+
+    full = scores[np.arange(300) < rows]
+
+    assert np.allclose(lower_triangle(kdes, 0, 300), full, rtol=0, atol=0)
+    assert (lower_triangle(kdes, 100, 290) == full[4950:41905]).all()
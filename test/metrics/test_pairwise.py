@@ -0,0 +1,90 @@
+
+
+import numpy as np
+import pytest
+
+from scipy.spatial import distance
+from textplot.metrics import pairwise, metric_rows
+
+
+def test_braycurtis():
+
+    """
+    pairwise() should match scipy's per-pair Bray-Curtis scores, up to
+    round-off.
+    """
+
+    kdes = np.random.RandomState(0).rand(5, 20)
+
+    scores = pairwise(kdes)
+
+    for i in range(5):
+        for j in range(5):
+            assert np.isclose(
+                scores[i, j],
+                1-distance.braycurtis(kdes[i], kdes[j]),
+                rtol=1e-14, atol=0,
+            )
+
+
+def test_cosine():
+
+    """
+    metric='cosine' should score the cosine similarity.
+    """
+
+    kdes = np.random.RandomState(0).rand(5, 20)
+
+    scores = pairwise(kdes, metric='cosine')
+
+    for i in range(5):
+        for j in range(5):
+            expected = 1-distance.cosine(kdes[i], kdes[j])
+            assert abs(scores[i, j] - expected) < 1e-12
+
+
+def test_blocks():
+
+    """
+    The scores should be the same, regardless of the block size.
+    """
+
+    kdes = np.random.RandomState(0).rand(7, 20)
+
+    assert (pairwise(kdes, block_bytes=1) == pairwise(kdes)).all()
+
+
+def test_metric_rows():
+
+    """
+    Metrics that don't broadcast should be blocked by the size of their
+    output, not the number of samples.
+    """
+
+    assert metric_rows('braycurtis', 1500, 1000, 1000) == 1048
+    assert metric_rows('cosine', 1500, 1000, 10**6) == 1048
+    assert metric_rows('intersect', 1500, 1000, 1000) == 4
+
+
+def test_unknown_metric():
+
+    """
+    An unknown metric should raise a ValueError.
+    """
+
+    with pytest.raises(ValueError):
+        pairwise(np.ones((2, 2)), metric='euclidean')
+
+
+def test_float32():
+
+    """
+    Single-precision densities should get single-precision scores.
+    """
+
+    kdes = np.random.RandomState(0).rand(5, 20)
+
+    scores = pairwise(kdes.astype(np.float32))
+
+    assert scores.dtype == np.float32
+    assert np.allclose(scores, pairwise(kdes), rtol=1e-5)
@@ -0,0 +1,32 @@
+
+
+import numpy as np
+import pytest
+
+from textplot.metrics import pairwise, shortlist
+
+
+@pytest.mark.parametrize('metric', ['braycurtis', 'cosine', 'intersect'])
+def test_shortlist(metric):
+
+    """
+    shortlist() should match the corresponding pairwise() scores.
+    """
+
+    kdes = np.random.RandomState(0).rand(6, 20)
+    ids = np.array([[1, 2], [0, 5], [4, 3], [2, 1], [5, 0], [3, 4]])
+
+    scores = shortlist(kdes, ids, metric, block_bytes=1)
+    expected = np.take_along_axis(pairwise(kdes, metric=metric), ids, 1)
+
+    assert np.allclose(scores, expected, rtol=1e-12, atol=0)
+
+
+def test_unknown_metric():
+
+    """
+    An unknown metric should raise a ValueError.
+    """
+
+    with pytest.raises(ValueError):
+        shortlist(np.ones((2, 2)), np.array([[1], [0]]), 'euclidean')
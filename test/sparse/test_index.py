@@ -0,0 +1,116 @@
+
+
+import pytest
+
+from textplot.text import Text
+from textplot.matrix import Matrix
+from textplot.sparse import SparseMatrix
+
+
+TEXT = 'aa bb cc dd ee ff aa cc ee bb dd aa ff cc gg hh gg aa'
+
+
+@pytest.mark.parametrize('block_size', [1, 10, 2**22])
+def test_top_k(block_size):
+
+    """
+    With k, keep the k nearest neighbors of each term, regardless of the
+    block size.
+    """
+
+    t = Text(TEXT)
+
+    m = Matrix()
+    m.index(t)
+
+    s = SparseMatrix()
+    s.index(t, k=3, block_size=block_size)
+
+    assert s.terms == m.terms
+
+    for term in m.terms:
+        assert s.neighbors(term, 3) == m.neighbors(term, 3)
+
+
+def test_threshold():
+
+    """
+    With a threshold, keep all scores at or above the threshold.
+    """
+
+    t = Text(TEXT)
+
+    m = Matrix()
+    m.index(t)
+
+    s = SparseMatrix()
+    s.index(t, threshold=0.5, block_size=10)
+
+    for term in m.terms:
+
+        expected = [
+            (neighbor, score)
+            for neighbor, score in m.anchored_pairs(term).items()
+            if score >= 0.5
+        ]
+
+        assert list(s.anchored_pairs(term).items()) == expected
+
+
+def test_top_k_and_threshold():
+
+    """
+    With k and a threshold, keep the k nearest neighbors above the threshold.
+    """
+
+    t = Text(TEXT)
+
+    m = Matrix()
+    m.index(t)
+
+    s = SparseMatrix()
+    s.index(t, k=3, threshold=0.5)
+
+    for term in m.terms:
+
+        expected = [
+            (neighbor, score)
+            for neighbor, score in m.anchored_pairs(term).items()
+            if score >= 0.5
+        ]
+
+        assert list(s.anchored_pairs(term).items()) == expected[:3]
+
+
+def test_no_cutoff():
+
+    """
+    If neither k nor a threshold is passed, raise a ValueError.
+    """
+
+    with pytest.raises(ValueError):
+        SparseMatrix().index(Text(TEXT))
+
+
+def test_shortlist():
+
+    """
+    With a shortlist, the neighbors should be drawn from the candidates, and
+    scored exactly.
+    """
+
+    t = Text(TEXT)
+
+    m = Matrix()
+    m.index(t)
+
+    s = SparseMatrix()
+    s.index(t, k=2, shortlist=4)
+
+    for term in s.terms:
+
+        neighbors = s.neighbors(term, 2)
+        assert 0 < len(neighbors) <= 2
+
+        for neighbor, score in neighbors.items():
+            assert score == m.get_pair(term, neighbor)
@@ -0,0 +1,73 @@
+
+
+import numpy as np
+
+from textplot.text import Text
+from textplot.matrix import Matrix
+from textplot.sparse import SparseMatrix
+
+
+TEXT = 'aa bb cc dd ee ff aa cc ee bb dd aa ff cc gg hh gg aa'
+
+
+def test_get_pair():
+
+    """
+    get_pair() should return the scores for kept pairs, and None otherwise.
+    """
+
+    t = Text(TEXT)
+
+    m = Matrix()
+    m.index(t)
+
+    s = SparseMatrix()
+    s.index(t, k=1)
+
+    for term in m.terms:
+
+        (neighbor, score), = m.neighbors(term, 1).items()
+
+        assert s.get_pair(term, neighbor) == score
+        assert s.get_pair(neighbor, term) == score
+
+    assert s.get_pair('aa', 'aa') is None
+    assert s.get_pair('aa', 'zz') is None
+
+
+def test_row():
+
+    """
+    row() should expand the kept scores for a term, with NaNs for the rest.
+    """
+
+    t = Text(TEXT)
+
+    s = SparseMatrix()
+    s.index(t, k=2)
+
+    row = s.row('aa')
+
+    assert np.count_nonzero(~np.isnan(row)) == 2
+
+    for neighbor, score in s.neighbors('aa', 2).items():
+        assert row[s.vocab[neighbor]] == score
+
+
+def test_all_neighbors():
+
+    """
+    all_neighbors() should yield the neighbors for every indexed term.
+    """
+
+    t = Text(TEXT)
+
+    s = SparseMatrix()
+    s.index(t, k=3)
+
+    neighbors = dict(s.all_neighbors(2))
+
+    assert set(neighbors.keys()) == s.keys
+
+    for term in s.terms:
+        assert neighbors[term] == s.neighbors(term, 2)
@@ -0,0 +1,28 @@
+
+
+from textplot.stream import iter_words
+
+
+def test_iter_words():
+
+    """
+    iter_words() should yield the lowercased words in each chunk.
+    """
+
+    words = list(iter_words(['One two. ', 'Three!']))
+
+    assert words == [['one', 'two'], ['three']]
+
+
+def test_split_words():
+
+    """
+    Words that are split across chunk boundaries should be stitched back
+    together.
+    """
+
+    chunks = ['aa bb', 'b c', 'c', 'c dd']
+
+    words = [w for ws in iter_words(chunks) for w in ws]
+
+    assert words == ['aa', 'bbb', 'ccc', 'dd']
@@ -0,0 +1,61 @@
+
+
+import numpy as np
+
+from textplot.stream import tokenize_stream
+from textplot.utils import tokenize_arrays
+
+
+TEXT = 'The cats and the dog. Cats chase dogs; the dog chases a cat.'
+
+
+def chunk(text, size):
+    return [text[i:i+size] for i in range(0, len(text), size)]
+
+
+def test_tokenize_stream(tmpdir):
+
+    """
+    tokenize_stream() should produce the same token arrays as
+    tokenize_arrays(), regardless of the chunk and block sizes.
+    """
+
+    stopwords = set(['the', 'and', 'a'])
+
+    expected = tokenize_arrays(TEXT, stopwords)
+
+    for size in [1, 5, 1000]:
+
+        path = str(tmpdir.join(str(size)))
+
+        arrays = tokenize_stream(
+            chunk(TEXT, size), path, stopwords, block_size=size
+        )
+
+        for name in expected:
+            assert np.array_equal(arrays[name], expected[name])
+
+
+def test_offsets(tmpdir):
+
+    """
+    The offsets should be grouped by stem, in text order, across blocks.
+    """
+
+    arrays = tokenize_stream(['aa bb aa cc bb aa'], str(tmpdir), block_size=2)
+
+    assert arrays['offsets'].tolist() == [0, 2, 5, 1, 4, 3]
+    assert arrays['indptr'].tolist() == [0, 3, 5, 6]
+    assert arrays['form_counts'].tolist() == [3, 2, 1]
+
+
+def test_memmap(tmpdir):
+
+    """
+    The per-token arrays should be memory-mapped from the directory.
+    """
+
+    arrays = tokenize_stream(['aa bb cc'], str(tmpdir))
+
+    assert isinstance(arrays['token_forms'], np.memmap)
+    assert isinstance(arrays['offsets'], np.memmap)
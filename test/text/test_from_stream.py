@@ -0,0 +1,25 @@
+
+
+import numpy as np
+
+from textplot.text import Text
+
+
+def test_from_stream(tmpdir):
+
+    """
+    from_stream() should tokenize a file in chunks, with the same results as
+    from_file().
+    """
+
+    path = tmpdir.join('text.txt')
+    path.write('Cats and dogs. The cat chased the dogs, and a dog ran.')
+
+    t1 = Text.from_file(str(path))
+    t2 = Text.from_stream(str(path), chunk_size=4)
+
+    assert list(t2.tokens) == list(t1.tokens)
+    assert t2.terms == t1.terms
+    assert t2.unstem('dog') == t1.unstem('dog')
+
+    assert np.array_equal(t2.kde('dog'), t1.kde('dog'))
@@ -0,0 +1,84 @@
+
+
+import gc
+import weakref
+import numpy as np
+import pytest
+
+from textplot.text import Text
+
+
+def test_estimators():
+
+    """
+    The binned estimator should match the sklearn reference.
+    """
+
+    t = Text('aa bb aa cc aa bb ' * 100)
+
+    ref = t.kde('aa', bandwidth=50, samples=100, estimator='sklearn')
+    kde = t.kde('aa', bandwidth=50, samples=100)
+
+    assert np.abs(kde - ref).sum() / ref.sum() < 1e-3
+
+
+def test_unknown_estimator():
+
+    """
+    An unknown estimator should raise a ValueError.
+    """
+
+    t = Text('aa bb cc')
+
+    with pytest.raises(ValueError):
+        t.kde('aa', estimator='histogram')
+
+
+def test_cache():
+
+    """
+    Repeated calls with the same arguments should hit the instance cache.
+    """
+
+    t = Text('aa bb cc')
+
+    kde1 = t.kde('aa', bandwidth=100)
+    kde2 = t.kde('aa', bandwidth=100)
+    kde3 = t.kde('aa', bandwidth=200)
+
+    assert kde1 is kde2
+    assert kde1 is not kde3
+
+    assert t.kde_cache.hits == 1
+    assert t.kde_cache.misses == 2
+
+
+def test_cache_size():
+
+    """
+    The cache should be bounded by the size passed to the text.
+    """
+
+    t = Text('aa bb cc', cache_size=2)
+
+    t.kde('aa')
+    t.kde('bb')
+    t.kde('cc')
+
+    assert len(t.kde_cache) == 2
+
+
+def test_release_text():
+
+    """
+    Cached KDEs shouldn't keep the text alive.
+    """
+
+    t = Text('aa bb cc')
+    t.kde('aa')
+
+    ref = weakref.ref(t)
+    del t
+    gc.collect()
+
+    assert ref() is None
@@ -0,0 +1,88 @@
+
+
+import numpy as np
+
+from textplot.text import Text
+
+
+def test_kde_matrix():
+
+    """
+    kde_matrix() should stack the densities of the passed terms, in order.
+    """
+
+    t = Text('aa bb aa cc aa bb ' * 20)
+
+    kdes, index = t.kde_matrix(['cc', 'aa'], bandwidth=20, samples=50)
+
+    assert kdes.shape == (2, 50)
+    assert kdes.flags['C_CONTIGUOUS']
+
+    assert list(index.items()) == [('cc', 0), ('aa', 1)]
+
+    assert (kdes[0] == t.kde('cc', bandwidth=20, samples=50)).all()
+    assert (kdes[1] == t.kde('aa', bandwidth=20, samples=50)).all()
+
+
+def test_estimator():
+
+    """
+    The estimator should be passed through to the density functions.
+    """
+
+    t = Text('aa bb aa cc aa bb ' * 20)
+
+    kdes, _ = t.kde_matrix(['aa', 'bb'], bandwidth=20, estimator='exact')
+
+    assert np.allclose(kdes[0], t.kde('aa', bandwidth=20, estimator='exact'))
+    assert np.allclose(kdes[1], t.kde('bb', bandwidth=20, estimator='exact'))
+
+
+def test_dtype():
+
+    """
+    When float32 is passed, return single-precision densities.
+    """
+
+    t = Text('aa bb aa cc aa bb ' * 20)
+
+    kdes, _ = t.kde_matrix(['aa', 'bb'], bandwidth=20, dtype=np.float32)
+    ref, _ = t.kde_matrix(['aa', 'bb'], bandwidth=20)
+
+    assert kdes.dtype == np.float32
+    assert np.allclose(kdes, ref, rtol=1e-6)
+
+    assert t.kde('aa', bandwidth=20, dtype=np.float32).dtype == np.float32
+
+
+def test_auto_samples():
+
+    """
+    When samples='auto', sample the densities 3 times per bandwidth.
+    """
+
+    t = Text('aa bb aa cc aa bb ' * 20)
+
+    kdes, _ = t.kde_matrix(['aa', 'bb'], bandwidth=20, samples='auto')
+
+    # 120 tokens / 20 * 3, plus the endpoint.
+    assert kdes.shape == (2, 19)
+    assert (kdes[0] == t.kde('aa', bandwidth=20, samples=19)).all()
+
+
+def test_cache():
+
+    """
+    Repeated calls with the same terms and arguments should hit the instance
+    cache, and return a read-only array.
+    """
+
+    t = Text('aa bb aa cc aa bb ' * 20)
+
+    kdes1, _ = t.kde_matrix(['aa', 'bb'], bandwidth=20)
+    kdes2, _ = t.kde_matrix(['aa', 'bb'], bandwidth=20)
+
+    assert kdes2 is kdes1
+    assert not kdes1.flags.writeable
+
+    assert t.kde_cache.hits == 1
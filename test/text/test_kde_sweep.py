@@ -0,0 +1,65 @@
+
+
+import numpy as np
+
+from textplot.text import Text
+
+
+SETTINGS = [(10, 'gaussian'), (20, 'gaussian'), (20, 'epanechnikov')]
+
+
+def test_kde_sweep():
+
+    """
+    kde_sweep() should match kde_matrix() for each setting.
+    """
+
+    t1 = Text('aa bb aa cc aa bb ' * 20)
+    t2 = Text('aa bb aa cc aa bb ' * 20)
+
+    kdes, index = t1.kde_sweep(['cc', 'aa'], SETTINGS, samples=50)
+
+    assert list(index.items()) == [('cc', 0), ('aa', 1)]
+
+    for (bandwidth, kernel), k in zip(SETTINGS, kdes):
+
+        ref, _ = t2.kde_matrix(
+            ['cc', 'aa'], bandwidth=bandwidth, samples=50, kernel=kernel
+        )
+
+        assert (k == ref).all()
+
+
+def test_estimator():
+
+    """
+    The other estimators should be run once per setting.
+    """
+
+    t = Text('aa bb aa cc aa bb ' * 20)
+
+    kdes, _ = t.kde_sweep(['aa'], SETTINGS, samples=50, estimator='exact')
+
+    for (bandwidth, kernel), k in zip(SETTINGS, kdes):
+        assert np.allclose(k[0], t.kde(
+            'aa', bandwidth, 50, kernel, estimator='exact'
+        ))
+
+
+def test_cache():
+
+    """
+    The densities should be cached for later kde_matrix() calls.
+    """
+
+    t = Text('aa bb aa cc aa bb ' * 20)
+
+    kdes, _ = t.kde_sweep(['aa', 'bb'], SETTINGS, samples='auto')
+
+    for (bandwidth, kernel), k in zip(SETTINGS, kdes):
+        ref, _ = t.kde_matrix(
+            ['aa', 'bb'], bandwidth=bandwidth, samples='auto', kernel=kernel
+        )
+        assert ref is k
+
+    assert t.kde_cache.hits == len(SETTINGS)
@@ -30,3 +30,25 @@ def test_merge_smallest_bucket():
 
     # Top 2 words are 'cc' and 'bb'
     assert t.most_frequent_terms(2) == set(['dd', 'cc', 'bb'])
+
+
+def test_depth_past_vocabulary():
+
+    """
+    When the depth is larger than the vocabulary, return all terms.
+    """
+
+    t = Text('aa bb bb cc cc cc')
+
+    assert t.most_frequent_terms(10) == set(['aa', 'bb', 'cc'])
+
+
+def test_zero_depth():
+
+    """
+    When the depth is 0, return no terms.
+    """
+
+    t = Text('aa bb bb cc cc cc')
+
+    assert t.most_frequent_terms(0) == set()
@@ -0,0 +1,116 @@
+
+
+import pytest
+import numpy as np
+
+from textplot.text import Text
+from textplot.matrix import Matrix
+from textplot.utils import partitions
+
+
+WORDS = ('aa bb aa cc dd aa bb ee ' * 10 + 'ff gg ff hh gg ' * 10).split()
+
+
+def test_segment():
+
+    """
+    A segment should have the same tokens, offsets and densities as a text
+    made from just the words in the window.
+    """
+
+    t = Text(' '.join(WORDS))
+
+    seg = t.segment(60, 110)
+    ref = Text(' '.join(WORDS[60:110]))
+
+    assert len(seg.tokens) == 50
+    assert seg.tokens[:] == ref.tokens[:]
+
+    for term in ref.stems:
+
+        assert seg.terms[term] == ref.terms[term]
+
+        assert np.allclose(
+            seg.kde(term, bandwidth=5, samples=20),
+            ref.kde(term, bandwidth=5, samples=20),
+        )
+
+    assert seg.most_frequent_terms(10) == ref.most_frequent_terms(10)
+
+
+def test_missing_terms():
+
+    """
+    Terms outside the window should be left out of the terms, and shouldn't
+    be picked as frequent terms.
+    """
+
+    t = Text(' '.join(WORDS))
+
+    seg = t.segment(0, 80)
+
+    assert 'ff' not in seg.terms
+    assert list(seg.terms) == ['aa', 'bb', 'cc', 'dd', 'ee']
+    assert len(seg.terms) == 5
+
+    assert list(seg.term_counts()) == ['aa', 'bb', 'cc', 'dd', 'ee']
+    assert seg.most_frequent_terms(100) == {'aa', 'bb', 'cc', 'dd', 'ee'}
+
+    with pytest.raises(KeyError):
+        seg.kde('ff')
+
+
+def test_index_segment():
+
+    """
+    A segment should be indexed over just the terms in its window.
+    """
+
+    t = Text(' '.join(WORDS))
+
+    seg = t.segment(0, 80)
+
+    m = Matrix()
+    m.index(seg, bandwidth=5, samples=20)
+
+    assert sorted(m.terms) == ['aa', 'bb', 'cc', 'dd', 'ee']
+    assert not np.isnan(m.scores).any()
+
+
+def test_unstem():
+
+    """
+    Terms should be unstemmed with the counts from the full text.
+    """
+
+    t = Text('runs run runs runs ' * 5 + 'run ' * 5)
+
+    seg = t.segment(20, 25)
+
+    assert seg.unstem('run') == t.unstem('run') == 'runs'
+
+
+def test_segments():
+
+    """
+    segments() should cover the text with the passed windows.
+    """
+
+    t = Text(' '.join(WORDS))
+
+    segs = t.segments(partitions(len(t.tokens), 3))
+
+    assert [(s.start, s.stop) for s in segs] == [(0, 43), (43, 87), (87, 130)]
+    assert sum(len(s.offsets) for s in segs) == len(t.offsets)
+
+
+def test_empty():
+
+    """
+    Empty windows should be rejected.
+    """
+
+    t = Text(' '.join(WORDS))
+
+    with pytest.raises(ValueError):
+        t.segment(50, 50)
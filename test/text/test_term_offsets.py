@@ -0,0 +1,43 @@
+
+
+import numpy as np
+
+from textplot.text import Text
+
+
+def test_term_offsets():
+
+    """
+    term_offsets() should return the offsets of a term, as an array.
+    """
+
+    t = Text('aa bb aa the bb aa')
+
+    assert t.term_offsets('aa').tolist() == [0, 2, 5]
+    assert t.term_offsets('bb').tolist() == [1, 4]
+
+
+def test_csr_layout():
+
+    """
+    The offsets for all terms should be stored in one array, grouped by term,
+    with an index pointer for each term.
+    """
+
+    t = Text('aa bb aa the bb cc')
+
+    assert t.offsets.dtype == np.int32
+    assert t.offsets.tolist() == [0, 2, 1, 4, 5]
+    assert t.indptr.tolist() == [0, 2, 4, 5]
+
+
+def test_token_columns():
+
+    """
+    Each token should have a stem id and a form id, with -1 for stopwords.
+    """
+
+    t = Text('cats the cat')
+
+    assert t.token_forms.tolist() == [0, -1, 1]
+    assert t.token_stems.tolist() == [0, -1, 0]
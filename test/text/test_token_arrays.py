@@ -0,0 +1,31 @@
+
+
+from textplot.text import Text
+
+
+def test_round_trip():
+
+    """
+    set_token_arrays() should rebuild the tokens and terms encoded by
+    token_arrays().
+    """
+
+    t1 = Text('cats the cat an dogs cats')
+    t2 = Text('')
+
+    t2.set_token_arrays(t1.token_arrays())
+
+    assert list(t2.tokens) == list(t1.tokens)
+    assert t2.terms == t1.terms
+    assert t2.unstem('cat') == 'cats'
+
+
+def test_stopwords():
+
+    """
+    Stopwords should be encoded as -1.
+    """
+
+    t = Text('aa the bb')
+
+    assert list(t.token_arrays()['token_forms']) == [0, -1, 1]
@@ -43,3 +43,17 @@ def test_ignore_stopwords():
     assert t.tokens[3] == None
     assert t.tokens[4]['unstemmed'] == 'cc'
     assert len(t.tokens) == 5
+
+
+def test_token_offsets():
+
+    """
+    Each token dict should include its offset, and negative indexes should
+    count from the end.
+    """
+
+    t = Text('aa bb cc')
+
+    assert t.tokens[1]['offset'] == 1
+    assert t.tokens[-1]['offset'] == 2
+    assert t.tokens[-1]['stemmed'] == 'cc'
@@ -18,3 +18,33 @@ def test_unstem():
     # cats > cat
     t = Text('cat cat cats cats cats')
     assert t.unstem('cat') == 'cats'
+
+
+def test_ties():
+
+    """
+    When two forms are tied, take the one that appears first.
+    """
+
+    t = Text('cats cat cat cats')
+    assert t.unstem('cat') == 'cats'
+
+    t = Text('cat cats cats cat')
+    assert t.unstem('cat') == 'cat'
+
+
+def test_unstem_table():
+
+    """
+    unstem_table() should map each stem to the counts of its forms, most
+    common first.
+    """
+
+    t = Text('dog cat cats cats dogs cat cats')
+
+    table = t.unstem_table()
+
+    assert list(table.keys()) == ['dog', 'cat']
+
+    assert list(table['cat'].items()) == [('cats', 3), ('cat', 2)]
+    assert list(table['dog'].items()) == [('dog', 1), ('dogs', 1)]
@@ -0,0 +1,50 @@
+
+
+from textplot.utils import tokenize, tokenize_arrays
+
+
+def test_tokenize_arrays():
+
+    """
+    tokenize_arrays() should encode the same stems, forms, and offsets as
+    tokenize().
+    """
+
+    text = 'Happy dogs, happy cats. The dog is happier than the cat.'
+
+    arrays = tokenize_arrays(text)
+
+    forms = arrays['forms']
+    stems = arrays['stems']
+    form_stems = arrays['form_stems']
+
+    for token, f in zip(tokenize(text), arrays['token_forms']):
+        assert forms[f] == token['unstemmed']
+        assert stems[form_stems[f]] == token['stemmed']
+
+
+def test_order_of_appearance():
+
+    """
+    Forms and stems should be numbered in order of first appearance.
+    """
+
+    arrays = tokenize_arrays('cats dog cat dogs')
+
+    assert list(arrays['forms']) == ['cats', 'dog', 'cat', 'dogs']
+    assert list(arrays['stems']) == ['cat', 'dog']
+    assert list(arrays['form_stems']) == [0, 1, 0, 1]
+    assert list(arrays['token_forms']) == [0, 1, 2, 3]
+
+
+def test_stopwords():
+
+    """
+    Stopwords should be marked as -1, and left out of the forms and stems.
+    """
+
+    arrays = tokenize_arrays('the cat and the dog', set(['the', 'and']))
+
+    assert list(arrays['forms']) == ['cat', 'dog']
+    assert list(arrays['stems']) == ['cat', 'dog']
+    assert list(arrays['token_forms']) == [-1, 0, -1, -1, 1]
@@ -0,0 +1,39 @@
+
+
+import pytest
+
+from textplot.utils import windows, partitions
+
+
+def test_windows():
+
+    """
+    windows() should step a window across the range, and cut the last one
+    short.
+    """
+
+    assert windows(10, 4) == [(0, 4), (4, 8), (8, 10)]
+    assert windows(10, 4, 3) == [(0, 4), (3, 7), (6, 10)]
+    assert windows(10, 20) == [(0, 10)]
+    assert windows(0, 4) == []
+
+    with pytest.raises(ValueError):
+        windows(10, 0)
+
+
+def test_partitions():
+
+    """
+    partitions() should split the range into n parts that cover it, without
+    any empty parts.
+    """
+
+    assert partitions(10, 3) == [(0, 3), (3, 7), (7, 10)]
+    assert partitions(10, 1) == [(0, 10)]
+
+    # Parts that would be empty are dropped.
+    assert partitions(3, 5) == [(0, 1), (1, 2), (2, 3)]
+    assert partitions(0, 2) == []
+
+    with pytest.raises(ValueError):
+        partitions(10, 0)
@@ -0,0 +1,279 @@
+
+
+import os
+import sys
+import time
+import traceback
+import clint.textui.progress as progress
+import textplot.utils as utils
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from textplot.helpers import build_graph
+from textplot.graphs import FORMATS
+from textplot.instrument import Profile
+
+
+def find_inputs(path):
+
+    """
+    Get the input texts for a batch - every .txt file in a directory, or the
+    paths listed in a manifest file, one per line. Blank lines and lines that
+    start with # are skipped, and relative paths are resolved against the
+    directory of the manifest.
+
+    Args:
+        path (str): A directory or a manifest file.
+
+    Returns:
+        list: The input paths.
+    """
+
+    if os.path.isdir(path):
+        return sorted(
+            os.path.join(path, name)
+            for name in os.listdir(path)
+            if name.endswith('.txt')
+        )
+
+    root = os.path.dirname(os.path.abspath(path))
+
+    with open(path) as f:
+        lines = [line.strip() for line in f]
+
+    return [
+        os.path.join(root, line)
+        for line in lines
+        if line and not line.startswith('#')
+    ]
+
+
+def output_paths(inputs, out_dir, fmt='gml'):
+
+    """
+    Map each input to a graph file in the output directory, with the same
+    base name.
+
+    Args:
+        inputs (list): The input paths.
+        out_dir (str): The output directory.
+        fmt (str): One of the graph FORMATS.
+
+    Returns:
+        list: The output paths.
+    """
+
+    if fmt not in FORMATS:
+        raise ValueError('Unknown format: %s' % fmt)
+
+    names = [
+        os.path.splitext(os.path.basename(path))[0] + '.' + fmt
+        for path in inputs
+    ]
+
+    duplicates = sorted(set(n for n in names if names.count(n) > 1))
+
+    if duplicates:
+        raise ValueError('Inputs share output names: %s' % duplicates)
+
+    return [os.path.join(out_dir, name) for name in names]
+
+
+def setup(quiet=False):
+
+    """
+    Load the state shared by all texts - the stopwords and the stemmer - so
+    that each text doesn't pay for it again. Called once in the parent, and
+    once in each worker.
+
+    Args:
+        quiet (bool): If true, silence the progress output of the pipeline.
+    """
+
+    utils.read_stopwords()
+    utils.stemmer()
+
+    if quiet:
+        sys.stdout = open(os.devnull, 'w')
+        progress.STREAM = sys.stdout
+
+
+def process(args):
+
+    """
+    Build and write the graph for one text, catching any errors.
+
+    Args:
+        args (tuple): (in_path, out_path, fmt, kwargs)
+
+    Returns:
+        dict: The status of the text - the paths, 'ok' or 'error', the
+        error, the total time, and the time of each stage.
+    """
+
+    in_path, out_path, fmt, kwargs = args
+
+    profile = Profile()
+    started = time.perf_counter()
+
+    status = dict(in_path=in_path, out_path=out_path)
+
+    try:
+
+        g = build_graph(in_path, profile=profile, **kwargs)
+        g.write(out_path, fmt)
+
+        status.update(
+            status='ok',
+            nodes=g.number_of_nodes(),
+            edges=g.number_of_edges(),
+        )
+
+    except Exception as e:
+
+        status.update(
+            status='error',
+            error='%s: %s' % (type(e).__name__, e),
+            traceback=traceback.format_exc(),
+        )
+
+    status['seconds'] = time.perf_counter() - started
+
+    status['stages'] = {
+        r['stage']: r['seconds']
+        for r in profile.records
+        if 'seconds' in r
+    }
+
+    return status
+
+
+def run_batch(inputs, out_dir, fmt='gml', jobs=1, **kwargs):
+
+    """
+    Build graphs for a list of texts across a pool of processes. Each worker
+    loads the shared state once, and then handles many texts.
+
+    If a worker dies without raising - eg, it's killed for running out of
+    memory - the pool is replaced, and the texts that were in flight are
+    retried one at a time, to find the one that killed it. That text is
+    reported as an error, and the rest of the batch carries on.
+
+    Args:
+        inputs (list): The input paths.
+        out_dir (str): The output directory.
+        fmt (str): One of the graph FORMATS.
+        jobs (int): The number of processes.
+        kwargs (dict): Options for build_graph().
+
+    Yields:
+        dict: The status of each text, in order of completion.
+    """
+
+    outputs = output_paths(inputs, out_dir, fmt)
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    # Load the shared state before forking, so that the workers inherit it.
+    setup()
+
+    queue = [
+        (in_path, out_path, fmt, kwargs)
+        for in_path, out_path in zip(inputs, outputs)
+    ]
+
+    while queue:
+
+        unfinished = yield from run_pool(queue, jobs)
+
+        # The tasks are handed to the workers in order, and the executor
+        # holds at most jobs+1 tasks in its call queue, on top of the jobs
+        # that are running - so the task that killed the pool is one of the
+        # first 2*jobs+1 that didn't finish.
+        suspects = unfinished[:2*jobs+1]
+        queue = unfinished[2*jobs+1:]
+
+        for task in suspects:
+
+            started = time.perf_counter()
+
+            if (yield from run_pool([task], 1)):
+                yield died(task, time.perf_counter() - started)
+
+
+def run_pool(tasks, jobs):
+
+    """
+    Run tasks in a new process pool, until they finish or the pool breaks.
+
+    Args:
+        tasks (list): Arguments for process().
+        jobs (int): The number of processes.
+
+    Yields:
+        dict: The status of each finished text.
+
+    Returns:
+        list: The tasks that didn't finish, if a worker died, in order.
+    """
+
+    with ProcessPoolExecutor(jobs, initializer=setup, initargs=(True,)) as pool:
+
+        futures = OrderedDict(
+            (pool.submit(process, task), task)
+            for task in tasks
+        )
+
+        reported = set()
+
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+                reported.add(future)
+
+        except BrokenProcessPool:
+
+            # Report the texts that finished before the pool broke, and hand
+            # back the rest.
+            unfinished = []
+
+            for future, task in futures.items():
+
+                if future in reported:
+                    continue
+
+                elif future.done() and not future.exception():
+                    yield future.result()
+
+                else:
+                    unfinished.append(task)
+
+            return unfinished
+
+    return []
+
+
+def died(task, seconds):
+
+    """
+    Get the status of a text whose worker died.
+
+    Args:
+        task (tuple): The arguments for process().
+        seconds (float): The time until the worker died.
+
+    Returns:
+        dict
+    """
+
+    in_path, out_path, _, _ = task
+
+    return dict(
+        in_path=in_path,
+        out_path=out_path,
+        status='error',
+        error='BrokenProcessPool: the worker process died',
+        seconds=seconds,
+        stages={},
+    )
@@ -0,0 +1,350 @@
+
+
+import os
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+
+from collections import OrderedDict
+
+
+class KDECache:
+
+
+    def __init__(self, maxsize=None, maxbytes=2**28):
+
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize (int): The maximum number of entries, or None.
+            maxbytes (int): The maximum total size of the cached arrays, in
+            bytes, or None.
+        """
+
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+
+        self.clear()
+
+
+    def clear(self):
+
+        """
+        Drop all entries and reset the counters.
+        """
+
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+
+    def __len__(self):
+        return len(self.entries)
+
+
+    def __contains__(self, key):
+        return key in self.entries
+
+
+    def get(self, key):
+
+        """
+        Get an entry, and mark it as the most recently used.
+
+        Args:
+            key (tuple)
+
+        Returns:
+            np.array: The cached array, or None.
+        """
+
+        if key not in self.entries:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+
+        return self.entries[key]
+
+
+    def set(self, key, value):
+
+        """
+        Add an entry, evicting the least recently used entries as needed.
+
+        Args:
+            key (tuple)
+            value (np.array)
+        """
+
+        if key in self.entries:
+            self.nbytes -= self.entries.pop(key).nbytes
+
+        self.entries[key] = value
+        self.nbytes += value.nbytes
+
+        while self.entries and self.full():
+            _, evicted = self.entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+
+    def full(self):
+
+        """
+        Returns:
+            bool: True if the cache is over one of its limits.
+        """
+
+        return (
+            (self.maxsize is not None and len(self) > self.maxsize) or
+            (self.maxbytes is not None and self.nbytes > self.maxbytes)
+        )
+
+
+    def stats(self):
+
+        """
+        Returns:
+            dict: The hit / miss counts and the current size.
+        """
+
+        lookups = self.hits + self.misses
+
+        return {
+            'hits':     self.hits,
+            'misses':   self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0,
+            'entries':  len(self),
+            'nbytes':   self.nbytes,
+        }
+
+
+class DiskCache:
+
+
+    # Bump when the layout of the cached arrays changes.
+    VERSION = 3
+
+
+    def __init__(self, path):
+
+        """
+        Set the cache directory.
+
+        Args:
+            path (str): The cache directory.
+        """
+
+        self.path = os.path.abspath(path)
+
+        self.hits = 0
+        self.misses = 0
+
+
+    def key(self, text, stopwords, stemmer):
+
+        """
+        Get a content-addressed key for a tokenization.
+
+        Args:
+            text (str|iter): The raw text, or an iterable of chunks. An
+            iterator is used up.
+            stopwords (set): The stopwords.
+            stemmer (str): The stemmer name and version.
+
+        Returns:
+            str: A hex digest.
+        """
+
+        sha = hashlib.sha256()
+
+        sha.update(str(self.VERSION).encode('utf8'))
+        sha.update(b'\0' + stemmer.encode('utf8'))
+        sha.update(b'\0' + '\n'.join(sorted(stopwords)).encode('utf8'))
+        sha.update(b'\0')
+
+        for chunk in [text] if isinstance(text, str) else text:
+            sha.update(chunk.encode('utf8', errors='replace'))
+
+        return sha.hexdigest()
+
+
+    def params_key(self, terms, **params):
+
+        """
+        Get a key for a set of terms and KDE parameters.
+
+        Args:
+            terms (list): The terms.
+            params (dict): The KDE parameters.
+
+        Returns:
+            str: A hex digest.
+        """
+
+        sha = hashlib.sha256()
+
+        sha.update('\n'.join(terms).encode('utf8'))
+
+        for name, value in sorted(params.items()):
+            sha.update(('\0%s=%r' % (name, value)).encode('utf8'))
+
+        return sha.hexdigest()
+
+
+    def text_dir(self, key):
+
+        """
+        Args:
+            key (str): A text key.
+
+        Returns:
+            str: The directory for the text's arrays.
+        """
+
+        return os.path.join(self.path, key)
+
+
+    def load_arrays(self, path, names):
+
+        """
+        Memory-map a set of .npy files.
+
+        Args:
+            path (str): The directory.
+            names (list): The array names.
+
+        Returns:
+            dict: name -> array, or None if any of the files is missing.
+        """
+
+        arrays = {}
+
+        for name in names:
+
+            file_path = os.path.join(path, name+'.npy')
+
+            if not os.path.exists(file_path):
+                self.misses += 1
+                return None
+
+            arrays[name] = np.load(file_path, mmap_mode='r')
+
+        self.hits += 1
+        return arrays
+
+
+    def save_arrays(self, path, arrays):
+
+        """
+        Write a set of .npy files. Each file is written to a temporary path
+        and then moved into place, so that readers never see partial files.
+
+        Args:
+            path (str): The directory.
+            arrays (dict): name -> array.
+        """
+
+        os.makedirs(path, exist_ok=True)
+
+        for name, array in arrays.items():
+
+            fd, tmp_path = tempfile.mkstemp(dir=path, suffix='.npy')
+
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, array, allow_pickle=False)
+
+            os.replace(tmp_path, os.path.join(path, name+'.npy'))
+
+
+    def load_tokens(self, key, names):
+
+        """
+        Load the token arrays for a text.
+
+        Args:
+            key (str): A text key.
+            names (list): The array names.
+
+        Returns:
+            dict: name -> array, or None on a miss.
+        """
+
+        return self.load_arrays(self.text_dir(key), names)
+
+
+    def save_tokens(self, key, arrays):
+
+        """
+        Save the token arrays for a text.
+
+        Args:
+            key (str): A text key.
+            arrays (dict): name -> array.
+        """
+
+        self.save_arrays(self.text_dir(key), arrays)
+
+
+    def load_kdes(self, key, params_key):
+
+        """
+        Load a KDE matrix.
+
+        Args:
+            key (str): A text key.
+            params_key (str): A terms / parameters key.
+
+        Returns:
+            np.array: The (terms x samples) matrix, or None on a miss.
+        """
+
+        path = os.path.join(self.text_dir(key), 'kdes')
+        arrays = self.load_arrays(path, [params_key])
+
+        return arrays[params_key] if arrays else None
+
+
+    def save_kdes(self, key, params_key, kdes):
+
+        """
+        Save a KDE matrix.
+
+        Args:
+            key (str): A text key.
+            params_key (str): A terms / parameters key.
+            kdes (np.array): The (terms x samples) matrix.
+        """
+
+        path = os.path.join(self.text_dir(key), 'kdes')
+        self.save_arrays(path, {params_key: kdes})
+
+
+    def stats(self):
+
+        """
+        Returns:
+            dict: The hit / miss counts for array loads.
+        """
+
+        lookups = self.hits + self.misses
+
+        return {
+            'hits':     self.hits,
+            'misses':   self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0,
+        }
+
+
+    def purge(self):
+
+        """
+        Delete all cached texts.
+        """
+
+        if os.path.isdir(self.path):
+            shutil.rmtree(self.path)
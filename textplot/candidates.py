@@ -0,0 +1,98 @@
+
+
+import numpy as np
+
+
+def pool(kdes, dims=64):
+
+    """
+    Normalize each density to unit L1 mass, and sum runs of adjacent samples
+    into a smaller number of bins.
+
+    For unit-mass densities, the Bray-Curtis distance is half of the L1
+    distance, and pooling can only shrink L1 distances - so, terms that are
+    close in the original space are also close in the pooled space.
+
+    Args:
+        kdes (np.array): A (terms x samples) array.
+        dims (int): The number of pooled bins.
+
+    Returns:
+        np.array: A (terms x dims) array.
+    """
+
+    kdes = np.asarray(kdes, dtype=np.float64)
+
+    mass = kdes.sum(1, keepdims=True)
+    kdes = kdes / np.where(mass > 0, mass, 1)
+
+    dims = min(dims, kdes.shape[1])
+    edges = np.linspace(0, kdes.shape[1], dims+1).astype(int)
+
+    return np.add.reduceat(kdes, edges[:-1], axis=1)
+
+
+def ball_tree(kdes, candidates, dims=64, leaf_size=40):
+
+    """
+    Shortlist the nearest neighbors of each term, by querying a ball tree
+    over the pooled densities, under the L1 metric.
+
+    Args:
+        kdes (np.array): A (terms x samples) array.
+        candidates (int): The number of neighbors to shortlist.
+        dims (int): The number of pooled bins.
+        leaf_size (int): The ball tree leaf size.
+
+    Returns:
+        np.array: A (terms x candidates) array of row indexes, ordered by
+        distance in the pooled space.
+    """
+
+    n = len(kdes)
+    candidates = min(candidates, n-1)
+
+    if candidates < 1:
+        return np.empty((n, 0), dtype=np.int64)
+
+    from sklearn.neighbors import BallTree
+
+    pooled = pool(kdes, dims)
+
+    tree = BallTree(pooled, leaf_size=leaf_size, metric='manhattan')
+    _, ids = tree.query(pooled, k=candidates+1)
+
+    # Drop each term from its own list. Usually it comes first, but if it
+    # is tied with a duplicate it can land anywhere - or not at all, in which
+    # case drop the most distant candidate.
+    own = ids == np.arange(n)[:, np.newaxis]
+    own[~own.any(1), -1] = True
+
+    return ids[~own].reshape(n, candidates)
+
+
+def recall(approx, exact, k):
+
+    """
+    Measure how many of the exact k nearest neighbors of each term are found
+    by an approximate index.
+
+    Args:
+        approx (SparseMatrix): The approximate matrix.
+        exact (Matrix): The exact matrix.
+        k (int): The number of neighbors.
+
+    Returns:
+        float: The fraction of the exact neighbors that were found.
+    """
+
+    found, total = 0, 0
+
+    for anchor in exact.terms:
+
+        expected = set(exact.neighbors(anchor, k))
+
+        found += len(expected & set(approx.neighbors(anchor, k)))
+        total += len(expected)
+
+    return found / total if total else 1.0
@@ -0,0 +1,528 @@
+
+
+import numpy as np
+
+from collections import OrderedDict
+
+
+# Upper bound on the size of the fine-grid arrays that get convolved at once.
+BLOCK_BYTES = 2**26
+
+
+# The largest fine-grid spacing used by the binned estimator, as a fraction
+# of the bandwidth. Finer grids are more accurate and more expensive.
+RESOLUTION = 32
+
+
+# The number of sample points per bandwidth, when the sample count is picked
+# automatically. Smooth kernels don't change much within a third of a
+# bandwidth, so denser samples add little to the scores.
+AUTO_SAMPLES = 3
+
+
+def gaussian(u):
+    return np.exp(-0.5 * u**2)
+
+
+def tophat(u):
+    return (np.abs(u) < 1).astype(float)
+
+
+def epanechnikov(u):
+    return np.clip(1 - u**2, 0, None)
+
+
+def exponential(u):
+    return np.exp(-np.abs(u))
+
+
+def linear(u):
+    return np.clip(1 - np.abs(u), 0, None)
+
+
+def cosine(u):
+    return np.where(np.abs(u) < 1, np.cos(np.pi * u / 2), 0)
+
+
+# Kernel -> (function, integral, support). The functions take distances in
+# units of the bandwidth. The support is the distance past which the kernel
+# is zero, or numerically negligible (< 1e-14 of the peak).
+KERNELS = {
+    'gaussian':     (gaussian, np.sqrt(2 * np.pi), 8.2),
+    'tophat':       (tophat, 2, 1),
+    'epanechnikov': (epanechnikov, 4 / 3, 1),
+    'exponential':  (exponential, 2, 32.3),
+    'linear':       (linear, 1, 1),
+    'cosine':       (cosine, 4 / np.pi, 1),
+}
+
+
+def evaluate(name, x, bandwidth):
+
+    """
+    Evaluate a normalized kernel, using the same definitions as
+    scikit-learn's KernelDensity.
+
+    Args:
+        name (str): The kernel function.
+        x (np.array): Distances from the kernel center.
+        bandwidth (float): The kernel bandwidth.
+
+    Returns:
+        np.array: The kernel values.
+    """
+
+    if name not in KERNELS:
+        raise ValueError('Unknown kernel: %s' % name)
+
+    func, integral, _ = KERNELS[name]
+    return func(np.asarray(x) / bandwidth) / (integral * bandwidth)
+
+
+def auto_samples(length, bandwidth, per_bandwidth=AUTO_SAMPLES):
+
+    """
+    Get a sample count that scales with the number of bandwidths that fit
+    in the text.
+
+    Args:
+        length (int): The number of tokens in the text.
+        bandwidth (float): The kernel bandwidth.
+        per_bandwidth (float): The number of samples per bandwidth.
+
+    Returns:
+        int: The number of samples.
+    """
+
+    return max(int(np.ceil(length / bandwidth * per_bandwidth)) + 1, 2)
+
+
+def oversample(length, samples, bandwidth, resolution=RESOLUTION):
+
+    """
+    Get the number of fine-grid nodes per sample interval needed to keep the
+    fine-grid spacing under bandwidth / resolution.
+
+    Args:
+        length (int): The number of tokens in the text.
+        samples (int): The number of evenly-spaced sample points.
+        bandwidth (float): The kernel bandwidth.
+        resolution (int): Fine-grid nodes per bandwidth.
+
+    Returns:
+        int: The oversampling factor.
+    """
+
+    spacing = length / max(samples-1, 1)
+    return max(int(np.ceil(spacing * resolution / bandwidth)), 1)
+
+
+def bin_offsets(offsets, start, stop, nodes):
+
+    """
+    Linear-bin a set of offsets onto evenly-spaced grid nodes - each offset
+    splits its weight between the two nearest nodes.
+
+    Args:
+        offsets (np.array): Token offsets.
+        start (float): The position of the first node.
+        stop (float): The position of the last node.
+        nodes (int): The number of nodes.
+
+    Returns:
+        np.array: The binned counts.
+    """
+
+    return bin_rows([offsets], start, stop, nodes)[0]
+
+
+def bin_rows(offsets, start, stop, nodes):
+
+    """
+    Linear-bin several sets of offsets at once, into a (rows x nodes) count
+    matrix.
+
+    Args:
+        offsets (list): A list of offset arrays, one per row.
+        start (float): The position of the first node.
+        stop (float): The position of the last node.
+        nodes (int): The number of nodes.
+
+    Returns:
+        np.array: The binned counts.
+    """
+
+    return bin_flat(*flatten_rows(offsets, start, stop), nodes)
+
+
+def flatten_rows(offsets, start, stop):
+
+    """
+    Concatenate several sets of offsets, and scale them to [0, 1]. This is
+    the part of binning that doesn't depend on the grid, so it can be shared
+    by several grids.
+
+    Args:
+        offsets (list): A list of offset arrays, one per row.
+        start (float): The position of the first node.
+        stop (float): The position of the last node.
+
+    Returns:
+        tuple: (rows, pos, count) - the row of each offset, its scaled
+        position, and the number of rows.
+    """
+
+    sizes = [len(o) for o in offsets]
+
+    rows = np.repeat(np.arange(len(offsets)), sizes)
+    flat = np.concatenate(offsets) if offsets else np.empty(0)
+
+    pos = (np.asarray(flat, dtype=float) - start) / (stop - start)
+
+    return rows, pos, len(offsets)
+
+
+def bin_flat(rows, pos, count, nodes):
+
+    """
+    Linear-bin flattened offsets onto a grid.
+
+    Args:
+        rows (np.array): The row of each offset.
+        pos (np.array): The position of each offset, scaled to [0, 1].
+        count (int): The number of rows.
+        nodes (int): The number of nodes.
+
+    Returns:
+        np.array: A (rows x nodes) matrix of counts.
+    """
+
+    pos = np.clip(pos * (nodes-1), 0, nodes-1)
+
+    lo = np.minimum(pos.astype(int), max(nodes-2, 0))
+    w = pos - lo
+
+    # Offset each row's bins into its own stretch of a flat histogram.
+    lo += rows * (nodes+1)
+
+    size = count * (nodes+1)
+    counts = np.bincount(lo, weights=1-w, minlength=size)
+    counts += np.bincount(lo+1, weights=w, minlength=size)[:size]
+
+    return counts.reshape(count, nodes+1)[:, :nodes]
+
+
+def smooth(counts, name, bandwidth, spacing):
+
+    """
+    Convolve binned counts with a kernel sampled at the grid spacing.
+
+    Args:
+        counts (np.array): A (nodes) or (rows x nodes) array of counts.
+        name (str): The kernel function.
+        bandwidth (float): The kernel bandwidth.
+        spacing (float): The distance between grid nodes.
+
+    Returns:
+        np.array: The density at each node, with the shape of `counts`.
+    """
+
+    return smooth_kernels(counts, [(name, bandwidth)], spacing)[0]
+
+
+def smooth_kernels(counts, kernels, spacing):
+
+    """
+    Convolve binned counts with several kernels. The FFT of the counts is
+    computed once, and shared by the kernels that need the same transform
+    length.
+
+    Args:
+        counts (np.array): A (nodes) or (rows x nodes) array of counts.
+        kernels (list): (name, bandwidth) pairs.
+        spacing (float): The distance between grid nodes.
+
+    Returns:
+        list: The density at each node for each kernel, with the shape of
+        `counts`.
+    """
+
+    import scipy.fft as fft
+
+    nodes = counts.shape[-1]
+
+    densities = []
+    spectra = {}
+
+    for name, bandwidth in kernels:
+
+        # Truncate the kernel at its support, or at the width of the grid.
+        support = KERNELS[name][2] * bandwidth / spacing
+        lags = min(int(np.ceil(support)), nodes-1)
+
+        weights = evaluate(name, np.arange(-lags, lags+1) * spacing, bandwidth)
+
+        # Pad the transform past the full convolution, so that it doesn't
+        # wrap around.
+        n = fft.next_fast_len(nodes + 2*lags, True)
+
+        if n not in spectra:
+            spectra[n] = fft.rfft(counts, n, axis=-1)
+
+        density = fft.irfft(spectra[n] * fft.rfft(weights, n), n, axis=-1)
+
+        # Clear out FFT round-off below zero.
+        densities.append(np.maximum(density[..., lags:lags+nodes], 0))
+
+    return densities
+
+
+def binned(offsets, length, bandwidth=2000, samples=1000, kernel='gaussian',
+           resolution=RESOLUTION):
+
+    """
+    Estimate a density by binning the offsets onto a fine grid and convolving
+    the counts with the kernel.
+
+    This costs O(nodes log nodes), instead of O(offsets x samples). With the
+    default resolution, the densities match the exact estimate to within
+    0.1% (relative L1 error) for the continuous kernels, and ~2% for tophat,
+    whose edges fall between grid nodes. Raise the resolution, or use the
+    exact estimators, if that matters.
+
+    Args:
+        offsets (np.array): Token offsets.
+        length (int): The number of tokens in the text.
+        bandwidth (int): The kernel bandwidth.
+        samples (int): The number of evenly-spaced sample points.
+        kernel (str): The kernel function.
+        resolution (int): Fine-grid nodes per bandwidth.
+
+    Returns:
+        np.array: The density estimate.
+    """
+
+    return binned_rows(
+        [offsets], length, bandwidth, samples, kernel, resolution
+    )[0]
+
+
+def binned_rows(offsets, length, bandwidth=2000, samples=1000,
+                kernel='gaussian', resolution=RESOLUTION,
+                block_bytes=BLOCK_BYTES):
+
+    """
+    Estimate the densities for several sets of offsets at once - bin them
+    into one (rows x nodes) count matrix, and convolve all of the rows with
+    the kernel in one batch.
+
+    Args:
+        offsets (list): A list of offset arrays, one per row.
+        length (int): The number of tokens in the text.
+        bandwidth (int): The kernel bandwidth.
+        samples (int): The number of evenly-spaced sample points.
+        kernel (str): The kernel function.
+        resolution (int): Fine-grid nodes per bandwidth.
+        block_bytes (int): The memory budget for each batch, in bytes.
+
+    Returns:
+        np.array: A (rows x samples) array of densities.
+    """
+
+    return binned_sweep(
+        offsets, length, [(bandwidth, samples, kernel)],
+        resolution, block_bytes,
+    )[0]
+
+
+def binned_sweep(offsets, length, settings, resolution=RESOLUTION,
+                 block_bytes=BLOCK_BYTES):
+
+    """
+    Estimate the densities for several sets of offsets under several
+    settings - eg, a range of bandwidths or kernels. The offsets are
+    flattened once, binned once per distinct grid, and the FFT of each grid
+    is shared by the kernels that can use it. Each result is the same as a
+    separate call to binned_rows().
+
+    Args:
+        offsets (list): A list of offset arrays, one per row.
+        length (int): The number of tokens in the text.
+        settings (list): (bandwidth, samples, kernel) tuples.
+        resolution (int): Fine-grid nodes per bandwidth.
+        block_bytes (int): The memory budget for each batch, in bytes.
+
+    Returns:
+        list: A (rows x samples) array of densities for each setting.
+    """
+
+    kdes = [None] * len(settings)
+
+    # Fine-grid node count -> [(setting index, oversampling factor)]
+    grids = OrderedDict()
+
+    for i, (bandwidth, samples, kernel) in enumerate(settings):
+
+        if samples < 2:
+            kdes[i] = exact_rows(offsets, length, bandwidth, samples, kernel)
+            continue
+
+        r = oversample(length, samples, bandwidth, resolution)
+        grids.setdefault((samples-1)*r + 1, []).append((i, r))
+        kdes[i] = np.empty((len(offsets), samples))
+
+    if not grids:
+        return kdes
+
+    # Bound the size of the largest fine-grid count matrix.
+    step = max(block_bytes // (max(grids) * 8 * 4), 1)
+
+    for start in range(0, len(offsets), step):
+
+        rows = offsets[start:start+step]
+        flat = flatten_rows(rows, 0, length)
+
+        sizes = np.array([len(o) for o in rows])[:, np.newaxis]
+
+        for nodes, group in grids.items():
+
+            counts = bin_flat(*flat, nodes)
+
+            densities = smooth_kernels(
+                counts,
+                [(settings[i][2], settings[i][0]) for i, _ in group],
+                length / (nodes-1),
+            )
+
+            for (i, r), density in zip(group, densities):
+
+                samples = settings[i][1]
+
+                # Scale the densities to integrate to 1.
+                kdes[i][start:start+step] = (
+                    density[:, ::r] / sizes * (length / samples)
+                )
+
+    return kdes
+
+
+def exact(offsets, length, bandwidth=2000, samples=1000, kernel='gaussian'):
+
+    """
+    Estimate a density by summing the kernel over every offset, at each
+    sample point.
+
+    Args:
+        offsets (np.array): Token offsets.
+        length (int): The number of tokens in the text.
+        bandwidth (int): The kernel bandwidth.
+        samples (int): The number of evenly-spaced sample points.
+        kernel (str): The kernel function.
+
+    Returns:
+        np.array: The density estimate.
+    """
+
+    x_axis = np.linspace(0, length, samples)[:, np.newaxis]
+    offsets = np.asarray(offsets, dtype=float)[np.newaxis, :]
+
+    density = evaluate(kernel, x_axis - offsets, bandwidth)
+
+    # Scale the density to integrate to 1.
+    return density.mean(1) * (length / samples)
+
+
+def sklearn(offsets, length, bandwidth=2000, samples=1000, kernel='gaussian'):
+
+    """
+    Estimate a density with scikit-learn's KernelDensity. This is the
+    reference implementation.
+
+    Args:
+        offsets (np.array): Token offsets.
+        length (int): The number of tokens in the text.
+        bandwidth (int): The kernel bandwidth.
+        samples (int): The number of evenly-spaced sample points.
+        kernel (str): The kernel function.
+
+    Returns:
+        np.array: The density estimate.
+    """
+
+    from sklearn.neighbors import KernelDensity
+
+    offsets = np.asarray(offsets)[:, np.newaxis]
+
+    # Fit the density estimator on the terms.
+    kde = KernelDensity(kernel=kernel, bandwidth=bandwidth).fit(offsets)
+
+    # Score an evely-spaced array of samples.
+    x_axis = np.linspace(0, length, samples)[:, np.newaxis]
+    scores = kde.score_samples(x_axis)
+
+    # Scale the scores to integrate to 1.
+    return np.exp(scores) * (length / samples)
+
+
+ESTIMATORS = {
+    'binned':   binned,
+    'exact':    exact,
+    'sklearn':  sklearn,
+}
+
+
+def exact_rows(offsets, length, bandwidth=2000, samples=1000,
+               kernel='gaussian'):
+
+    """
+    Stack exact density estimates for several sets of offsets.
+
+    Args:
+        offsets (list): A list of offset arrays, one per row.
+        length (int): The number of tokens in the text.
+        bandwidth (int): The kernel bandwidth.
+        samples (int): The number of evenly-spaced sample points.
+        kernel (str): The kernel function.
+
+    Returns:
+        np.array: A (rows x samples) array of densities.
+    """
+
+    kdes = np.empty((len(offsets), samples))
+
+    for i, o in enumerate(offsets):
+        kdes[i] = exact(o, length, bandwidth, samples, kernel)
+
+    return kdes
+
+
+def sklearn_rows(offsets, length, bandwidth=2000, samples=1000,
+                 kernel='gaussian'):
+
+    """
+    Stack scikit-learn density estimates for several sets of offsets.
+
+    Args:
+        offsets (list): A list of offset arrays, one per row.
+        length (int): The number of tokens in the text.
+        bandwidth (int): The kernel bandwidth.
+        samples (int): The number of evenly-spaced sample points.
+        kernel (str): The kernel function.
+
+    Returns:
+        np.array: A (rows x samples) array of densities.
+    """
+
+    kdes = np.empty((len(offsets), samples))
+
+    for i, o in enumerate(offsets):
+        kdes[i] = sklearn(o, length, bandwidth, samples, kernel)
+
+    return kdes
+
+
+BATCH_ESTIMATORS = {
+    'binned':   binned_rows,
+    'exact':    exact_rows,
+    'sklearn':  sklearn_rows,
+}
@@ -0,0 +1,50 @@
+
+
+import numpy as np
+
+
+def edge_overlap(g1, g2):
+
+    """
+    Measure how much two graphs over the same text have in common.
+
+    Args:
+        g1 (Graph)
+        g2 (Graph)
+
+    Returns:
+        float: The Jaccard similarity of the (undirected) edge sets.
+    """
+
+    e1 = set(frozenset(e) for e in g1.graph.edges())
+    e2 = set(frozenset(e) for e in g2.graph.edges())
+
+    union = e1 | e2
+
+    return len(e1 & e2) / len(union) if union else 1.0
+
+
+def score_error(m1, m2):
+
+    """
+    Get the largest difference between the scores in two matrices over the
+    same terms.
+
+    Args:
+        m1 (Matrix)
+        m2 (Matrix)
+
+    Returns:
+        float: The largest absolute difference.
+    """
+
+    if m1.terms != m2.terms:
+        raise ValueError('The matrices index different terms.')
+
+    if not m1.size:
+        return 0.0
+
+    s1 = np.asarray(m1.scores[:m1.size], dtype=np.float64)
+    s2 = np.asarray(m2.scores[:m2.size], dtype=np.float64)
+
+    return float(np.nanmax(np.abs(s1 - s2)))
@@ -1,10 +1,34 @@
 
 
-import networkx as nx
-import matplotlib.pyplot as plt
+import os
+import re
+import numpy as np
 
 from abc import ABCMeta, abstractmethod
 from clint.textui.progress import bar
+from collections import OrderedDict
+
+
+# The graph writers, by file extension.
+FORMATS = OrderedDict([
+    ('gml',     'write_gml'),
+    ('graphml', 'write_graphml'),
+    ('csv',     'write_csv'),
+    ('npz',     'write_npz'),
+])
+
+
+# The number of edges formatted and written at once.
+CHUNK_SIZE = 2**16
+
+
+GRAPHML_HEADER = (
+    "<?xml version='1.0' encoding='utf-8'?>\n"
+    '<graphml xmlns="http://graphml.graphdrawing.org/xmlns" '
+    'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+    'xsi:schemaLocation="http://graphml.graphdrawing.org/xmlns '
+    'http://graphml.graphdrawing.org/xmlns/1.0/graphml.xsd">\n'
+)
 
 
 class Graph(metaclass=ABCMeta):
@@ -16,7 +40,8 @@ class Graph(metaclass=ABCMeta):
         Initialize the graph.
         """
 
-        self.graph = nx.Graph()
+        self.set_edges([], [], [], [])
+        self.profile = None
 
 
     @abstractmethod
@@ -24,12 +49,122 @@ class Graph(metaclass=ABCMeta):
         pass
 
 
+    def set_edges(self, nodes, sources, targets, weights):
+
+        """
+        Set the edges of the graph, from parallel arrays. Repeated edges - in
+        either direction - are merged, keeping the last weight, and the edges
+        are put in the order that networkx would list them: by the first of
+        the two nodes, and then by when the edge was first added.
+
+        Args:
+            nodes (list): The node labels.
+            sources (np.array): The node id of the first end of each edge.
+            targets (np.array): The node id of the second end of each edge.
+            weights (np.array): The edge weights.
+        """
+
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.float64)
+
+        lo = np.minimum(sources, targets)
+        hi = np.maximum(sources, targets)
+
+        keys = lo * max(len(nodes), 1) + hi
+
+        # The first time each edge was added, and the last weight it got.
+        _, first = np.unique(keys, return_index=True)
+        _, last = np.unique(keys[::-1], return_index=True)
+        last = len(keys) - 1 - last
+
+        order = np.lexsort((first, lo[first]))
+
+        self.nodes = list(nodes)
+        self.sources = lo[first][order]
+        self.targets = hi[first][order]
+        self.weights = weights[last][order]
+
+        self._graph = None
+
+
+    @property
+    def graph(self):
+
+        """
+        Build a networkx graph from the edges, the first time it's needed.
+        Later changes to it aren't seen by the writers.
+
+        Returns:
+            nx.Graph
+        """
+
+        if self._graph is None:
+
+            import networkx as nx
+
+            self._graph = nx.Graph()
+            self._graph.add_nodes_from(self.nodes)
+
+            self._graph.add_weighted_edges_from(zip(
+                self.labels(self.sources),
+                self.labels(self.targets),
+                self.weights.tolist(),
+            ))
+
+        return self._graph
+
+
+    def labels(self, ids):
+
+        """
+        Args:
+            ids (np.array): Node ids.
+
+        Returns:
+            list: The node labels.
+        """
+
+        return [self.nodes[i] for i in ids.tolist()]
+
+
+    def number_of_nodes(self):
+        return len(self.nodes)
+
+
+    def number_of_edges(self):
+        return len(self.weights)
+
+
+    def chunks(self):
+
+        """
+        Walk through the edges in chunks.
+
+        Yields:
+            tuple: (sources, targets, weights), as lists.
+        """
+
+        for start in range(0, len(self.weights), CHUNK_SIZE):
+
+            stop = start + CHUNK_SIZE
+
+            yield (
+                self.sources[start:stop].tolist(),
+                self.targets[start:stop].tolist(),
+                self.weights[start:stop].tolist(),
+            )
+
+
     def draw_spring(self, **kwargs):
 
         """
         Render a spring layout.
         """
 
+        import networkx as nx
+        import matplotlib.pyplot as plt
+
         nx.draw_spring(
             self.graph,
             with_labels=True,
@@ -42,28 +177,130 @@ class Graph(metaclass=ABCMeta):
         plt.show()
 
 
+    def write(self, path, fmt=None):
+
+        """
+        Write the graph in one of the FORMATS.
+
+        Args:
+            path (str): The file path.
+            fmt (str): The format, or None to use the file extension.
+        """
+
+        if fmt is None:
+            fmt = os.path.splitext(path)[1][1:].lower()
+
+        if fmt not in FORMATS:
+            raise ValueError('Unknown format: %s' % fmt)
+
+        getattr(self, FORMATS[fmt])(path)
+
+
     def write_gml(self, path):
 
         """
-        Write a GML file.
+        Write a GML file, in the same layout as networkx.
 
         Args:
             path (str): The file path.
         """
 
-        nx.write_gml(self.graph, path)
+        with open(path, 'w', encoding='ascii', newline='\n') as f:
+
+            f.write('graph [\n')
+
+            for i, label in enumerate(self.nodes):
+                f.write('  node [\n    id %d\n    label "%s"\n  ]\n' % (
+                    i, gml_escape(label)
+                ))
+
+            for sources, targets, weights in self.chunks():
+                f.write(''.join(
+                    '  edge [\n    source %d\n    target %d\n'
+                    '    weight %s\n  ]\n' % (s, t, gml_float(w))
+                    for s, t, w in zip(sources, targets, weights)
+                ))
+
+            f.write(']\n')
 
 
     def write_graphml(self, path):
 
         """
-        Write a GraphML file.
+        Write a GraphML file, in the same layout as networkx.
 
         Args:
             path (str): The file path.
         """
 
-        nx.write_graphml(self.graph, path)
+        labels = [xml_escape(label) for label in self.nodes]
+
+        with open(path, 'w', encoding='utf8', newline='\n') as f:
+
+            f.write(GRAPHML_HEADER)
+
+            if len(self.weights):
+                f.write(
+                    '  <key id="d0" for="edge" attr.name="weight" '
+                    'attr.type="double" />\n'
+                )
+
+            f.write('  <graph edgedefault="undirected">\n')
+
+            for label in labels:
+                f.write('    <node id="%s" />\n' % label)
+
+            for sources, targets, weights in self.chunks():
+                f.write(''.join(
+                    '    <edge source="%s" target="%s">\n'
+                    '      <data key="d0">%r</data>\n'
+                    '    </edge>\n' % (labels[s], labels[t], w)
+                    for s, t, w in zip(sources, targets, weights)
+                ))
+
+            f.write('  </graph>\n</graphml>\n')
+
+
+    def write_csv(self, path):
+
+        """
+        Write the edges as CSV - source label, target label, weight.
+
+        Args:
+            path (str): The file path.
+        """
+
+        labels = [csv_escape(label) for label in self.nodes]
+
+        with open(path, 'w', encoding='utf8', newline='') as f:
+
+            f.write('source,target,weight\r\n')
+
+            for sources, targets, weights in self.chunks():
+                f.write(''.join(
+                    '%s,%s,%r\r\n' % (labels[s], labels[t], w)
+                    for s, t, w in zip(sources, targets, weights)
+                ))
+
+
+    def write_npz(self, path):
+
+        """
+        Write the node labels and edge arrays to a .npz archive, one column
+        per array - the fastest format to write and load.
+
+        Args:
+            path (str): The file path.
+        """
+
+        with open(path, 'wb') as f:
+            np.savez(
+                f,
+                nodes=np.array(self.nodes, dtype=str),
+                sources=self.sources,
+                targets=self.targets,
+                weights=self.weights,
+            )
 
 
 class Skimmer(Graph):
@@ -72,33 +309,131 @@ class Skimmer(Graph):
     def build(self, text, matrix, skim_depth=10, d_weights=False):
 
         """
-        1. For each term in the passed matrix, score its KDE similarity with
-        all other indexed terms.
+        1. For each term in the passed matrix, select the X terms with the
+        highest KDE similarity scores.
 
-        2. With the ordered stack of similarities in hand, skim off the top X
-        pairs and add them as edges.
+        2. Add those pairs as edges.
 
         Args:
             text (Text): The source text instance.
-            matrix (Matrix): An indexed term matrix.
+            matrix (Matrix|SparseMatrix): An indexed term matrix.
             skim_depth (int): The number of siblings for each term.
             d_weights (bool): If true, give "close" words low edge weights.
         """
 
-        for anchor in bar(matrix.keys):
+        size = len(matrix.terms) * skim_depth
+
+        sources = np.empty(size, dtype=np.int64)
+        targets = np.empty(size, dtype=np.int64)
+        weights = np.empty(size, dtype=np.float64)
+
+        # Label -> node id, in order of first appearance.
+        ids = OrderedDict()
+
+        def node_id(term):
+            return ids.setdefault(text.unstem(term), len(ids))
+
+        neighbors = matrix.all_neighbors(skim_depth)
+
+        n = 0
+
+        for anchor, pairs in bar(neighbors, expected_size=len(matrix.terms)):
+
+            if not pairs:
+                continue
+
+            k = len(pairs)
+            scores = np.array(list(pairs.values()))
+
+            # If edges represent distance, use the complement of the raw
+            # score, so that similar words are connected by "short" edges.
+            if d_weights: scores = 1-scores
+
+            sources[n:n+k] = node_id(anchor)
+            targets[n:n+k] = [node_id(term) for term in pairs]
+            weights[n:n+k] = scores
+
+            n += k
+
+        self.set_edges(list(ids), sources[:n], targets[:n], weights[:n])
+
+
+def gml_escape(text):
+
+    """
+    Escape non-printable and non-ASCII characters, quotes, and ampersands as
+    character references, like networkx.
+
+    Args:
+        text (str)
+
+    Returns:
+        str
+    """
+
+    return re.sub('[^ -~]|[&"]', lambda m: '&#%d;' % ord(m.group(0)), text)
+
+
+def gml_float(value):
+
+    """
+    Format a float like networkx - GML needs a decimal point in every real,
+    and a sign on infinity.
+
+    Args:
+        value (float)
+
+    Returns:
+        str
+    """
+
+    text = repr(value).upper()
+
+    if text == 'INF':
+        return '+INF'
+
+    epos = text.rfind('E')
+
+    if epos != -1 and text.find('.', 0, epos) == -1:
+        text = text[:epos] + '.' + text[epos:]
+
+    return text
+
+
+def csv_escape(text):
+
+    """
+    Quote a CSV field, if it needs it.
+
+    Args:
+        text (str)
+
+    Returns:
+        str
+    """
+
+    if re.search('[,"\r\n]', text):
+        return '"%s"' % text.replace('"', '""')
+
+    return text
+
 
-            n1 = text.unstem(anchor)
+def xml_escape(text):
 
-            # Heaviest pair scores:
-            pairs = matrix.anchored_pairs(anchor).items()
-            for term, weight in list(pairs)[:skim_depth]:
+    """
+    Escape a string for an XML attribute.
 
-                # If edges represent distance, use the complement of the raw
-                # score, so that similar words are connected by "short" edges.
-                if d_weights: weight = 1-weight
+    Args:
+        text (str)
 
-                n2 = text.unstem(term)
+    Returns:
+        str
+    """
 
-                # NetworkX does not handle numpy types when writing graphml,
-                # so we cast the weight to a regular float.
-                self.graph.add_edge(n1, n2, weight=float(weight))
+    return (
+        text
+        .replace('&', '&amp;')
+        .replace('<', '&lt;')
+        .replace('>', '&gt;')
+        .replace('"', '&quot;')
+    )
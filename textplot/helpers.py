@@ -1,14 +1,53 @@
 
 
+import os
+import time
 import click
 
 from textplot.text import Text
 from textplot.graphs import Skimmer
 from textplot.matrix import Matrix
+from textplot.sparse import SparseMatrix
+from textplot.cache import DiskCache
+from textplot.candidates import recall
+from textplot.fidelity import edge_overlap, score_error
+from textplot.instrument import Profile
+from textplot.utils import windows, partitions
 
 
-def build_graph(path, term_depth=1000, skim_depth=10,
-                d_weights=False, **kwargs):
+def load_text(path, cache=None, stream=False):
+
+    """
+    Tokenize a text file.
+
+    Args:
+        path (str): The file path.
+        cache (str): A cache directory for tokens and KDEs.
+        stream (bool): If true, read the file in chunks.
+
+    Returns:
+        Text: The tokenized text.
+    """
+
+    cache = DiskCache(cache) if cache else None
+
+    # Tokenize text.
+    click.echo('\nTokenizing text...')
+
+    if stream:
+        t = Text.from_stream(path, cache=cache)
+
+    else:
+        t = Text.from_file(path, cache=cache)
+
+    click.echo('Extracted %d tokens' % len(t.tokens))
+
+    return t
+
+
+def build_graph(path, term_depth=1000, skim_depth=10, d_weights=False,
+                cache=None, stream=False, matrix=None, sparse=False,
+                threshold=None, shortlist=None, profile=None, **kwargs):
 
     """
     Tokenize a text, index a term matrix, and build out a graph.
@@ -18,26 +57,512 @@ def build_graph(path, term_depth=1000, skim_depth=10,
         term_depth (int): Consider the N most frequent terms.
         skim_depth (int): Connect each word to the N closest siblings.
         d_weights (bool): If true, give "close" nodes low weights.
+        cache (str): A cache directory for tokens and KDEs.
+        stream (bool): If true, read the file in chunks.
+        matrix (str): A precomputed matrix, written by build_matrix() from
+        the same text. The term and KDE options are ignored.
+        sparse (bool): If true, just keep the skim_depth nearest neighbors of
+        each term, instead of the full matrix.
+        threshold (float): If set, just keep the scores above a threshold.
+        shortlist (int): If set, just score each term against this many
+        candidate neighbors, found with a ball tree.
+        profile (Profile): Records the time and memory of each stage. If
+        not passed, a new one is created.
 
     Returns:
-        Skimmer: The indexed graph.
+        Skimmer: The indexed graph, with the stage records in `g.profile`.
     """
 
-    # Tokenize text.
-    click.echo('\nTokenizing text...')
-    t = Text.from_file(path)
-    click.echo('Extracted %d tokens' % len(t.tokens))
+    profile = profile or Profile(path=path)
 
-    m = Matrix()
+    with profile.stage('tokenize') as record:
+        t = load_text(path, cache, stream)
+        record['tokens'] = len(t.tokens)
 
-    # Index the term matrix.
-    click.echo('\nIndexing terms:')
-    m.index(t, t.most_frequent_terms(term_depth), **kwargs)
+    if matrix:
+
+        # Load the term matrix.
+        click.echo('\nLoading matrix...')
+
+        with profile.stage('load_matrix') as record:
+            m = Matrix.load(matrix)
+            record['terms'] = len(m.terms)
+
+        # The scores are only meaningful for the text they were indexed from.
+        if m.params and m.params.get('text') != t.fingerprint():
+            raise ValueError(
+                'The matrix at %s was indexed from a different text.' % matrix
+            )
+
+    else:
+
+        with profile.stage('select_terms') as record:
+            terms = sorted(t.most_frequent_terms(term_depth))
+            record['terms'] = len(terms)
+
+        kde_kwargs = {k: v for k, v in kwargs.items() if k != 'workers'}
+
+        with profile.stage('kde') as record:
+            kdes, _ = t.kde_matrix(terms, **kde_kwargs)
+            record['samples'] = kdes.shape[1]
+            record['nbytes'] = kdes.nbytes
+
+        profile.rate(record, 'terms_per_second', len(terms))
+
+        # Index the term matrix.
+        click.echo('\nIndexing terms:')
+
+        with profile.stage('score_pairs') as record:
+
+            m, pairs = index_terms(
+                t, terms, skim_depth, sparse, threshold, shortlist, **kwargs
+            )
+
+            record['pairs'] = pairs
+            record['nbytes'] = matrix_bytes(m)
+
+        profile.rate(record, 'pairs_per_second', pairs)
 
     g = Skimmer()
 
     # Construct the network.
     click.echo('\nGenerating graph:')
-    g.build(t, m, skim_depth, d_weights)
+
+    with profile.stage('build_graph') as record:
+        g.build(t, m, skim_depth, d_weights)
+        record['nodes'] = g.number_of_nodes()
+        record['edges'] = g.number_of_edges()
+
+    profile.add(
+        'caches',
+        kde_cache=t.kde_cache.stats(),
+        disk_cache=t.disk_cache.stats() if t.disk_cache else None,
+    )
+
+    g.profile = profile
 
     return g
+
+
+def index_terms(t, terms, skim_depth=10, sparse=False, threshold=None,
+                shortlist=None, **kwargs):
+
+    """
+    Index a full or sparse term matrix.
+
+    Args:
+        t (Text): The tokenized text.
+        terms (list): The terms to index.
+        skim_depth (int): The number of neighbors kept in a sparse matrix.
+        sparse (bool): If true, just keep the skim_depth nearest neighbors of
+        each term, instead of the full matrix.
+        threshold (float): If set, just keep the scores above a threshold.
+        shortlist (int): If set, just score each term against this many
+        candidate neighbors, found with a ball tree.
+
+    Returns:
+        tuple: (matrix, pairs) - the Matrix or SparseMatrix, and the number
+        of pairs that were scored.
+    """
+
+    if sparse or shortlist or threshold is not None:
+
+        m = SparseMatrix(dtype=kwargs.get('dtype', 'float64'))
+
+        # The sparse blocks are scored in this process.
+        kwargs.pop('workers', None)
+
+        pairs = m.index(
+            t, terms,
+            k=skim_depth if sparse or shortlist else None,
+            threshold=threshold,
+            shortlist=shortlist,
+            **kwargs
+        )
+
+    else:
+        m = Matrix(dtype=kwargs.get('dtype', 'float64'))
+        pairs = m.index(t, terms, **kwargs)
+
+    return m, pairs
+
+
+def sweep(path, bandwidths=(2000,), kernels=('gaussian',), term_depth=1000,
+          skim_depth=10, d_weights=False, cache=None, stream=False,
+          sparse=False, threshold=None, shortlist=None, profile=None,
+          **kwargs):
+
+    """
+    Build graphs for a text under every combination of a set of bandwidths
+    and kernels. The text is tokenized and the terms are picked once, and
+    the densities for all of the settings are estimated in one pass, before
+    each matrix is scored.
+
+    Args:
+        path (str): The file path.
+        bandwidths (list): The kernel bandwidths.
+        kernels (list): The kernel functions.
+        term_depth (int): Consider the N most frequent terms.
+        skim_depth (int): Connect each word to the N closest siblings.
+        d_weights (bool): If true, give "close" nodes low weights.
+        cache (str): A cache directory for tokens and KDEs.
+        stream (bool): If true, read the file in chunks.
+        sparse (bool): If true, keep sparse matrices.
+        threshold (float): If set, just keep the scores above a threshold.
+        shortlist (int): If set, just score each term against this many
+        candidate neighbors.
+        profile (Profile): Records the time and memory of each stage.
+
+    Yields:
+        tuple: (setting, graph) - a dict with the bandwidth and kernel, and
+        the Skimmer built with it.
+    """
+
+    profile = profile or Profile(path=path)
+
+    settings = [(b, k) for b in bandwidths for k in kernels]
+
+    with profile.stage('tokenize') as record:
+        t = load_text(path, cache, stream)
+        record['tokens'] = len(t.tokens)
+
+    with profile.stage('select_terms') as record:
+        terms = sorted(t.most_frequent_terms(term_depth))
+        record['terms'] = len(terms)
+
+    kde_kwargs = {
+        k: v for k, v in kwargs.items()
+        if k in ('samples', 'estimator', 'dtype')
+    }
+
+    with profile.stage('kde', settings=len(settings)) as record:
+        kdes, _ = t.kde_sweep(terms, settings, **kde_kwargs)
+        record['nbytes'] = sum(k.nbytes for k in kdes)
+
+    for bandwidth, kernel in settings:
+
+        setting = dict(bandwidth=bandwidth, kernel=kernel)
+
+        click.echo('\nIndexing terms (bandwidth=%s, kernel=%s):' % (
+            bandwidth, kernel
+        ))
+
+        with profile.stage('score_pairs', **setting) as record:
+
+            m, pairs = index_terms(
+                t, terms, skim_depth, sparse, threshold, shortlist,
+                bandwidth=bandwidth, kernel=kernel, **kwargs
+            )
+
+            record['pairs'] = pairs
+            record['nbytes'] = matrix_bytes(m)
+
+        profile.rate(record, 'pairs_per_second', pairs)
+
+        g = Skimmer()
+
+        click.echo('\nGenerating graph:')
+
+        with profile.stage('build_graph', **setting) as record:
+            g.build(t, m, skim_depth, d_weights)
+            record['nodes'] = g.number_of_nodes()
+            record['edges'] = g.number_of_edges()
+
+        g.profile = profile
+
+        yield setting, g
+
+    profile.add(
+        'caches',
+        kde_cache=t.kde_cache.stats(),
+        disk_cache=t.disk_cache.stats() if t.disk_cache else None,
+    )
+
+
+def build_segment_graphs(path, parts=None, size=None, step=None,
+                         term_depth=1000, skim_depth=10, d_weights=False,
+                         cache=None, stream=False, shared_terms=False,
+                         sparse=False, threshold=None, shortlist=None,
+                         profile=None, **kwargs):
+
+    """
+    Tokenize a text once, and build a graph for each window of it - eg, for
+    each volume of a novel.
+
+    Args:
+        path (str): The file path.
+        parts (int): Split the text into N segments of equal length.
+        size (int): Or, slide a window of N tokens across the text.
+        step (int): The distance between windows. Defaults to the size.
+        term_depth (int): Consider the N most frequent terms.
+        skim_depth (int): Connect each word to the N closest siblings.
+        d_weights (bool): If true, give "close" nodes low weights.
+        cache (str): A cache directory for tokens and KDEs.
+        stream (bool): If true, read the file in chunks.
+        shared_terms (bool): If true, pick the most frequent terms in the
+        whole text, so that the graphs are over the same vocabulary, instead
+        of the most frequent terms in each segment.
+        sparse (bool): If true, keep sparse matrices.
+        threshold (float): If set, just keep the scores above a threshold.
+        shortlist (int): If set, just score each term against this many
+        candidate neighbors.
+        profile (Profile): Records the time and memory of each stage.
+
+    Yields:
+        tuple: (segment, graph) - the Segment, and the Skimmer built on it.
+    """
+
+    if not (parts or size):
+        raise ValueError('Pass the number of parts, or the window size.')
+
+    profile = profile or Profile(path=path)
+
+    with profile.stage('tokenize') as record:
+        t = load_text(path, cache, stream)
+        record['tokens'] = len(t.tokens)
+
+    if size:
+        bounds = windows(len(t.tokens), size, step)
+
+    else:
+        bounds = partitions(len(t.tokens), parts)
+
+    if shared_terms:
+        terms = t.most_frequent_terms(term_depth)
+
+    for start, stop in bounds:
+
+        window = dict(start=start, stop=stop)
+
+        with profile.stage('select_terms', **window) as record:
+
+            seg = t.segment(start, stop)
+
+            if shared_terms:
+                seg_terms = sorted(
+                    term for term in terms
+                    if seg.stem_counts[seg.stem_ids[term]]
+                )
+
+            else:
+                seg_terms = sorted(seg.most_frequent_terms(term_depth))
+
+            record['terms'] = len(seg_terms)
+
+        click.echo('\nIndexing terms (tokens %d-%d):' % (start, stop))
+
+        with profile.stage('score_pairs', **window) as record:
+
+            m, pairs = index_terms(
+                seg, seg_terms, skim_depth, sparse, threshold, shortlist,
+                **kwargs
+            )
+
+            record['pairs'] = pairs
+            record['nbytes'] = matrix_bytes(m)
+
+        profile.rate(record, 'pairs_per_second', pairs)
+
+        g = Skimmer()
+
+        click.echo('\nGenerating graph:')
+
+        with profile.stage('build_graph', **window) as record:
+            g.build(seg, m, skim_depth, d_weights)
+            record['nodes'] = g.number_of_nodes()
+            record['edges'] = g.number_of_edges()
+
+        g.profile = profile
+
+        yield seg, g
+
+
+def matrix_bytes(m):
+
+    """
+    Get the memory footprint of the scores in a matrix.
+
+    Args:
+        m (Matrix|SparseMatrix)
+
+    Returns:
+        int: The size in bytes.
+    """
+
+    if isinstance(m, SparseMatrix):
+        return sum(a.nbytes for a in (
+            m.scores.data,
+            m.scores.indices,
+            m.scores.indptr,
+        ))
+
+    return m.scores.nbytes
+
+
+def build_matrix(path, matrix_path, term_depth=1000, cache=None,
+                 stream=False, update=False, **kwargs):
+
+    """
+    Tokenize a text, index a term matrix, and save it to disk.
+
+    Args:
+        path (str): The file path.
+        matrix_path (str): The matrix directory.
+        term_depth (int): Consider the N most frequent terms.
+        cache (str): A cache directory for tokens and KDEs.
+        stream (bool): If true, read the file in chunks.
+        update (bool): If true, and a matrix already exists at the path,
+        reuse its scores and just index the pairs for new terms.
+
+    Returns:
+        Matrix: The indexed matrix.
+    """
+
+    t = load_text(path, cache, stream)
+
+    vocab_path = os.path.join(matrix_path, 'vocab.txt')
+
+    if update and os.path.exists(vocab_path):
+        click.echo('\nLoading matrix...')
+        m = Matrix.load(matrix_path)
+
+    else:
+        m = Matrix(dtype=kwargs.get('dtype', 'float64'))
+
+    # Index the term matrix.
+    click.echo('\nIndexing terms:')
+    terms = sorted(t.most_frequent_terms(term_depth))
+    count = m.update(t, terms, **kwargs)
+
+    click.echo('Scored %d of %d pairs' % (count, m.size))
+
+    m.save(matrix_path)
+
+    return m
+
+
+def compare_shortlists(path, shortlists=(10, 20, 50, 100), term_depth=1000,
+                       skim_depth=10, cache=None, stream=False, **kwargs):
+
+    """
+    Index a text exactly, and then with a range of shortlist sizes, and
+    report the time and the recall of the nearest neighbors for each.
+
+    Args:
+        path (str): The file path.
+        shortlists (list): The shortlist sizes.
+        term_depth (int): Consider the N most frequent terms.
+        skim_depth (int): The number of neighbors for each term.
+        cache (str): A cache directory for tokens and KDEs.
+        stream (bool): If true, read the file in chunks.
+
+    Returns:
+        list: One dict per run, with the shortlist size (None for the exact
+        run), the indexing time in seconds, and the recall.
+    """
+
+    t = load_text(path, cache, stream)
+    terms = sorted(t.most_frequent_terms(term_depth))
+
+    # Estimate the densities up front, so that they aren't timed.
+    t.kde_matrix(terms, **{
+        k: v for k, v in kwargs.items() if k != 'workers'
+    })
+
+    click.echo('\nIndexing terms:')
+
+    start = time.perf_counter()
+
+    exact = Matrix(dtype=kwargs.get('dtype', 'float64'))
+    exact.index(t, terms, **kwargs)
+
+    results = [dict(
+        shortlist=None,
+        seconds=time.perf_counter()-start,
+        recall=1.0,
+    )]
+
+    kwargs.pop('workers', None)
+
+    for size in shortlists:
+
+        start = time.perf_counter()
+
+        m = SparseMatrix(dtype=kwargs.get('dtype', 'float64'))
+        m.index(t, terms, k=skim_depth, shortlist=size, **kwargs)
+
+        results.append(dict(
+            shortlist=size,
+            seconds=time.perf_counter()-start,
+            recall=recall(m, exact, skim_depth),
+        ))
+
+    return results
+
+
+def compare_settings(path, term_depth=1000, skim_depth=10, d_weights=False,
+                     cache=None, stream=False, **kwargs):
+
+    """
+    Index a text with the default density settings (1000 float64 samples),
+    and then with the passed settings, and report how much the scores and
+    the skimmed graph change.
+
+    Args:
+        path (str): The file path.
+        term_depth (int): Consider the N most frequent terms.
+        skim_depth (int): Connect each word to the N closest siblings.
+        d_weights (bool): If true, give "close" nodes low weights.
+        cache (str): A cache directory for tokens and KDEs.
+        stream (bool): If true, read the file in chunks.
+
+    Returns:
+        dict: The baseline and reduced runs - each with the sample count,
+        the KDE and score sizes in bytes, and the indexing time - and the
+        neighbor recall, graph edge overlap, and largest score difference.
+    """
+
+    t = load_text(path, cache, stream)
+    terms = sorted(t.most_frequent_terms(term_depth))
+
+    baseline = dict(kwargs, samples=1000, dtype='float64')
+
+    runs = []
+
+    for params in (baseline, kwargs):
+
+        params = dict(params)
+
+        dtype = params.get('dtype', 'float64')
+        workers = params.pop('workers', 1)
+
+        start = time.perf_counter()
+
+        m = Matrix(dtype=dtype)
+        m.index(t, terms, workers=workers, **params)
+
+        seconds = time.perf_counter()-start
+
+        kdes, _ = t.kde_matrix(terms, **params)
+
+        g = Skimmer()
+        g.build(t, m, skim_depth, d_weights)
+
+        runs.append(dict(
+            matrix=m,
+            graph=g,
+            samples=kdes.shape[1],
+            kde_bytes=kdes.nbytes,
+            score_bytes=m.scores.nbytes,
+            seconds=seconds,
+        ))
+
+    (m1, g1), (m2, g2) = [(r.pop('matrix'), r.pop('graph')) for r in runs]
+
+    return dict(
+        baseline=runs[0],
+        reduced=runs[1],
+        recall=recall(m2, m1, skim_depth),
+        edge_overlap=edge_overlap(g1, g2),
+        max_error=score_error(m1, m2),
+    )
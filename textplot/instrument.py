@@ -0,0 +1,141 @@
+
+
+import sys
+import json
+import time
+import tracemalloc
+
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+class Profile:
+
+
+    def __init__(self, trace_memory=False, **fields):
+
+        """
+        Initialize an empty list of stage records.
+
+        Args:
+            trace_memory (bool): If true, record the peak memory allocated
+            during each stage with tracemalloc. This is precise, but slows
+            down allocation-heavy stages like tokenizing.
+            fields (dict): Fields added to every record - eg, the input path.
+        """
+
+        self.trace_memory = trace_memory
+        self.fields = fields
+        self.records = []
+
+
+    @contextmanager
+    def stage(self, name, **fields):
+
+        """
+        Time a stage of the pipeline.
+
+        Args:
+            name (str): The stage name.
+            fields (dict): Extra fields for the record.
+
+        Yields:
+            dict: The record, which the caller can add fields to.
+        """
+
+        record = dict(self.fields, stage=name, **fields)
+
+        if self.trace_memory:
+            tracing = tracemalloc.is_tracing()
+            if not tracing: tracemalloc.start()
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+
+        try:
+            yield record
+
+        finally:
+
+            record['seconds'] = time.perf_counter() - started
+            record['cpu_seconds'] = time.process_time() - cpu_started
+
+            if self.trace_memory:
+                record['peak_bytes'] = tracemalloc.get_traced_memory()[1] - base
+                if not tracing: tracemalloc.stop()
+
+            record['max_rss_bytes'] = max_rss()
+            record['time'] = time.time()
+
+            self.records.append(record)
+
+
+    def add(self, name, **fields):
+
+        """
+        Add a record that isn't timed - eg, counters at the end of a run.
+
+        Args:
+            name (str): The record name.
+            fields (dict): The record fields.
+        """
+
+        self.records.append(dict(
+            self.fields,
+            stage=name,
+            time=time.time(),
+            **fields
+        ))
+
+
+    def rate(self, record, field, count):
+
+        """
+        Set a throughput field on a finished record.
+
+        Args:
+            record (dict): A stage record.
+            field (str): The field name - eg, pairs_per_second.
+            count (int): The number of items processed in the stage.
+        """
+
+        seconds = record['seconds']
+        record[field] = count / seconds if seconds else None
+
+
+    def write_jsonl(self, f=sys.stdout):
+
+        """
+        Write the records as JSON lines.
+
+        Args:
+            f (file): A text file.
+        """
+
+        for record in self.records:
+            f.write(json.dumps(record, default=str) + '\n')
+
+        f.flush()
+
+
+def max_rss():
+
+    """
+    Returns:
+        int: The peak resident memory of the process, in bytes, or None if
+        it isn't available on this platform.
+    """
+
+    if resource is None:
+        return None
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kilobytes, and macOS reports bytes.
+    return rss if sys.platform == 'darwin' else rss * 1024
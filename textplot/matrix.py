@@ -1,66 +1,199 @@
 
 
+import os
+import json
+import inspect
 import numpy as np
-import textplot.utils as utils
+import textplot.metrics as metrics
+import textplot.parallel as parallel
 
-from itertools import combinations
 from clint.textui.progress import bar
-from scipy.misc import comb
 from collections import OrderedDict
 
 
+# The number of scores expanded out of the triangle at once, when querying
+# neighbors for all terms.
+BLOCK_SIZE = 2**22
+
+
 class Matrix:
 
 
-    def __init__(self):
+    @classmethod
+    def load(cls, path, mmap=True):
+
+        """
+        Load a matrix written by save().
+
+        Args:
+            path (str): The matrix directory.
+            mmap (bool): If true, memory-map the scores read-only, so that
+            several processes can share one copy of the pages.
+
+        Returns:
+            Matrix: The loaded matrix.
+        """
+
+        with open(os.path.join(path, 'vocab.txt')) as f:
+            terms = f.read().splitlines()
+
+        m = cls(dtype=np.float32)
+
+        m.terms = terms
+        m.vocab = {t: i for i, t in enumerate(terms)}
+
+        params_path = os.path.join(path, 'params.json')
+
+        if os.path.exists(params_path):
+            with open(params_path) as f:
+                m.params = json.load(f)
+
+        scores_path = os.path.join(path, 'scores.f32')
+
+        if os.path.getsize(scores_path) != m.size * 4:
+            raise ValueError('Score file does not match the vocabulary.')
+
+        if not m.size:
+            m.scores = np.empty(0, dtype=np.float32)
+
+        elif mmap:
+            m.scores = np.memmap(scores_path, dtype=np.float32, mode='r')
+
+        else:
+            m.scores = np.fromfile(scores_path, dtype=np.float32)
+
+        return m
+
+
+    def __init__(self, dtype=np.float64):
 
         """
-        Initialize the underlying dictionary.
+        Initialize the vocabulary and the pair array.
+
+        Args:
+            dtype (np.dtype): The score type - float64, or float32 to halve
+            the memory footprint.
         """
 
+        self.dtype = np.dtype(dtype)
         self.clear()
 
 
     def clear(self):
 
         """
-        Reset the pair mappings and key set.
+        Reset the vocabulary and the pair scores.
+
+        Scores are stored in a condensed lower-triangle array - the score for
+        terms i > j lives at i*(i-1)/2 + j. Since each new term just appends a
+        row, the array can grow without re-laying-out the existing pairs.
         """
 
-        self.keys = set()
-        self.pairs = {}
+        self.terms = []
+        self.vocab = {}
+        self.scores = np.empty(0, dtype=self.dtype)
+        self.params = None
+
+
+    @property
+    def keys(self):
+
+        """
+        Returns:
+            set: The indexed terms.
+        """
+
+        return set(self.terms)
+
+
+    @property
+    def size(self):
+
+        """
+        Returns:
+            int: The number of pairs in the matrix.
+        """
+
+        n = len(self.terms)
+        return n*(n-1)//2
 
 
     def key(self, term1, term2):
 
         """
-        Get an order-independent key for a pair of terms.
+        Get an order-independent offset for a pair of terms.
 
         Args:
             term1 (str)
             term2 (str)
 
         Returns:
-            str: The dictionary key.
+            int: The offset in the pair array, or None if the pair is not in
+            the matrix.
+        """
+
+        i = self.vocab.get(term1)
+        j = self.vocab.get(term2)
+
+        if i is None or j is None or i == j:
+            return None
+
+        if i < j: i, j = j, i
+        return i*(i-1)//2 + j
+
+
+    def add_term(self, term):
+
+        """
+        Add a term to the vocabulary, growing the pair array if needed.
+
+        Args:
+            term (str)
+
+        Returns:
+            int: The term index.
         """
 
-        return tuple(sorted((term1, term2)))
+        if term in self.vocab:
+            return self.vocab[term]
+
+        self.vocab[term] = len(self.terms)
+        self.terms.append(term)
+
+        # Grow geometrically, so that adding terms one by one stays cheap.
+        if self.size > len(self.scores):
+
+            scores = np.full(
+                max(self.size, 2*len(self.scores)),
+                np.nan,
+                dtype=self.dtype,
+            )
+
+            scores[:len(self.scores)] = self.scores
+            self.scores = scores
+
+        return self.vocab[term]
 
 
     def set_pair(self, term1, term2, value, **kwargs):
 
         """
-        Set the value for a pair of terms.
+        Set the value for a pair of terms. A term paired with itself isn't
+        stored.
 
         Args:
             term1 (str)
             term2 (str)
-            value (mixed)
+            value (float)
         """
 
+        self.add_term(term1)
+        self.add_term(term2)
+
         key = self.key(term1, term2)
-        self.keys.update([term1, term2])
-        self.pairs[key] = value
+
+        if key is not None:
+            self.scores[key] = value
 
 
     def get_pair(self, term1, term2):
@@ -73,14 +206,100 @@ class Matrix:
             term2 (str)
 
         Returns:
-            The stored value.
+            float: The stored value, or None if the pair is not set.
         """
 
         key = self.key(term1, term2)
-        return self.pairs.get(key, None)
 
+        if key is None or np.isnan(self.scores[key]):
+            return None
+
+        return float(self.scores[key])
+
+
+    def rows(self, start, stop):
+
+        """
+        Expand a range of rows of the triangle into a square block.
+
+        Args:
+            start (int): The first term index.
+            stop (int): The term index after the last row.
+
+        Returns:
+            np.array: A (rows x terms) array of scores, aligned with
+            `self.terms`. The score for each term against itself is NaN.
+        """
+
+        i = np.arange(start, stop)[:, np.newaxis]
+        j = np.arange(len(self.terms))[np.newaxis, :]
+
+        if not self.size:
+            return np.full((len(i), len(self.terms)), np.nan, self.dtype)
+
+        # Pairs with earlier terms are contiguous; pairs with later terms are
+        # strided down the triangle.
+        lo, hi = np.minimum(i, j), np.maximum(i, j)
+        keys = hi*(hi-1)//2 + lo
+
+        # Point the diagonal at a valid slot, and blank it out afterwards.
+        diagonal = i == j
+        keys[diagonal] = 0
+
+        block = self.scores[keys]
+        block[diagonal] = np.nan
+        return block
+
+
+    def row(self, term):
+
+        """
+        Get the scores between a term and all indexed terms.
 
-    def index(self, text, terms=None, **kwargs):
+        Args:
+            term (str)
+
+        Returns:
+            np.array: The scores, aligned with `self.terms`. The score for
+            the term against itself is NaN.
+        """
+
+        i = self.vocab[term]
+        return self.rows(i, i+1)[0]
+
+
+    def save(self, path):
+
+        """
+        Write the matrix to a directory, as a vocabulary file (vocab.txt, one
+        term per line), a raw float32 array of the condensed scores
+        (scores.f32, in the lower-triangle order of `self.scores`), and the
+        index parameters (params.json), if any.
+
+        Args:
+            path (str): The matrix directory.
+        """
+
+        os.makedirs(path, exist_ok=True)
+
+        with open(os.path.join(path, 'vocab.txt'), 'w') as f:
+            f.writelines(t+'\n' for t in self.terms)
+
+        scores = self.scores[:self.size].astype(np.float32, copy=False)
+        scores.tofile(os.path.join(path, 'scores.f32'))
+
+        params_path = os.path.join(path, 'params.json')
+
+        if self.params:
+            with open(params_path, 'w') as f:
+                json.dump(self.params, f, indent=2, sort_keys=True)
+
+        elif os.path.exists(params_path):
+            os.remove(params_path)
+
+
+    def index(self, text, terms=None, metric='braycurtis', workers=1,
+              **kwargs):
 
         """
         Index all term pair distances.
@@ -88,21 +307,142 @@ class Matrix:
         Args:
             text (Text): The source text.
             terms (list): Terms to index.
+            metric (str): braycurtis, cosine, or intersect.
+            workers (int): If > 1, score the pairs across a process pool.
+
+        Returns:
+            int: The number of scored pairs.
         """
 
         self.clear()
+        return self.update(text, terms, metric, workers, **kwargs)
+
+
+    def update(self, text, terms=None, metric='braycurtis', workers=1,
+               **kwargs):
+
+        """
+        Re-index the matrix for a new list of terms, reusing the scores that
+        are already in the matrix. Terms that are no longer in the list are
+        dropped, and only the pairs that involve a new term are scored - so,
+        going from 1000 to 1500 terms scores the new x old and new x new
+        blocks, not the whole triangle.
+
+        The scores are only reused if the matrix was indexed from the same
+        text, with the same metric and KDE parameters; otherwise, all pairs
+        are rescored.
+
+        Args:
+            text (Text): The source text.
+            terms (list): Terms to index.
+            metric (str): braycurtis, cosine, or intersect.
+            workers (int): If > 1, score the pairs across a process pool.
+
+        Returns:
+            int: The number of scored pairs.
+        """
 
         # By default, use all terms.
-        terms = terms or text.terms.keys()
+        terms = list(OrderedDict.fromkeys(terms or text.terms.keys()))
+
+        params = index_params(text, metric, **kwargs)
+
+        if params != self.params:
+            self.clear()
+
+        # Keep the surviving terms in their current order, and append the
+        # new terms after them.
+        keep = set(terms)
+        kept = np.array(
+            [i for i, t in enumerate(self.terms) if t in keep],
+            dtype=np.int64,
+        )
+
+        terms = (
+            [self.terms[i] for i in kept] +
+            [t for t in terms if t not in self.vocab]
+        )
+
+        scores = np.empty(len(terms)*(len(terms)-1)//2, dtype=self.dtype)
+        self.copy_pairs(kept, scores)
+
+        self.terms = terms
+        self.vocab = {t: i for i, t in enumerate(terms)}
+        self.params = params
+
+        m, n = len(kept), len(terms)
+
+        if m == n:
+            self.scores = scores
+            return 0
+
+        # Get the densities as one (terms x samples) array, in the precision
+        # that the metric runs in.
+        kdes, _ = text.kde_matrix(terms, **kwargs)
+        kdes = metrics.as_working(kdes, metric)
+
+        # Score the new rows, each against all preceding rows, in blocks
+        # small enough to spread across the workers.
+        step = min(
+            metrics.metric_rows(metric, n-m, n, kdes.shape[1]),
+            metrics.TRIANGLE_ROWS,
+        )
+
+        blocks = [
+            (start, min(start+step, n))
+            for start in range(m, n, step)
+        ]
+
+        lo = m*(m-1)//2
+
+        if workers > 1:
+
+            scores[lo:] = parallel.lower_triangle(
+                kdes, blocks, metric, self.dtype, workers
+            )
+
+        else:
+
+            for start, stop in bar(blocks):
 
-        pairs = combinations(terms, 2)
-        count = comb(len(terms), 2)
+                # Each block of rows fills a contiguous slice of the pair
+                # array.
+                scores[start*(start-1)//2:stop*(stop-1)//2] = (
+                    metrics.lower_triangle(kdes, start, stop, metric)
+                )
 
-        for t1, t2 in bar(pairs, expected_size=count, every=1000):
+        self.scores = scores
+        return len(scores) - lo
 
-            # Set the Bray-Curtis distance.
-            score = text.score_braycurtis(t1, t2, **kwargs)
-            self.set_pair(t1, t2, score)
+
+    def copy_pairs(self, ids, scores, block_size=BLOCK_SIZE):
+
+        """
+        Copy the pairs between a subset of the terms into the head of a new
+        pair array, in blocks of rows.
+
+        Args:
+            ids (np.array): The term indexes, in ascending order.
+            scores (np.array): The new pair array.
+            block_size (int): The number of pairs gathered at once.
+        """
+
+        m = len(ids)
+
+        # If the subset is a prefix of the terms, its pairs are a prefix of
+        # the triangle.
+        if m and ids[-1] == m-1:
+            scores[:m*(m-1)//2] = self.scores[:m*(m-1)//2]
+            return
+
+        step = max(block_size // max(m, 1), 1)
+
+        for start in range(0, m, step):
+
+            stop = min(start+step, m)
+
+            lo, hi = start*(start-1)//2, stop*(stop-1)//2
+            scores[lo:hi] = self.scores[subset_keys(ids, start, stop)]
 
 
     def anchored_pairs(self, anchor):
@@ -117,10 +457,169 @@ class Matrix:
             OrderedDict: The distances, in descending order.
         """
 
-        pairs = OrderedDict()
+        return self.neighbors(anchor, len(self.terms))
+
+
+    def neighbors(self, anchor, k):
+
+        """
+        Get the k highest-scoring terms for an anchor term.
+
+        Args:
+            anchor (str): The anchor term.
+            k (int): The number of neighbors.
+
+        Returns:
+            OrderedDict: The distances, in descending order.
+        """
+
+        if anchor not in self.vocab:
+            return OrderedDict()
+
+        i = self.vocab[anchor]
+        ids, scores = top_k(self.rows(i, i+1), k)
+
+        return self.neighbor_dict(ids[0], scores[0])
+
+
+    def all_neighbors(self, k, block_size=BLOCK_SIZE):
+
+        """
+        Get the k highest-scoring terms for every indexed term, working
+        through the matrix in blocks of rows.
+
+        Args:
+            k (int): The number of neighbors.
+            block_size (int): The number of scores to expand at once.
+
+        Yields:
+            tuple: (anchor, OrderedDict of neighbor -> score)
+        """
+
+        n = len(self.terms)
+        step = max(block_size // max(n, 1), 1)
+
+        for start in range(0, n, step):
+
+            stop = min(start+step, n)
+            ids, scores = top_k(self.rows(start, stop), k)
+
+            for i in range(stop-start):
+                yield (
+                    self.terms[start+i],
+                    self.neighbor_dict(ids[i], scores[i]),
+                )
+
+
+    def neighbor_dict(self, ids, scores):
+
+        """
+        Map a sorted row of neighbor ids onto terms, skipping empty slots.
+
+        Args:
+            ids (np.array): Term indexes.
+            scores (np.array): The scores.
+
+        Returns:
+            OrderedDict: term -> score.
+        """
+
+        return OrderedDict(
+            (self.terms[i], float(s))
+            for i, s in zip(ids, scores)
+            if s != -np.inf
+        )
+
+
+def top_k(block, k):
+
+    """
+    Select the k highest scores in each row of a block, skipping unset (NaN)
+    and zero scores. Runs in O(n + k log k) per row.
+
+    Args:
+        block (np.array): A (rows x terms) array of scores.
+        k (int): The number of scores to keep.
+
+    Returns:
+        tuple: (ids, scores), two (rows x k) arrays, sorted by descending
+        score, then by term index. Empty slots have a score of -inf.
+    """
+
+    k = min(k, block.shape[1])
+
+    block = np.where(np.isnan(block) | (block == 0), -np.inf, block)
+
+    if 0 < k < block.shape[1]:
+        ids = np.argpartition(-block, k-1, axis=1)[:, :k]
+
+    else:
+        ids = np.broadcast_to(np.arange(block.shape[1]), block.shape)
+        ids = ids[:, :k]
+
+    scores = np.take_along_axis(block, ids, axis=1)
+
+    # Sort the k survivors, breaking ties on the term index.
+    order = np.lexsort((ids, -scores), axis=1)
+
+    return (
+        np.take_along_axis(ids, order, axis=1),
+        np.take_along_axis(scores, order, axis=1),
+    )
+
+
+def subset_keys(ids, start, stop):
+
+    """
+    Map a range of rows in the triangle of a subset of the terms onto the
+    offsets of the same pairs in the full triangle.
+
+    Args:
+        ids (np.array): The term indexes, in ascending order.
+        start (int): The first row in the subset.
+        stop (int): The row after the last row.
+
+    Returns:
+        np.array: The offsets, in the row-major order of the subset triangle.
+    """
+
+    a = np.arange(start, stop)
+
+    rows = np.repeat(a, a)
+    firsts = a*(a-1)//2 - start*(start-1)//2
+    cols = np.arange(len(rows)) - np.repeat(firsts, a)
+
+    i, j = ids[rows], ids[cols]
+    return i*(i-1)//2 + j
+
+
+def index_params(text, metric, **kwargs):
+
+    """
+    Get the parameters that determine the scores in a matrix, with the KDE
+    defaults filled in, so that matrices indexed with the same settings on
+    the same text can be recognized.
+
+    Args:
+        text (Text): The source text.
+        metric (str): The pair metric.
+        kwargs (dict): The KDE parameters.
+
+    Returns:
+        dict: The parameters.
+    """
+
+    args = inspect.signature(text.kde_matrix).bind(None, **kwargs)
+    args.apply_defaults()
+
+    params = dict(
+        args.arguments,
+        metric=metric,
+        tokens=len(text.tokens),
+        text=text.fingerprint(),
+    )
+    del params['terms']
 
-        for term in self.keys:
-            score = self.get_pair(anchor, term)
-            if score: pairs[term] = score
+    params['dtype'] = np.dtype(params['dtype']).name
 
-        return utils.sort_dict(pairs)
+    return params
@@ -0,0 +1,393 @@
+
+
+import numpy as np
+
+
+# Upper bound on the size of the temporary arrays that get allocated when a
+# block of pairs is scored at once.
+BLOCK_BYTES = 2**25
+
+
+# The number of (rows x cols) arrays that a metric without a broadcast
+# allocates while it scores a block - the output, and a few temporaries.
+OUTPUT_ARRAYS = 4
+
+
+# The number of rows scored at once by lower_triangle(). Each block is scored
+# against all of the columns up to its last row, so smaller blocks waste
+# less work on pairs above the diagonal.
+TRIANGLE_ROWS = 128
+
+
+def trapz(y, axis=-1):
+
+    """
+    Integrate sampled values with the trapezoidal rule, at unit spacing.
+
+    Args:
+        y (np.array): The samples.
+        axis (int): The axis to integrate along.
+
+    Returns:
+        np.array|float: The integral.
+    """
+
+    y = np.moveaxis(np.asarray(y), axis, -1)
+    return y.sum(-1) - (y[..., 0] + y[..., -1]) / 2
+
+
+def as_float(kdes):
+
+    """
+    Convert densities to floats, keeping float32 arrays in single precision
+    and promoting everything else to float64.
+
+    Args:
+        kdes (np.array): The densities.
+
+    Returns:
+        np.array: float32 or float64 densities.
+    """
+
+    kdes = np.asarray(kdes)
+
+    if kdes.dtype == np.float32:
+        return kdes
+
+    return kdes.astype(np.float64, copy=False)
+
+
+def as_working(kdes, metric):
+
+    """
+    Convert densities to the precision that a metric runs in. Bray-Curtis is
+    computed by scipy in double precision, so single precision densities are
+    converted once, up front, instead of once for each block.
+
+    Args:
+        kdes (np.array): The densities.
+        metric (str): braycurtis, cosine, or intersect.
+
+    Returns:
+        np.array: float32 or float64 densities.
+    """
+
+    kdes = as_float(kdes)
+
+    if metric in DOUBLE_METRICS:
+        return kdes.astype(np.float64, copy=False)
+
+    return kdes
+
+
+def block_rows(rows, cols, samples, block_bytes=BLOCK_BYTES):
+
+    """
+    Get the number of rows that can be scored against a set of columns
+    without exceeding the temporary memory budget.
+
+    Args:
+        rows (int): The total number of rows.
+        cols (int): The number of columns.
+        samples (int): The number of samples in each density.
+        block_bytes (int): The memory budget, in bytes.
+
+    Returns:
+        int: The number of rows per block.
+    """
+
+    per_row = max(cols * samples * 8, 1)
+    return int(min(max(block_bytes // per_row, 1), max(rows, 1)))
+
+
+def metric_rows(metric, rows, cols, samples, block_bytes=BLOCK_BYTES):
+
+    """
+    Get the number of rows that a metric can score against a set of columns
+    without exceeding the memory budget. Metrics that broadcast need room
+    for a (rows x cols x samples) temporary; the others just need a few
+    (rows x cols) arrays.
+
+    Args:
+        metric (str): braycurtis, cosine, or intersect.
+        rows (int): The total number of rows.
+        cols (int): The number of columns.
+        samples (int): The number of samples in each density.
+        block_bytes (int): The memory budget, in bytes.
+
+    Returns:
+        int: The number of rows per block.
+    """
+
+    if metric not in BROADCAST_METRICS:
+        samples = OUTPUT_ARRAYS
+
+    return block_rows(rows, cols, samples, block_bytes)
+
+
+def braycurtis(a, b):
+
+    """
+    Compute the Bray-Curtis similarity between two stacks of densities.
+
+    Args:
+        a (np.array): A (rows x samples) array.
+        b (np.array): A (cols x samples) array.
+
+    Returns:
+        np.array: A (rows x cols) array of similarities.
+    """
+
+    from scipy.spatial.distance import cdist
+
+    # scipy's C loop runs each pair in one pass, without the (rows x cols x
+    # samples) temporaries of a broadcast.
+    return 1 - cdist(a, b, 'braycurtis')
+
+
+def aligned_braycurtis(a, b):
+
+    """
+    Compute the Bray-Curtis similarity between aligned densities.
+
+    Args:
+        a (np.array): A (... x samples) array.
+        b (np.array): A (... x samples) array, broadcastable against `a`.
+
+    Returns:
+        np.array: The similarities, with the sample axis reduced.
+    """
+
+    # Reuse one temporary for the difference and the sum.
+    tmp = np.subtract(a, b)
+    l1_diff = np.abs(tmp, out=tmp).sum(-1)
+
+    np.add(a, b, out=tmp)
+    l1_sum = np.abs(tmp, out=tmp).sum(-1)
+
+    return 1 - l1_diff / l1_sum
+
+
+def cosine(a, b):
+
+    """
+    Compute the cosine similarity between two stacks of densities.
+
+    Args:
+        a (np.array): A (rows x samples) array.
+        b (np.array): A (cols x samples) array.
+
+    Returns:
+        np.array: A (rows x cols) array of similarities.
+    """
+
+    uv = a @ b.T
+    uu = np.einsum('ij,ij->i', a, a)
+    vv = np.einsum('ij,ij->i', b, b)
+
+    dist = 1 - uv / np.sqrt(np.outer(uu, vv))
+    return 1 - np.clip(dist, 0, 2)
+
+
+def aligned_cosine(a, b):
+
+    """
+    Compute the cosine similarity between aligned densities.
+
+    Args:
+        a (np.array): A (... x samples) array.
+        b (np.array): A (... x samples) array, broadcastable against `a`.
+
+    Returns:
+        np.array: The similarities, with the sample axis reduced.
+    """
+
+    uv = (a * b).sum(-1)
+    uu = (a * a).sum(-1)
+    vv = (b * b).sum(-1)
+
+    dist = 1 - uv / np.sqrt(uu * vv)
+    return 1 - np.clip(dist, 0, 2)
+
+
+def intersect(a, b):
+
+    """
+    Compute the area of the overlap between two stacks of densities.
+
+    Args:
+        a (np.array): A (rows x samples) array.
+        b (np.array): A (cols x samples) array.
+
+    Returns:
+        np.array: A (rows x cols) array of overlaps.
+    """
+
+    return aligned_intersect(a[:, np.newaxis, :], b[np.newaxis, :, :])
+
+
+def aligned_intersect(a, b):
+
+    """
+    Compute the area of the overlap between aligned densities.
+
+    Args:
+        a (np.array): A (... x samples) array.
+        b (np.array): A (... x samples) array, broadcastable against `a`.
+
+    Returns:
+        np.array: The overlaps, with the sample axis reduced.
+    """
+
+    return trapz(np.minimum(a, b))
+
+
+METRICS = {
+    'braycurtis':   braycurtis,
+    'cosine':       cosine,
+    'intersect':    intersect,
+}
+
+
+ALIGNED_METRICS = {
+    'braycurtis':   aligned_braycurtis,
+    'cosine':       aligned_cosine,
+    'intersect':    aligned_intersect,
+}
+
+
+# Metrics that score pairs in double precision, whatever the input type.
+DOUBLE_METRICS = {'braycurtis'}
+
+
+# Metrics that broadcast the rows against the columns, with a (rows x cols x
+# samples) temporary.
+BROADCAST_METRICS = {'intersect'}
+
+
+def pairwise(a, b=None, metric='braycurtis', block_bytes=BLOCK_BYTES):
+
+    """
+    Score every row in one stack of densities against every row in another,
+    working through the rows in blocks to bound the temporary memory.
+
+    Args:
+        a (np.array): A (rows x samples) array.
+        b (np.array): A (cols x samples) array. Defaults to `a`.
+        metric (str): braycurtis, cosine, or intersect.
+        block_bytes (int): The memory budget for each block, in bytes.
+
+    Returns:
+        np.array: A (rows x cols) array of scores.
+    """
+
+    if metric not in METRICS:
+        raise ValueError('Unknown metric: %s' % metric)
+
+    score = METRICS[metric]
+
+    a = as_float(a)
+    b = a if b is None else as_float(b)
+
+    scores = np.empty((len(a), len(b)), dtype=np.result_type(a, b))
+
+    a, b = as_working(a, metric), as_working(b, metric)
+
+    step = metric_rows(metric, len(a), len(b), a.shape[1], block_bytes)
+
+    for i in range(0, len(a), step):
+        scores[i:i+step] = score(a[i:i+step], b)
+
+    return scores
+
+
+def lower_triangle(kdes, start, stop, metric='braycurtis',
+                   block_bytes=BLOCK_BYTES):
+
+    """
+    Score each row in a range against all of the rows before it.
+
+    The scores are returned in row-major lower-triangle order - (1, 0),
+    (2, 0), (2, 1), (3, 0), ... - which is the layout of a condensed pair
+    array, so a contiguous range of rows maps onto a contiguous slice.
+
+    Args:
+        kdes (np.array): A (terms x samples) array.
+        start (int): The first row.
+        stop (int): The row after the last row.
+        metric (str): braycurtis, cosine, or intersect.
+        block_bytes (int): The memory budget for each block, in bytes.
+
+    Returns:
+        np.array: The flat array of scores.
+    """
+
+    if metric not in METRICS:
+        raise ValueError('Unknown metric: %s' % metric)
+
+    scores = np.empty(
+        stop*(stop-1)//2 - start*(start-1)//2,
+        dtype=as_float(kdes).dtype,
+    )
+
+    # Convert the rows that get scored once, not once for each block.
+    kdes = as_working(kdes[:stop], metric)
+
+    n = 0
+
+    for i in range(start, stop, TRIANGLE_ROWS):
+
+        j = min(i+TRIANGLE_ROWS, stop)
+
+        block = pairwise(
+            kdes[i:j], kdes[:j],
+            metric=metric,
+            block_bytes=block_bytes,
+        )
+
+        # Keep the columns to the left of the diagonal.
+        mask = np.arange(j) < np.arange(i, j)[:, np.newaxis]
+        pairs = block[mask]
+
+        scores[n:n+len(pairs)] = pairs
+        n += len(pairs)
+
+    return scores
+
+
+def shortlist(kdes, ids, metric='braycurtis', block_bytes=BLOCK_BYTES):
+
+    """
+    Score each row against its own shortlist of other rows.
+
+    Args:
+        kdes (np.array): A (terms x samples) array.
+        ids (np.array): A (terms x candidates) array of row indexes.
+        metric (str): braycurtis, cosine, or intersect.
+        block_bytes (int): The memory budget for each block, in bytes.
+
+    Returns:
+        np.array: A (terms x candidates) array of scores.
+    """
+
+    if metric not in ALIGNED_METRICS:
+        raise ValueError('Unknown metric: %s' % metric)
+
+    score = ALIGNED_METRICS[metric]
+
+    kdes = as_float(kdes)
+    scores = np.empty(ids.shape, dtype=kdes.dtype)
+
+    # Each block holds two temporaries - the gathered candidates, and the
+    # working array of the metric.
+    step = block_rows(
+        len(ids), ids.shape[1], kdes.shape[1], block_bytes // 2
+    )
+
+    for i in range(0, len(ids), step):
+        scores[i:i+step] = score(
+            kdes[i:i+step, np.newaxis, :],
+            kdes[ids[i:i+step]],
+        )
+
+    return scores
@@ -0,0 +1,134 @@
+
+
+import numpy as np
+import textplot.metrics as metrics
+
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+from clint.textui.progress import bar
+
+
+# The shared arrays, attached once in each worker process.
+shared = {}
+
+
+def create_shared(shape, dtype):
+
+    """
+    Allocate an array in a new shared memory block.
+
+    Args:
+        shape (tuple): The array shape.
+        dtype (np.dtype): The array type.
+
+    Returns:
+        tuple: (SharedMemory, np.array)
+    """
+
+    size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+    shm = SharedMemory(create=True, size=size)
+
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def attach(kdes, scores, base=0):
+
+    """
+    Attach the shared KDE and score arrays in a worker.
+
+    Args:
+        kdes (tuple): (name, shape, dtype) of the KDE block.
+        scores (tuple): (name, shape, dtype) of the score block.
+        base (int): The pair offset of the first shared score.
+    """
+
+    kdes_shm = SharedMemory(name=kdes[0])
+    scores_shm = SharedMemory(name=scores[0])
+
+    # Hold on to the blocks, so that the buffers stay mapped.
+    shared['shm'] = (kdes_shm, scores_shm)
+
+    shared['kdes'] = np.ndarray(kdes[1], kdes[2], kdes_shm.buf)
+    shared['scores'] = np.ndarray(scores[1], scores[2], scores_shm.buf)
+    shared['base'] = base
+
+
+def score_rows(args):
+
+    """
+    Score a block of rows against all preceding rows, and write the scores
+    into the shared pair array.
+
+    Args:
+        args (tuple): (start, stop, metric)
+
+    Returns:
+        int: The number of scored pairs.
+    """
+
+    start, stop, metric = args
+
+    lo, hi = start*(start-1)//2, stop*(stop-1)//2
+    base = shared['base']
+
+    shared['scores'][lo-base:hi-base] = metrics.lower_triangle(
+        shared['kdes'], start, stop, metric
+    )
+
+    return hi-lo
+
+
+def lower_triangle(kdes, blocks, metric='braycurtis', dtype=np.float64,
+                   workers=2):
+
+    """
+    Score the lower triangle of the pair matrix across a pool of processes.
+    The KDEs and the scores live in shared memory, so the workers read and
+    write them without any copying or pickling.
+
+    Args:
+        kdes (np.array): A (terms x samples) array.
+        blocks (list): (start, stop) row ranges, one per task.
+        metric (str): braycurtis, cosine, or intersect.
+        dtype (np.dtype): The score type.
+        workers (int): The number of processes.
+
+    Returns:
+        np.array: The condensed scores for the rows in the blocks, which
+        should be contiguous.
+    """
+
+    start, stop = blocks[0][0], blocks[-1][1]
+    base = start*(start-1)//2
+
+    kdes_shm, shared_kdes = create_shared(kdes.shape, kdes.dtype)
+    scores_shm, shared_scores = create_shared((stop*(stop-1)//2-base,), dtype)
+
+    try:
+
+        shared_kdes[:] = kdes
+
+        initargs = (
+            (kdes_shm.name, kdes.shape, kdes.dtype),
+            (scores_shm.name, shared_scores.shape, dtype),
+            base,
+        )
+
+        tasks = [(start, stop, metric) for start, stop in blocks]
+
+        with Pool(workers, initializer=attach, initargs=initargs) as pool:
+
+            results = pool.imap_unordered(score_rows, tasks)
+
+            for _ in bar(results, expected_size=len(tasks)):
+                pass
+
+        return shared_scores.copy()
+
+    finally:
+
+        del shared_kdes, shared_scores
+
+        for shm in (kdes_shm, scores_shm):
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,471 @@
+
+
+import numpy as np
+import textplot.metrics as metrics
+import textplot.candidates as candidates
+
+from textplot.matrix import index_params, top_k
+from clint.textui.progress import bar
+from collections import OrderedDict
+
+
+# The number of scores computed at once. Each block is only held long enough
+# to be merged into the neighbor table, so this bounds the peak memory.
+BLOCK_SIZE = 2**20
+
+
+class SparseMatrix:
+
+
+    def __init__(self, dtype=np.float64):
+
+        """
+        Initialize the vocabulary and the pair scores.
+
+        Args:
+            dtype (np.dtype): The score type.
+        """
+
+        self.dtype = np.dtype(dtype)
+        self.clear()
+
+
+    def clear(self):
+
+        """
+        Reset the vocabulary and the pair scores.
+
+        Scores are stored in a (terms x terms) CSR matrix, where row i holds
+        the neighbors kept for term i. With a top-k cutoff the rows are not
+        symmetric - j can be one of i's k nearest terms without i being one
+        of j's.
+        """
+
+        import scipy.sparse as sp
+
+        self.terms = []
+        self.vocab = {}
+        self.scores = sp.csr_matrix((0, 0), dtype=self.dtype)
+        self.params = None
+
+
+    @property
+    def keys(self):
+
+        """
+        Returns:
+            set: The indexed terms.
+        """
+
+        return set(self.terms)
+
+
+    @property
+    def size(self):
+
+        """
+        Returns:
+            int: The number of stored scores.
+        """
+
+        return self.scores.nnz
+
+
+    def index(self, text, terms=None, metric='braycurtis', k=None,
+              threshold=None, shortlist=None, dims=64,
+              block_size=BLOCK_SIZE, **kwargs):
+
+        """
+        Score all term pairs, keeping just the k highest scores for each
+        term and / or the scores above a threshold.
+
+        The pairs are scored in blocks of rows against all preceding rows,
+        like Matrix.index(). Each block is folded into a running (terms x k)
+        top-k table - along the rows, and, since the scores are symmetric,
+        along the columns - and then thrown away, so the full (terms x terms)
+        matrix is never held in memory.
+
+        If a shortlist size is passed, skip the all-pairs scoring - instead,
+        shortlist candidate neighbors for each term with a ball tree over the
+        pooled densities, and just score each term against its candidates.
+        The neighbors are approximate, but the scores are exact.
+
+        Args:
+            text (Text): The source text.
+            terms (list): Terms to index.
+            metric (str): braycurtis, cosine, or intersect.
+            k (int): The number of neighbors to keep for each term.
+            threshold (float): The minimum score to keep.
+            shortlist (int): The number of candidate neighbors per term.
+            dims (int): The number of pooled bins in the ball tree.
+            block_size (int): The number of scores computed at once.
+
+        Returns:
+            int: The number of scored pairs.
+        """
+
+        if k is None and threshold is None:
+            raise ValueError('Pass k, threshold, or both.')
+
+        self.clear()
+
+        # By default, use all terms.
+        terms = list(OrderedDict.fromkeys(terms or text.terms.keys()))
+
+        self.terms = terms
+        self.vocab = {t: i for i, t in enumerate(terms)}
+        self.params = dict(
+            index_params(text, metric, **kwargs),
+            k=k,
+            threshold=threshold,
+            shortlist=shortlist,
+            dims=dims,
+        )
+
+        # Get the densities as one (terms x samples) array.
+        kdes, _ = text.kde_matrix(terms, **kwargs)
+
+        if shortlist:
+            pairs = self.score_shortlist(
+                kdes, metric, k, threshold, shortlist, dims
+            )
+
+        else:
+            pairs = self.score_blocks(kdes, metric, k, threshold, block_size)
+
+        rows, cols, data = pairs
+
+        n = len(terms)
+
+        import scipy.sparse as sp
+
+        self.scores = sp.csr_matrix(
+            (data.astype(self.dtype), (rows, cols)),
+            shape=(n, n),
+        )
+
+        if shortlist:
+            return n * max(min(shortlist, n-1), 0)
+
+        return n*(n-1)//2
+
+
+    def score_blocks(self, kdes, metric, k, threshold, block_size):
+
+        """
+        Score all pairs, in blocks of rows.
+
+        Args:
+            kdes (np.array): A (terms x samples) array.
+            metric (str): The pair metric.
+            k (int): The number of neighbors to keep for each term.
+            threshold (float): The minimum score to keep.
+            block_size (int): The number of scores computed at once.
+
+        Returns:
+            tuple: (rows, cols, scores) for the kept pairs.
+        """
+
+        # Convert the densities once, not once for each block.
+        kdes = metrics.as_working(kdes, metric)
+
+        n = len(kdes)
+        step = max(block_size // max(n, 1), 1)
+
+        if k is not None:
+            table = TopK(n, k)
+
+        else:
+            pairs = []
+
+        for start in bar(range(0, n, step)):
+
+            stop = min(start+step, n)
+
+            # Score the rows against all preceding rows, and blank out the
+            # diagonal and the pairs to its right.
+            block = metrics.pairwise(kdes[start:stop], kdes[:stop], metric)
+
+            upper = np.arange(stop) >= np.arange(start, stop)[:, np.newaxis]
+            block[upper] = np.nan
+
+            if threshold is not None:
+                block[block < threshold] = np.nan
+
+            if k is not None:
+                table.add(np.arange(start, stop), np.arange(stop), block)
+                table.add(np.arange(stop), np.arange(start, stop), block.T)
+
+            else:
+                i, j = np.nonzero(~np.isnan(block) & (block != 0))
+                pairs.append((i+start, j, block[i, j]))
+
+        if k is not None:
+            return table.pairs()
+
+        if not pairs:
+            return empty_pairs()
+
+        rows, cols, data = map(np.concatenate, zip(*pairs))
+
+        # Store each pair in both rows.
+        return np.r_[rows, cols], np.r_[cols, rows], np.r_[data, data]
+
+
+    def score_shortlist(self, kdes, metric, k, threshold, shortlist, dims):
+
+        """
+        Score each term against a shortlist of candidate neighbors.
+
+        Args:
+            kdes (np.array): A (terms x samples) array.
+            metric (str): The pair metric.
+            k (int): The number of neighbors to keep for each term.
+            threshold (float): The minimum score to keep.
+            shortlist (int): The number of candidate neighbors per term.
+            dims (int): The number of pooled bins in the ball tree.
+
+        Returns:
+            tuple: (rows, cols, scores) for the kept pairs.
+        """
+
+        n = len(kdes)
+
+        ids = candidates.ball_tree(kdes, shortlist, dims)
+        scores = metrics.shortlist(kdes, ids, metric)
+
+        if threshold is not None:
+            scores[scores < threshold] = np.nan
+
+        if k is not None:
+            table = TopK(n, k)
+            table.add(np.arange(n), ids, scores)
+            return table.pairs()
+
+        keep = ~np.isnan(scores) & (scores != 0)
+        rows = np.broadcast_to(np.arange(n)[:, np.newaxis], ids.shape)
+
+        return rows[keep], ids[keep], scores[keep]
+
+
+    def get_pair(self, term1, term2):
+
+        """
+        Get the value for a pair of terms.
+
+        Args:
+            term1 (str)
+            term2 (str)
+
+        Returns:
+            float: The stored value, or None if the pair was not kept.
+        """
+
+        i = self.vocab.get(term1)
+        j = self.vocab.get(term2)
+
+        if i is None or j is None or i == j:
+            return None
+
+        for a, b in ((i, j), (j, i)):
+
+            lo, hi = self.scores.indptr[a], self.scores.indptr[a+1]
+            hits = np.flatnonzero(self.scores.indices[lo:hi] == b)
+
+            if len(hits):
+                return float(self.scores.data[lo+hits[0]])
+
+        return None
+
+
+    def rows(self, start, stop):
+
+        """
+        Expand a range of rows into a dense block.
+
+        Args:
+            start (int): The first term index.
+            stop (int): The term index after the last row.
+
+        Returns:
+            np.array: A (rows x terms) array of scores, aligned with
+            `self.terms`. Pairs that were not kept are NaN.
+        """
+
+        block = self.scores[start:stop].tocoo()
+
+        dense = np.full((stop-start, len(self.terms)), np.nan, self.dtype)
+        dense[block.row, block.col] = block.data
+
+        return dense
+
+
+    def row(self, term):
+
+        """
+        Get the scores between a term and all indexed terms.
+
+        Args:
+            term (str)
+
+        Returns:
+            np.array: The scores, aligned with `self.terms`. Pairs that were
+            not kept are NaN.
+        """
+
+        i = self.vocab[term]
+        return self.rows(i, i+1)[0]
+
+
+    def anchored_pairs(self, anchor):
+
+        """
+        Get the kept distances between an anchor term and other terms.
+
+        Args:
+            anchor (str): The anchor term.
+
+        Returns:
+            OrderedDict: The distances, in descending order.
+        """
+
+        return self.neighbors(anchor, len(self.terms))
+
+
+    def neighbors(self, anchor, k):
+
+        """
+        Get the k highest-scoring terms for an anchor term.
+
+        Args:
+            anchor (str): The anchor term.
+            k (int): The number of neighbors.
+
+        Returns:
+            OrderedDict: The distances, in descending order.
+        """
+
+        if anchor not in self.vocab:
+            return OrderedDict()
+
+        return self.row_neighbors(self.vocab[anchor], k)
+
+
+    def all_neighbors(self, k, **kwargs):
+
+        """
+        Get the k highest-scoring terms for every indexed term, reading the
+        rows straight out of the sparse matrix.
+
+        Args:
+            k (int): The number of neighbors.
+
+        Yields:
+            tuple: (anchor, OrderedDict of neighbor -> score)
+        """
+
+        for i, term in enumerate(self.terms):
+            yield term, self.row_neighbors(i, k)
+
+
+    def row_neighbors(self, i, k):
+
+        """
+        Get the k highest-scoring terms in a row.
+
+        Args:
+            i (int): The term index.
+            k (int): The number of neighbors.
+
+        Returns:
+            OrderedDict: term -> score, sorted by descending score, then by
+            term index.
+        """
+
+        lo, hi = self.scores.indptr[i], self.scores.indptr[i+1]
+
+        ids = self.scores.indices[lo:hi]
+        scores = self.scores.data[lo:hi]
+
+        order = np.lexsort((ids, -scores))[:k]
+
+        return OrderedDict(
+            (self.terms[j], float(s))
+            for j, s in zip(ids[order], scores[order])
+        )
+
+
+class TopK:
+
+
+    def __init__(self, rows, k):
+
+        """
+        Initialize an empty table of the k highest scores in each row.
+
+        Args:
+            rows (int): The number of rows.
+            k (int): The number of scores to keep in each row.
+        """
+
+        self.k = k
+        self.ids = np.full((rows, k), -1, dtype=np.int64)
+        self.scores = np.full((rows, k), -np.inf)
+
+
+    def add(self, rows, cols, block):
+
+        """
+        Merge a block of candidate scores into the table.
+
+        Args:
+            rows (np.array): The row indexes of the block.
+            cols (np.array): The column indexes of the block - shared by all
+            rows, or a (rows x cols) array.
+            block (np.array): A (rows x cols) array of scores.
+        """
+
+        # Narrow down the block to its own top k, and then merge.
+        ids, scores = top_k(block, self.k)
+
+        scores = np.concatenate([self.scores[rows], scores], axis=1)
+        ids = np.concatenate([
+            self.ids[rows],
+            np.take_along_axis(np.broadcast_to(cols, block.shape), ids, 1),
+        ], axis=1)
+
+        keep, scores = top_k(scores, self.k)
+        ids = np.take_along_axis(ids, keep, axis=1)
+
+        # Break ties on the term index, like the dense top_k().
+        order = np.lexsort((ids, -scores), axis=1)
+
+        self.ids[rows] = np.take_along_axis(ids, order, axis=1)
+        self.scores[rows] = np.take_along_axis(scores, order, axis=1)
+
+
+    def pairs(self):
+
+        """
+        Returns:
+            tuple: (rows, cols, scores) for the filled slots.
+        """
+
+        filled = self.scores != -np.inf
+        rows = np.nonzero(filled)[0]
+
+        return rows, self.ids[filled], self.scores[filled]
+
+
+def empty_pairs():
+
+    """
+    Returns:
+        tuple: Empty (rows, cols, scores) arrays.
+    """
+
+    return (
+        np.empty(0, dtype=np.int64),
+        np.empty(0, dtype=np.int64),
+        np.empty(0),
+    )
@@ -0,0 +1,230 @@
+
+
+import os
+import re
+import numpy as np
+import textplot.utils as utils
+
+
+# The number of characters read from the file at once.
+CHUNK_SIZE = 2**20
+
+
+class FileChunks:
+
+
+    def __init__(self, path, chunk_size=CHUNK_SIZE):
+
+        """
+        A re-iterable sequence of chunks of a text file.
+
+        Args:
+            path (str): The file path.
+            chunk_size (int): The number of characters in each chunk.
+        """
+
+        self.path = path
+        self.chunk_size = chunk_size
+
+
+    def __iter__(self):
+
+        """
+        Yields:
+            str: The next chunk.
+        """
+
+        with open(self.path, 'r', errors='replace') as f:
+            for chunk in iter(lambda: f.read(self.chunk_size), ''):
+                yield chunk
+
+
+def iter_words(chunks):
+
+    """
+    Yield the lowercased words in a stream of chunks, stitching together
+    words that are split across chunk boundaries.
+
+    Args:
+        chunks (iter): Text chunks.
+
+    Yields:
+        list: The words in the next chunk.
+    """
+
+    carry = ''
+
+    for chunk in chunks:
+
+        text = carry + chunk.lower()
+
+        # Hold back a word that runs up to the end of the chunk, since it
+        # might continue in the next one.
+        tail = re.search('[a-z]+$', text)
+        carry = tail.group(0) if tail else ''
+
+        if tail:
+            text = text[:tail.start()]
+
+        yield re.findall('[a-z]+', text)
+
+    if carry:
+        yield [carry]
+
+
+def tokenize_stream(chunks, path, stopwords=(), block_size=2**20):
+
+    """
+    Tokenize a stream of chunks into flat arrays, stored as memory-mapped
+    .npy files. Memory use is bounded by the vocabulary size and the chunk
+    size, not the length of the text.
+
+    1. Read the chunks, mapping each word to a form id (or -1 for stopwords)
+    and stemming each new form once. The form ids are appended to a raw file
+    on disk, and the form counts are accumulated as we go.
+
+    2. With the counts in hand, lay out the CSR offsets index and fill it by
+    re-reading the form ids in blocks (a counting sort).
+
+    Args:
+        chunks (iter): Text chunks.
+        path (str): The directory for the array files.
+        stopwords (set): Words to mark as stopwords.
+        block_size (int): The number of tokens processed at once in step 2.
+
+    Returns:
+        dict: The arrays, in the format of Text.token_arrays().
+    """
+
+    os.makedirs(path, exist_ok=True)
+
+    stem = utils.stem
+
+    forms = {}
+    form_list = []
+    form_stems = []
+    stems = {}
+
+    form_counts = np.zeros(0, dtype=np.int64)
+
+    raw_path = os.path.join(path, 'token_forms.raw')
+    length = 0
+
+    with open(raw_path, 'wb') as raw:
+
+        for words in iter_words(chunks):
+
+            ids = []
+
+            for word in words:
+
+                f = forms.get(word)
+
+                if f is None:
+
+                    if word in stopwords:
+                        f = -1
+
+                    else:
+                        f = len(form_list)
+                        form_list.append(word)
+                        form_stems.append(
+                            stems.setdefault(stem(word), len(stems))
+                        )
+
+                    forms[word] = f
+
+                ids.append(f)
+
+            ids = np.array(ids, dtype=np.int32)
+            raw.write(ids.tobytes())
+            length += len(ids)
+
+            counts = np.bincount(ids[ids >= 0], minlength=len(form_list))
+            counts[:len(form_counts)] += form_counts
+            form_counts = counts
+
+    form_stems = np.array(form_stems, dtype=np.int32)
+
+    stem_counts = np.bincount(
+        form_stems,
+        weights=form_counts,
+        minlength=len(stems),
+    ).astype(np.int64)
+
+    indptr = np.concatenate([[0], np.cumsum(stem_counts)])
+
+    token_forms = create_npy(path, 'token_forms', np.int32, length)
+    token_stems = create_npy(path, 'token_stems', np.int32, length)
+    offsets = create_npy(path, 'offsets', np.int32, int(indptr[-1]))
+
+    raw_forms = (
+        np.memmap(raw_path, dtype=np.int32, mode='r', shape=length)
+        if length else np.empty(0, dtype=np.int32)
+    )
+
+    # The next free slot in each stem's run of offsets.
+    cursor = indptr[:-1].copy()
+
+    for start in range(0, length, block_size):
+
+        block = np.asarray(raw_forms[start:start+block_size])
+        token_forms[start:start+len(block)] = block
+
+        words = block >= 0
+        block_stems = np.full_like(block, -1)
+        block_stems[words] = form_stems[block[words]]
+        token_stems[start:start+len(block)] = block_stems
+
+        # Scatter the positions into each stem's run, in text order.
+        positions = np.flatnonzero(words) + start
+        s = block_stems[words]
+
+        order = np.argsort(s, kind='stable')
+        counts = np.bincount(s, minlength=len(stems))
+        firsts = np.cumsum(counts) - counts
+
+        rank = np.arange(len(s)) - firsts[s[order]]
+        offsets[cursor[s[order]] + rank] = positions[order]
+
+        cursor += counts
+
+    del raw_forms
+    os.remove(raw_path)
+
+    for array in (token_forms, token_stems, offsets):
+        array.flush()
+
+    return dict(
+        forms=np.array(form_list, dtype=str),
+        stems=np.array(list(stems), dtype=str),
+        form_stems=form_stems,
+        form_counts=form_counts,
+        token_forms=token_forms,
+        token_stems=token_stems,
+        offsets=offsets,
+        indptr=indptr,
+    )
+
+
+def create_npy(path, name, dtype, size):
+
+    """
+    Create a memory-mapped .npy file.
+
+    Args:
+        path (str): The directory.
+        name (str): The array name.
+        dtype (np.dtype): The array type.
+        size (int): The array length.
+
+    Returns:
+        np.memmap: The array.
+    """
+
+    return np.lib.format.open_memmap(
+        os.path.join(path, name+'.npy'),
+        mode='w+',
+        dtype=dtype,
+        shape=(size,),
+    )
@@ -2,24 +2,126 @@
 
 import os
 import re
-import matplotlib.pyplot as plt
 import textplot.utils as utils
+import textplot.metrics as metrics
+import textplot.density as density
+import textplot.stream as stream
 import numpy as np
-import pkgutil
+import tempfile
+import hashlib
 
-from nltk.stem import PorterStemmer
-from sklearn.neighbors import KernelDensity
-from collections import OrderedDict, Counter
-from scipy.spatial import distance
-from scipy import ndimage
-from functools import lru_cache
+from collections import OrderedDict
+from collections.abc import Sequence, Mapping
+from textplot.cache import KDECache
+
+
+# The arrays that encode a tokenized text in the disk cache.
+TOKEN_ARRAYS = [
+    'forms',
+    'stems',
+    'form_stems',
+    'form_counts',
+    'token_forms',
+    'token_stems',
+    'offsets',
+    'indptr',
+]
+
+
+class TokenList(Sequence):
+
+
+    def __init__(self, text):
+
+        """
+        A read-only, list-like view of the tokens in a text, which builds the
+        token dicts on demand.
+
+        Args:
+            text (Text): The text.
+        """
+
+        self.text = text
+
+
+    def __len__(self):
+        return len(self.text.token_forms)
+
+
+    def __getitem__(self, i):
+
+        """
+        Args:
+            i (int): The token offset.
+
+        Returns:
+            dict: The token, or None for stopwords.
+        """
+
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+
+        form = self.text.token_forms[i]
+
+        if form < 0:
+            return None
+
+        return {
+            'stemmed':      self.text.stems[self.text.form_stems[form]],
+            'unstemmed':    self.text.forms[form],
+            'offset':       range(len(self))[i],
+        }
+
+
+class TermOffsets(Mapping):
+
+
+    def __init__(self, text):
+
+        """
+        A read-only, dict-like view of the term -> offsets index of a text.
+        Stems that don't occur in the text - eg, outside of a segment - are
+        left out.
+
+        Args:
+            text (Text): The text.
+        """
+
+        self.text = text
+
+
+    def __len__(self):
+        return int(np.count_nonzero(self.text.stem_counts))
+
+
+    def __iter__(self):
+        stems = self.text.stems
+        return (stems[i] for i in np.flatnonzero(self.text.stem_counts))
+
+
+    def __contains__(self, term):
+        i = self.text.stem_ids.get(term)
+        return i is not None and self.text.stem_counts[i] > 0
+
+
+    def __getitem__(self, term):
+
+        """
+        Args:
+            term (str): A stemmed term.
+
+        Returns:
+            list: The offsets of the term.
+        """
+
+        return self.text.term_offsets(term).tolist()
 
 
 class Text:
 
 
     @classmethod
-    def from_file(cls, path):
+    def from_file(cls, path, **kwargs):
 
         """
         Create a text from a file.
@@ -29,22 +131,49 @@ class Text:
         """
 
         with open(path, 'r', errors='replace') as f:
-            return cls(f.read())
+            return cls(f.read(), **kwargs)
+
+
+    @classmethod
+    def from_stream(cls, path, chunk_size=stream.CHUNK_SIZE, **kwargs):
+
+        """
+        Create a text from a file, reading it in chunks. The raw text is never
+        held in memory, and the token arrays are memory-mapped from disk.
+
+        Args:
+            path (str): The file path.
+            chunk_size (int): The number of characters read at once.
+        """
+
+        return cls(stream.FileChunks(path, chunk_size), **kwargs)
 
 
-    def __init__(self, text, stopwords=None):
+    def __init__(self, text, stopwords=None, cache_size=None,
+                 cache_bytes=2**28, cache=None):
 
         """
         Store the raw text, tokenize.
 
         Args:
-            text (str): The raw text string.
+            text (str|iter): The raw text string, or an iterable of chunks.
+            With a cache, the chunks must be re-iterable.
             stopwords (str): A custom stopwords list path.
+            cache_size (int): The maximum number of cached KDEs.
+            cache_bytes (int): The maximum total size of the cached KDEs.
+            cache (DiskCache): A persistent cache for tokens and KDEs.
         """
 
         self.text = text
+        self.kde_cache = KDECache(cache_size, cache_bytes)
+        self.disk_cache = cache
         self.load_stopwords(stopwords)
-        self.tokenize()
+
+        if self.disk_cache:
+            self.load_or_tokenize()
+
+        else:
+            self.tokenize()
 
 
     def load_stopwords(self, path):
@@ -56,43 +185,228 @@ class Text:
             path (str): The stopwords file path.
         """
 
-        if path:
-            with open(path) as f:
-                self.stopwords = set(f.read().splitlines())
+        self.stopwords = set(utils.read_stopwords(path))
+
+
+    def tokenize(self):
+
+        """
+        Tokenize the text.
+        """
+
+        if isinstance(self.text, str):
+            arrays = utils.tokenize_arrays(self.text, self.stopwords)
 
         else:
-            self.stopwords = set(
-                pkgutil
-                .get_data('textplot', 'data/stopwords.txt')
-                .decode('utf8')
-                .splitlines()
+
+            # Keep the arrays on disk, until the text is garbage collected.
+            self.workdir = tempfile.TemporaryDirectory()
+
+            arrays = stream.tokenize_stream(
+                self.text,
+                self.workdir.name,
+                self.stopwords,
             )
 
+        self.set_token_arrays(arrays)
 
-    def tokenize(self):
+
+    def load_or_tokenize(self):
 
         """
-        Tokenize the text.
+        Load the tokens from the disk cache, or tokenize the text and write
+        the tokens to the cache. The text is read twice - once for the key,
+        and again to tokenize it - so it can't be a one-shot iterator.
         """
 
-        self.tokens = []
-        self.terms = OrderedDict()
+        if not isinstance(self.text, str) and iter(self.text) is self.text:
+            raise TypeError(
+                'A cached text must be a string or a re-iterable source of '
+                'chunks, like FileChunks - not an iterator.'
+            )
 
-        # Generate tokens.
-        for token in utils.tokenize(self.text):
+        self.cache_key = self.disk_cache.key(
+            self.text,
+            self.stopwords,
+            utils.stemmer_version(),
+        )
 
-            # Ignore stopwords.
-            if token['unstemmed'] in self.stopwords:
-                self.tokens.append(None)
+        arrays = self.disk_cache.load_tokens(self.cache_key, TOKEN_ARRAYS)
 
-            else:
+        if arrays:
+            self.set_token_arrays(arrays)
+
+        else:
+            self.tokenize()
+            self.disk_cache.save_tokens(self.cache_key, self.token_arrays())
+
+
+    def token_arrays(self):
+
+        """
+        Get the flat arrays that encode the tokens and terms.
+
+        Returns:
+            dict: The arrays -
+            - forms: The unstemmed forms, in order of appearance.
+            - stems: The stemmed terms, in order of appearance.
+            - form_stems: The stem index of each form.
+            - form_counts: The number of tokens of each form.
+            - token_forms: The form index of each token, -1 for stopwords.
+            - token_stems: The stem index of each token, -1 for stopwords.
+            - offsets: The token offsets, grouped by stem.
+            - indptr: The start of each stem's run of offsets.
+        """
+
+        return dict(
+            forms=np.array(self.forms, dtype=str),
+            stems=np.array(self.stems, dtype=str),
+            form_stems=self.form_stems,
+            form_counts=self.form_counts,
+            token_forms=self.token_forms,
+            token_stems=self.token_stems,
+            offsets=self.offsets,
+            indptr=self.indptr,
+        )
+
+
+    def fingerprint(self):
+
+        """
+        Get a digest of the term offsets, which determine the densities - so
+        that scores computed for one text aren't reused for another.
+
+        Returns:
+            str: A hex digest.
+        """
+
+        sha = hashlib.sha256()
+
+        sha.update(str(len(self.token_forms)).encode('utf8'))
+        sha.update(b'\0' + '\n'.join(self.stems).encode('utf8'))
+
+        for array in (self.indptr, self.offsets):
+            sha.update(b'\0' + np.ascontiguousarray(array, np.int64).tobytes())
+
+        return sha.hexdigest()
+
+
+    def set_token_arrays(self, arrays):
+
+        """
+        Set the tokens and terms from flat arrays.
+
+        Args:
+            arrays (dict): Arrays, in the format of token_arrays(). Only the
+            forms, stems, form_stems and token_forms are required - the rest
+            are computed if they're missing.
+        """
+
+        self.forms = np.asarray(arrays['forms']).tolist()
+        self.stems = np.asarray(arrays['stems']).tolist()
+
+        self.stem_ids = {s: i for i, s in enumerate(self.stems)}
+
+        self.form_stems = np.asarray(arrays['form_stems'], dtype=np.int32)
+        self.token_forms = np.asarray(arrays['token_forms'], dtype=np.int32)
+
+        words = None
+
+        if 'token_stems' in arrays:
+            self.token_stems = np.asarray(arrays['token_stems'], np.int32)
+
+        else:
+
+            # Map tokens to stems, keeping the -1 stopword markers.
+            words = self.token_forms >= 0
+            self.token_stems = np.full_like(self.token_forms, -1)
+            self.token_stems[words] = self.form_stems[self.token_forms[words]]
+
+        if 'offsets' in arrays:
+            self.offsets = np.asarray(arrays['offsets'], dtype=np.int32)
+            self.indptr = np.asarray(arrays['indptr'], dtype=np.int64)
+
+        else:
 
-                # Token:
-                self.tokens.append(token)
+            if words is None:
+                words = self.token_forms >= 0
 
-                # Term:
-                offsets = self.terms.setdefault(token['stemmed'], [])
-                offsets.append(token['offset'])
+            # Group the token offsets by stem, CSR-style - the offsets for
+            # stem i are offsets[indptr[i]:indptr[i+1]], in text order.
+            positions = np.flatnonzero(words).astype(np.int32)
+            stems = self.token_stems[positions]
+
+            order = np.argsort(stems, kind='stable')
+            counts = np.bincount(stems, minlength=len(self.stems))
+
+            self.offsets = positions[order]
+            self.indptr = np.concatenate([[0], np.cumsum(counts)])
+
+        # The number of occurrences of each stem.
+        self.stem_counts = np.diff(self.indptr)
+
+        if 'form_counts' in arrays:
+            self.form_counts = np.asarray(arrays['form_counts'])
+
+        else:
+            words = self.token_forms[self.token_forms >= 0]
+            self.form_counts = np.bincount(words, minlength=len(self.forms))
+
+        self.set_unstem_table()
+
+        self.tokens = TokenList(self)
+        self.terms = TermOffsets(self)
+
+
+    def set_unstem_table(self):
+
+        """
+        Find the most common unstemmed form of each stem. Since each form
+        belongs to exactly one stem, the counts for the (stem, form) pairs are
+        just the form counts.
+        """
+
+        # Sort by stem, then by descending count, then by form id (so that
+        # ties go to the form that appears first), and take the head of each
+        # stem's run.
+        order = np.lexsort((
+            np.arange(len(self.forms)),
+            -self.form_counts,
+            self.form_stems,
+        ))
+
+        heads = np.ones(len(order), dtype=bool)
+        heads[1:] = np.diff(self.form_stems[order]) != 0
+
+        self.stem_forms = np.full(len(self.stems), -1, dtype=np.int32)
+        self.stem_forms[self.form_stems[order[heads]]] = order[heads]
+
+
+    def term_offsets(self, term):
+
+        """
+        Get the offsets of a term.
+
+        Args:
+            term (str): A stemmed term.
+
+        Returns:
+            np.array: The offsets, in text order. (A view into the shared
+            offsets array.)
+
+        Raises:
+            KeyError: If the term doesn't occur in the text.
+        """
+
+        i = self.stem_ids[term]
+        lo, hi = self.indptr[i], self.indptr[i+1]
+
+        # A segment shares the stems of the full text, but not all of them
+        # occur in its window.
+        if lo == hi:
+            raise KeyError(term)
+
+        return self.offsets[lo:hi]
 
 
     def term_counts(self):
@@ -102,11 +416,12 @@ class Text:
             OrderedDict: An ordered dictionary of term counts.
         """
 
-        counts = OrderedDict()
-        for term in self.terms:
-            counts[term] = len(self.terms[term])
+        order = self.count_order()
 
-        return utils.sort_dict(counts)
+        return OrderedDict(
+            (self.stems[i], int(self.stem_counts[i]))
+            for i in order.tolist()
+        )
 
 
     def term_count_buckets(self):
@@ -118,13 +433,25 @@ class Text:
         """
 
         buckets = {}
-        for term, count in self.term_counts().items():
-            if count in buckets: buckets[count].append(term)
-            else: buckets[count] = [term]
+        for i in self.count_order().tolist():
+            count = int(self.stem_counts[i])
+            buckets.setdefault(count, []).append(self.stems[i])
 
         return buckets
 
 
+    def count_order(self):
+
+        """
+        Returns:
+            np.array: The ids of the stems that occur in the text, by
+            descending count. Ties are broken by order of appearance.
+        """
+
+        order = np.argsort(-self.stem_counts, kind='stable')
+        return order[:np.count_nonzero(self.stem_counts)]
+
+
     def most_frequent_terms(self, depth):
 
         """
@@ -138,18 +465,95 @@ class Text:
             set: The set of frequent terms.
         """
 
-        counts = self.term_counts()
+        n = len(self.stem_counts)
+        depth = min(depth, n)
+
+        if depth < 1:
+            return set()
 
-        # Get the top X terms and the instance count of the last word.
-        top_terms = set(list(counts.keys())[:depth])
-        end_count = list(counts.values())[:depth][-1]
+        # Get the instance count of the last word, without sorting.
+        end_count = np.partition(self.stem_counts, n-depth)[n-depth]
 
-        # Merge in all other words with that appear that number of times, so
-        # that we don't truncate the last bucket - eg, half of the words that
-        # appear 5 times, but not the other half.
+        # Every term that appears more often is in the top X. Merge in all
+        # other words that appear that number of times, so that we don't
+        # truncate the last bucket - eg, half of the words that appear 5
+        # times, but not the other half.
+        # Skip terms that don't appear - eg, outside of a segment.
+        ids = np.flatnonzero(
+            (self.stem_counts >= end_count) &
+            (self.stem_counts > 0)
+        )
 
-        bucket = self.term_count_buckets()[end_count]
-        return top_terms.union(set(bucket))
+        return set(self.stems[i] for i in ids.tolist())
+
+
+    def window_arrays(self, start, stop):
+
+        """
+        Get the token arrays for a window of the text, by slicing the token
+        arrays and filtering the term offsets - the offsets stay grouped by
+        stem, so nothing is re-tokenized or re-sorted. Stem and form ids are
+        shared with the full text.
+
+        Args:
+            start (int): The first token.
+            stop (int): The end of the window, exclusive.
+
+        Returns:
+            dict: Arrays, in the format of token_arrays(), with the offsets
+            counted from the start of the window.
+        """
+
+        inside = (self.offsets >= start) & (self.offsets < stop)
+
+        # The number of offsets of each stem that fall in the window.
+        runs = np.concatenate([[0], np.cumsum(inside)])
+        counts = runs[self.indptr[1:]] - runs[self.indptr[:-1]]
+
+        token_forms = self.token_forms[start:stop]
+        words = token_forms[token_forms >= 0]
+
+        return dict(
+            forms=self.forms,
+            stems=self.stems,
+            form_stems=self.form_stems,
+            form_counts=np.bincount(words, minlength=len(self.forms)),
+            token_forms=token_forms,
+            token_stems=self.token_stems[start:stop],
+            offsets=self.offsets[inside] - start,
+            indptr=np.concatenate([[0], np.cumsum(counts)]),
+        )
+
+
+    def segment(self, start, stop):
+
+        """
+        Get a window of the text, which can be indexed and graphed like a
+        full text.
+
+        Args:
+            start (int): The first token.
+            stop (int): The end of the window, exclusive.
+
+        Returns:
+            Segment
+        """
+
+        return Segment(self, start, stop)
+
+
+    def segments(self, bounds):
+
+        """
+        Args:
+            bounds (list): (start, stop) tuples - eg, from utils.windows() or
+            utils.partitions().
+
+        Returns:
+            list: A Segment for each window.
+        """
+
+        return [self.segment(start, stop) for start, stop in bounds]
 
 
     def unstem(self, term):
@@ -164,42 +568,288 @@ class Text:
             str: The unstemmed token.
         """
 
-        originals = []
-        for i in self.terms[term]:
-            originals.append(self.tokens[i]['unstemmed'])
+        return self.forms[self.stem_forms[self.stem_ids[term]]]
+
+
+    def unstem_table(self):
+
+        """
+        Get the frequencies of all of the unstemmed forms of each stem.
+
+        Returns:
+            OrderedDict: stem -> OrderedDict of form -> count, with the most
+            common forms first.
+        """
+
+        table = OrderedDict((stem, []) for stem in self.stems)
+
+        order = np.lexsort((
+            np.arange(len(self.forms)),
+            -self.form_counts,
+        ))
+
+        for f in order.tolist():
+            stem = self.stems[self.form_stems[f]]
+            table[stem].append((self.forms[f], int(self.form_counts[f])))
 
-        mode = Counter(originals).most_common(1)
-        return mode[0][0]
+        return OrderedDict(
+            (stem, OrderedDict(forms))
+            for stem, forms in table.items()
+        )
 
 
-    @lru_cache(maxsize=None)
-    def kde(self, term, bandwidth=2000, samples=1000, kernel='gaussian'):
+    def kde(self, term, bandwidth=2000, samples=1000, kernel='gaussian',
+            estimator='binned', dtype=np.float64):
 
         """
         Estimate the kernel density of the instances of term in the text.
+        Results are cached on the instance, in `self.kde_cache`.
 
         Args:
             term (str): A stemmed term.
             bandwidth (int): The kernel bandwidth.
-            samples (int): The number of evenly-spaced sample points.
+            samples (int|str): The number of evenly-spaced sample points,
+            or 'auto' to scale it with the length of the text.
             kernel (str): The kernel function.
+            estimator (str): binned (fast), exact, or sklearn (reference).
+            dtype (np.dtype): float64, or float32 to halve the memory.
 
         Returns:
             np.array: The density estimate.
         """
 
-        # Get the offsets of the term instances.
-        terms = np.array(self.terms[term])[:, np.newaxis]
+        if estimator not in density.ESTIMATORS:
+            raise ValueError('Unknown estimator: %s' % estimator)
+
+        samples = self.resolve_samples(samples, bandwidth)
+        dtype = np.dtype(dtype)
+
+        key = (term, bandwidth, samples, kernel, estimator, dtype.name)
+
+        kde = self.kde_cache.get(key)
+        if kde is not None: return kde
+
+        kde = density.ESTIMATORS[estimator](
+            self.term_offsets(term),
+            len(self.token_forms),
+            bandwidth,
+            samples,
+            kernel,
+        ).astype(dtype, copy=False)
+
+        # Freeze the array, since it's shared by all callers.
+        kde.flags.writeable = False
+        self.kde_cache.set(key, kde)
+
+        return kde
+
+
+    def resolve_samples(self, samples, bandwidth):
+
+        """
+        Get the number of KDE samples.
+
+        Args:
+            samples (int|str): A sample count, or 'auto'.
+            bandwidth (int): The kernel bandwidth.
+
+        Returns:
+            int: The sample count.
+        """
+
+        if samples == 'auto':
+            return density.auto_samples(len(self.token_forms), bandwidth)
+
+        return int(samples)
+
+
+    def kde_matrix(self, terms, bandwidth=2000, samples=1000,
+                   kernel='gaussian', estimator='binned', dtype=np.float64):
+
+        """
+        Estimate the kernel densities of a set of terms in one pass - bin the
+        offsets of all of the terms into a (terms x bins) count matrix, and
+        convolve it with the kernel in one batch. Results are cached on the
+        instance, in `self.kde_cache`.
+
+        Args:
+            terms (list): Stemmed terms.
+            bandwidth (int): The kernel bandwidth.
+            samples (int|str): The number of evenly-spaced sample points,
+            or 'auto' to scale it with the length of the text.
+            kernel (str): The kernel function.
+            estimator (str): binned (fast), exact, or sklearn (reference).
+            dtype (np.dtype): float64, or float32 to halve the memory.
+
+        Returns:
+            tuple: (kdes, index) - a contiguous (terms x samples) array of
+            densities, and an OrderedDict that maps terms to rows.
+        """
+
+        kdes, index = self.kde_sweep(
+            terms, [(bandwidth, kernel)], samples, estimator, dtype
+        )
+
+        return kdes[0], index
+
+
+    def kde_sweep(self, terms, settings, samples=1000, estimator='binned',
+                  dtype=np.float64):
+
+        """
+        Estimate the kernel densities of a set of terms under several
+        settings. With the binned estimator, the offsets are gathered once,
+        and the binning and FFTs are shared across the settings where they
+        can be. Each result is the same as a call to kde_matrix(), and is
+        cached the same way.
+
+        Args:
+            terms (list): Stemmed terms.
+            settings (list): (bandwidth, kernel) pairs.
+            samples (int|str): The number of evenly-spaced sample points,
+            or 'auto' to scale it with the length of each bandwidth.
+            estimator (str): binned (fast), exact, or sklearn (reference).
+            dtype (np.dtype): float64, or float32 to halve the memory.
+
+        Returns:
+            tuple: (kdes, index) - a list with a contiguous (terms x samples)
+            array of densities for each setting, and an OrderedDict that maps
+            terms to rows.
+        """
+
+        if estimator not in density.BATCH_ESTIMATORS:
+            raise ValueError('Unknown estimator: %s' % estimator)
+
+        dtype = np.dtype(dtype)
+
+        index = OrderedDict((t, i) for i, t in enumerate(terms))
+
+        settings = [
+            (bandwidth, self.resolve_samples(samples, bandwidth), kernel)
+            for bandwidth, kernel in settings
+        ]
+
+        kdes = [
+            self.load_kde_matrix(index, *setting, estimator, dtype)
+            for setting in settings
+        ]
+
+        missing = [i for i, k in enumerate(kdes) if k is None]
+
+        if missing:
+
+            offsets = [self.term_offsets(t) for t in index]
+            length = len(self.token_forms)
+
+            if estimator == 'binned':
+                computed = density.binned_sweep(
+                    offsets, length, [settings[i] for i in missing]
+                )
+
+            else:
+                computed = [
+                    density.BATCH_ESTIMATORS[estimator](
+                        offsets, length, *settings[i]
+                    )
+                    for i in missing
+                ]
+
+            for i, k in zip(missing, computed):
+
+                kdes[i] = np.ascontiguousarray(k, dtype=dtype)
+
+                self.save_kde_matrix(
+                    index, *settings[i], estimator, dtype, kdes[i]
+                )
+
+        return kdes, index
+
+
+    def kde_matrix_keys(self, index, bandwidth, samples, kernel, estimator,
+                        dtype):
+
+        """
+        Get the cache keys for a KDE matrix.
+
+        Returns:
+            tuple: (key, params_key) - the instance cache key, and the disk
+            cache key, or None if there's no disk cache.
+        """
+
+        key = (
+            'matrix', tuple(index),
+            bandwidth, samples, kernel, estimator, dtype.name,
+        )
+
+        params_key = None
+
+        if self.disk_cache:
+
+            params_key = self.disk_cache.params_key(
+                list(index),
+                bandwidth=bandwidth,
+                samples=samples,
+                kernel=kernel,
+                estimator=estimator,
+                dtype=dtype.name,
+            )
+
+        return key, params_key
+
+
+    def load_kde_matrix(self, index, bandwidth, samples, kernel, estimator,
+                        dtype):
+
+        """
+        Get a KDE matrix from the instance cache, or from the disk cache.
+
+        Returns:
+            np.array: The densities, or None.
+        """
+
+        key, params_key = self.kde_matrix_keys(
+            index, bandwidth, samples, kernel, estimator, dtype
+        )
+
+        kdes = self.kde_cache.get(key)
+        if kdes is not None: return kdes
+
+        if self.disk_cache:
+
+            kdes = self.disk_cache.load_kdes(self.cache_key, params_key)
+
+            if kdes is not None:
+                self.cache_kde_matrix(key, kdes)
+
+        return kdes
+
+
+    def save_kde_matrix(self, index, bandwidth, samples, kernel, estimator,
+                        dtype, kdes):
+
+        """
+        Cache a new KDE matrix on the instance, and on disk.
+        """
+
+        key, params_key = self.kde_matrix_keys(
+            index, bandwidth, samples, kernel, estimator, dtype
+        )
+
+        if self.disk_cache:
+            self.disk_cache.save_kdes(self.cache_key, params_key, kdes)
+
+        self.cache_kde_matrix(key, kdes)
+
 
-        # Fit the density estimator on the terms.
-        kde = KernelDensity(kernel=kernel, bandwidth=bandwidth).fit(terms)
+    def cache_kde_matrix(self, key, kdes):
 
-        # Score an evely-spaced array of samples.
-        x_axis = np.linspace(0, len(self.tokens), samples)[:, np.newaxis]
-        scores = kde.score_samples(x_axis)
+        """
+        Add a KDE matrix to the instance cache.
+        """
 
-        # Scale the scores to integrate to 1.
-        return np.exp(scores) * (len(self.tokens) / samples)
+        # Freeze the array, since it's shared by all callers.
+        kdes.flags.writeable = False
+        self.kde_cache.set(key, kdes)
 
 
     def score_intersect(self, term1, term2, **kwargs):
@@ -220,7 +870,7 @@ class Text:
 
         # Integrate the overlap.
         overlap = np.minimum(t1_kde, t2_kde)
-        return np.trapz(overlap)
+        return metrics.trapz(overlap)
 
 
     def score_cosine(self, term1, term2, **kwargs):
@@ -236,6 +886,8 @@ class Text:
         Returns: float
         """
 
+        from scipy.spatial import distance
+
         t1_kde = self.kde(term1, **kwargs)
         t2_kde = self.kde(term2, **kwargs)
 
@@ -255,6 +907,8 @@ class Text:
         Returns: float
         """
 
+        from scipy.spatial import distance
+
         t1_kde = self.kde(term1, **kwargs)
         t2_kde = self.kde(term2, **kwargs)
 
@@ -270,10 +924,68 @@ class Text:
             words (list): A list of unstemmed terms.
         """
 
-        stem = PorterStemmer().stem
+        import matplotlib.pyplot as plt
+
+        kdes, _ = self.kde_matrix([utils.stem(w) for w in words], **kwargs)
 
-        for word in words:
-            kde = self.kde(stem(word), **kwargs)
+        for kde in kdes:
             plt.plot(kde)
 
         plt.show()
+
+
+class Segment(Text):
+
+
+    def __init__(self, text, start, stop):
+
+        """
+        A window of a tokenized text, which shares the tokens and term index
+        of the full text. The offsets, and so the densities, are relative to
+        the start of the window.
+
+        Terms are unstemmed with the counts from the full text, so that a
+        term gets the same label in every segment.
+
+        Args:
+            text (Text): The full text.
+            start (int): The first token.
+            stop (int): The end of the window, exclusive.
+        """
+
+        start = max(int(start), 0)
+        stop = min(int(stop), len(text.token_forms))
+
+        if start >= stop:
+            raise ValueError('Empty segment: %d-%d' % (start, stop))
+
+        self.parent = text
+        self.start = start
+        self.stop = stop
+
+        self.text = text.text
+        self.stopwords = text.stopwords
+
+        self.kde_cache = KDECache(
+            text.kde_cache.maxsize,
+            text.kde_cache.maxbytes,
+        )
+
+        # Keep the densities next to the full text's, on disk.
+        self.disk_cache = text.disk_cache
+
+        if self.disk_cache:
+            self.cache_key = os.path.join(
+                text.cache_key, 'segments', '%d-%d' % (start, stop)
+            )
+
+        self.set_token_arrays(text.window_arrays(start, stop))
+
+
+    def set_unstem_table(self):
+
+        """
+        Use the most common forms in the full text.
+        """
+
+        self.stem_forms = self.parent.stem_forms
@@ -2,10 +2,10 @@
 
 import re
 import numpy as np
+import pkgutil
 import functools
 
 from collections import OrderedDict
-from nltk.stem import PorterStemmer
 from itertools import islice
 
 
@@ -21,7 +21,7 @@ def tokenize(text):
         dict: The next token.
     """
 
-    stem = PorterStemmer().stem
+    stem = memoize_stem()
     tokens = re.finditer('[a-z]+', text.lower())
 
     for offset, match in enumerate(tokens):
@@ -36,6 +36,140 @@ def tokenize(text):
         }
 
 
+def tokenize_arrays(text, stopwords=()):
+
+    """
+    Tokenize a text into flat arrays. Each distinct word is stemmed once.
+
+    Args:
+        text (str): The original text.
+        stopwords (set): Words to mark as stopwords.
+
+    Returns:
+        dict: The arrays -
+        - forms: The unstemmed forms, in order of appearance.
+        - stems: The stemmed terms, in order of appearance.
+        - form_stems: The stem index of each form.
+        - token_forms: The form index of each token, -1 for stopwords.
+    """
+
+    # Map each token to a form id, in order of first appearance.
+    forms = {}
+    words = re.findall('[a-z]+', text.lower())
+
+    ids = np.array(
+        [forms.setdefault(w, len(forms)) for w in words],
+        dtype=np.int32,
+    )
+
+    stem = stemmer().stem
+    stems = {}
+
+    # Stem each distinct form, skipping stopwords.
+    form_stems = np.array([
+        -1 if form in stopwords else stems.setdefault(stem(form), len(stems))
+        for form in forms
+    ], dtype=np.int32)
+
+    # Drop the stopword forms, and renumber the rest.
+    keep = form_stems >= 0
+    renumber = np.cumsum(keep, dtype=np.int32) - 1
+
+    token_forms = np.where(keep[ids], renumber[ids], -1).astype(np.int32)
+
+    return dict(
+        forms=np.array(list(forms), dtype=str)[keep],
+        stems=np.array(list(stems), dtype=str),
+        form_stems=form_stems[keep],
+        token_forms=token_forms,
+    )
+
+
+def memoize_stem():
+
+    """
+    Returns:
+        func: A Porter stem function that caches the stem of each word.
+    """
+
+    stems = {}
+
+    def memoized(word):
+        if word not in stems: stems[word] = stem(word)
+        return stems[word]
+
+    return memoized
+
+
+@functools.lru_cache(maxsize=None)
+def stemmer():
+
+    """
+    Returns:
+        PorterStemmer: A stemmer, shared by all texts in the process.
+    """
+
+    # nltk takes a second or two to import, so wait until a text needs it.
+    from nltk.stem import PorterStemmer
+
+    return PorterStemmer()
+
+
+@functools.lru_cache(maxsize=2**18)
+def stem(word):
+
+    """
+    Stem a word. The stems are cached across texts, so a process that
+    tokenizes many texts doesn't re-stem the words they have in common.
+
+    Args:
+        word (str): An unstemmed word.
+
+    Returns:
+        str: The stem.
+    """
+
+    return stemmer().stem(word)
+
+
+@functools.lru_cache(maxsize=None)
+def read_stopwords(path=None):
+
+    """
+    Read a stopword list, once per process.
+
+    Args:
+        path (str): A stopwords file path, or None for the default list.
+
+    Returns:
+        frozenset: The stopwords.
+    """
+
+    if path:
+        with open(path) as f:
+            return frozenset(f.read().splitlines())
+
+    return frozenset(
+        pkgutil
+        .get_data('textplot', 'data/stopwords.txt')
+        .decode('utf8')
+        .splitlines()
+    )
+
+
+def stemmer_version():
+
+    """
+    Returns:
+        str: An identifier for the stemmer used by tokenize().
+    """
+
+    from importlib.metadata import version
+
+    # Read the version from the package metadata, without importing nltk.
+    return 'nltk.PorterStemmer-%s' % version('nltk')
+
+
 def sort_dict(d, desc=True):
 
     """
@@ -75,3 +209,63 @@ def window(seq, n=2):
     for token in it:
         result = result[1:] + (token,)
         yield result
+
+
+def windows(length, size, step=None):
+
+    """
+    Get the (start, stop) bounds of a sliding window over a range - eg, the
+    tokens of a text. The last window is cut short at the end of the range.
+
+    Args:
+        length (int): The length of the range.
+        size (int): The window width.
+        step (int): The distance between window starts, or None for
+        back-to-back windows.
+
+    Returns:
+        list: (start, stop) tuples.
+    """
+
+    step = step or size
+
+    if size < 1 or step < 1:
+        raise ValueError('The window size and step must be positive.')
+
+    bounds = []
+
+    for start in range(0, length, step):
+
+        stop = min(start+size, length)
+        bounds.append((start, stop))
+
+        if stop == length:
+            break
+
+    return bounds
+
+
+def partitions(length, n):
+
+    """
+    Split a range into n contiguous parts of (nearly) equal length. If the
+    range is shorter than n, the empty parts are dropped.
+
+    Args:
+        length (int): The length of the range.
+        n (int): The number of parts.
+
+    Returns:
+        list: (start, stop) tuples.
+    """
+
+    if n < 1:
+        raise ValueError('The number of parts must be positive.')
+
+    bounds = np.linspace(0, length, n+1).round().astype(int).tolist()
+
+    return [
+        (start, stop)
+        for start, stop in zip(bounds[:-1], bounds[1:])
+        if start < stop
+    ]